@@ -0,0 +1,85 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Bytes saved and time spent by response compression for synthetic large plans
+
+Usage: python benchmarks/bench_compression.py [--nodes 100 1000 5000] [--levels 1 6 9] [--bandwidth-mbps 100]
+
+The latency trade-off is reported as the compression time plus the transfer time at the given bandwidth,
+next to the transfer time of the uncompressed body.
+"""
+
+import argparse
+import json
+import time
+
+from layouts import generate_layouts
+
+from migration_procedure_generator.compression import available_codings
+from migration_procedure_generator.encoding import encode_binary
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+
+
+def measure(func, *args, repeat=3):
+    """Return the result and the best wall time of repeated calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="benchmark response compression")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--bandwidth-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+
+    bytes_per_ms = args.bandwidth_mbps * 1000 * 1000 / 8 / 1000
+    results = []
+    for node_count in args.nodes:
+        current, desired = generate_layouts(node_count, move_ratio=0.5)
+        with Task.op_id_scope():
+            plan = Plan.system_update_plan(System.decode_json(current, {}), System.decode_json(desired, {}))
+        bodies = {
+            "json": json.dumps(plan.encode_json(), separators=(",", ":")).encode("utf-8"),
+            "binary": encode_binary(plan),
+        }
+        for encoding, body in bodies.items():
+            for coding, compress in available_codings().items():
+                for level in args.levels:
+                    compressed, elapsed = measure(compress, body, level)
+                    results.append(
+                        {
+                            "nodes": node_count,
+                            "tasks": len(plan.tasks),
+                            "encoding": encoding,
+                            "coding": coding,
+                            "level": level,
+                            "bytes": len(body),
+                            "compressed_bytes": len(compressed),
+                            "saved_ratio": round(1 - len(compressed) / len(body), 4),
+                            "compress_ms": round(elapsed * 1000, 3),
+                            "uncompressed_transfer_ms": round(len(body) / bytes_per_ms, 3),
+                            "compressed_total_ms": round(elapsed * 1000 + len(compressed) / bytes_per_ms, 3),
+                        }
+                    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
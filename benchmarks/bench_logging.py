@@ -0,0 +1,168 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Latency of log calls with the handlers writing in the calling thread or on the listener thread of the queued mode
+
+Usage: python benchmarks/bench_logging.py [--threads 1 8 32] [--records 2000] [--max-bytes 1000000] [--write-delay-us 0]
+
+Every thread logs --records JSON records through the application logger to a rotating file, which is rolled over
+every --max-bytes bytes, so that the slow rollovers show in the tail latency of the calls that trigger them.
+--write-delay-us simulates a slow storage by sleeping before each record is written.
+The report is printed in JSON format.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from migration_procedure_generator.common.logger import Logger
+
+PERCENTILES = (50, 99, 99.9)
+
+
+class SlowRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler on a slow storage, such as a network file system"""
+
+    def __init__(self, *args, write_delay: float, **kwargs) -> None:
+        """constructor
+
+        Args:
+            write_delay (float): seconds added to the writing of each record
+        """
+        super().__init__(*args, **kwargs)
+        self.write_delay = write_delay
+
+    def emit(self, record) -> None:
+        """Write the record after the delay of the storage"""
+        time.sleep(self.write_delay)
+        super().emit(record)
+
+
+def log_config(directory: str, max_bytes: int, write_delay: float, queue_config: dict | None) -> dict:
+    """Logging configuration with a rotating file handler
+
+    Args:
+        directory (str): directory of the log files
+        max_bytes (int): size of a log file that triggers a rollover
+        write_delay (float): seconds added to the writing of each record
+        queue_config (dict | None): queue section of the queued mode, or None for the handlers in the calling thread
+
+    Returns:
+        dict: logging configuration
+    """
+    config = {
+        "version": 1,
+        "formatters": {"standard": {"format": "%(asctime)s %(levelname)s %(message)s", "datefmt": "%H:%M:%S.%f"}},
+        "handlers": {
+            "file": {
+                "()": SlowRotatingFileHandler,
+                "write_delay": write_delay,
+                "level": "INFO",
+                "formatter": "standard",
+                "filename": os.path.join(directory, "bench.log"),
+                "maxBytes": max_bytes,
+                "backupCount": 3,
+                "encoding": "utf-8",
+            }
+        },
+        "root": {"level": "INFO", "handlers": ["file"]},
+    }
+    if queue_config:
+        config["queue"] = queue_config
+    return config
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run(logger: Logger, threads: int, records: int, message: str) -> dict:
+    """Log from several threads at the same time
+
+    Args:
+        logger (Logger): application logger
+        threads (int): number of logging threads
+        records (int): records logged by each thread
+        message (str): message of the records
+
+    Returns:
+        dict: latency distribution of the log calls in microseconds and throughput
+    """
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(samples: list) -> None:
+        barrier.wait()
+        for _ in range(records):
+            start = time.perf_counter()
+            logger.info(message)
+            samples.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # The records still in the queue are written before the next run, outside of the measurement.
+    Logger.stop_listener()
+
+    values = sorted(latency * 1000 * 1000 for samples in latencies for latency in samples)
+    summary = {f"p{percent}": round(percentile(values, percent), 3) for percent in PERCENTILES}
+    summary["max"] = round(values[-1], 3)
+    return {"latency_us": summary, "throughput_rps": round(len(values) / elapsed, 1)}
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="benchmark the queued logging mode")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--records", type=int, default=2000, help="records logged by each thread")
+    parser.add_argument("--message-bytes", type=int, default=200)
+    parser.add_argument("--max-bytes", type=int, default=1000000, help="size of a log file that triggers a rollover")
+    parser.add_argument("--write-delay-us", type=float, default=0.0, help="delay of the storage for each record")
+    parser.add_argument("--maxsize", type=int, default=10000, help="maximum number of queued records")
+    parser.add_argument("--overflow", choices=["block", "drop_new", "drop_oldest"], default="block")
+    args = parser.parse_args()
+
+    message = "x" * args.message_bytes
+    modes = {"sync": None, "queued": {"maxsize": args.maxsize, "overflow": args.overflow}}
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for threads in args.threads:
+            for mode, queue_config in modes.items():
+                logger = Logger(log_config(directory, args.max_bytes, args.write_delay_us / 1e6, queue_config))
+                result = run(logger, threads, args.records, message)
+                results.append({"mode": mode, "threads": threads, "dropped": Logger.dropped_records(), **result})
+    report = {
+        "records_per_thread": args.records,
+        "max_bytes": args.max_bytes,
+        "write_delay_us": args.write_delay_us,
+        "queue": modes["queued"],
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
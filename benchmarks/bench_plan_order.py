@@ -0,0 +1,81 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Time saved by keeping the plan in operation ID order instead of sorting it in every phase
+
+Usage: python benchmarks/bench_plan_order.py [--nodes 1000 10000 50000] [--repeat 3]
+
+The planner used to sort the full task list at the start of remove_redundant_tasks (before the redundant tasks are
+removed) and of remove_invalid_dependencies, complete_device_dependencies and remove_indirect_dependencies
+(after). The removed work is measured by sorting copies of the task lists of the same size with Task.__lt__.
+"""
+
+import argparse
+import json
+import time
+
+from layouts import generate_layouts
+
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+
+
+def best_time(func, repeat):
+    """Return the best wall time of repeated calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="benchmark the ordering invariant of Plan")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for node_count in args.nodes:
+        current, desired = generate_layouts(node_count)
+        prev, new = System.decode_json(current, {}), System.decode_json(desired, {})
+
+        def update_plan():
+            with Task.op_id_scope():
+                return Plan.system_update_plan(prev, new)
+
+        with Task.op_id_scope():
+            merged = Plan.system_destruct_plan(prev)
+            merged.extend(Plan.system_construct_plan(new))
+        plan = update_plan()
+        planner = best_time(update_plan, args.repeat)
+        first_sort = best_time(lambda: merged.tasks.copy().sort(), args.repeat)
+        later_sort = best_time(lambda: plan.tasks.copy().sort(), args.repeat)
+        saved = first_sort + 3 * later_sort
+        results.append(
+            {
+                "nodes": node_count,
+                "tasks_before_removal": len(merged.tasks),
+                "tasks": len(plan.tasks),
+                "planner_ms": round(planner * 1000, 3),
+                "removed_sorts_ms": round(saved * 1000, 3),
+                "saved_ratio": round(saved / (planner + saved), 4),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
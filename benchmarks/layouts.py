@@ -0,0 +1,70 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Seeded synthetic layouts for benchmarks"""
+
+import random
+import uuid
+
+DEVICE_TYPES = ("memory", "storage", "gpu", "networkInterface")
+
+
+def _device_id(rng: random.Random) -> str:
+    """Create a reproducible device ID in UUID format"""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4)).upper()
+
+
+def generate_layouts(node_count: int, devices_per_node: int = 4, move_ratio: float = 0.1, seed: int = 0):
+    """Create a current layout and a desired layout in which part of the devices moved to other nodes
+
+    Args:
+        node_count (int): number of nodes
+        devices_per_node (int, optional): number of devices attached to each node. Defaults to 4.
+        move_ratio (float, optional): ratio of devices attached to another node in the desired layout.
+            Defaults to 0.1.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        tuple[dict, dict]: current layout and desired layout
+    """
+    rng = random.Random(seed)
+    cpus = [_device_id(rng) for _ in range(node_count)]
+    current = [{device_type: [] for device_type in DEVICE_TYPES} for _ in range(node_count)]
+    devices = []
+    for node_index in range(node_count):
+        for device_index in range(devices_per_node):
+            device_type = DEVICE_TYPES[device_index % len(DEVICE_TYPES)]
+            device_id = _device_id(rng)
+            current[node_index][device_type].append(device_id)
+            devices.append((node_index, device_type, device_id))
+
+    desired = [{device_type: list(ids) for device_type, ids in node.items()} for node in current]
+    for node_index, device_type, device_id in rng.sample(devices, int(len(devices) * move_ratio)):
+        destination = rng.randrange(node_count)
+        desired[node_index][device_type].remove(device_id)
+        desired[destination][device_type].append(device_id)
+
+    def layout(nodes):
+        return {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [cpu]},
+                        **{device_type: {"deviceIDs": ids} for device_type, ids in node.items() if ids},
+                    }
+                }
+                for cpu, node in zip(cpus, nodes)
+            ]
+        }
+
+    return layout(current), layout(desired)
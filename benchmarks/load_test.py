@@ -0,0 +1,265 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Latency and throughput of the REST server under concurrent requests
+
+Usage:
+    python benchmarks/load_test.py [--mix 100:8 1000:2] [--concurrency 1 8 32] [--requests 200]
+    python benchmarks/load_test.py --url http://host:8000    drive a server that is already running
+
+Unless --url is given, the server is started locally with uvicorn in a separate process, so that the clients
+do not compete with it for the GIL, and the load starts once /health/ready reports that it has warmed up.
+Each concurrency level sends --requests requests from that many clients, each sending its next request as soon
+as it has received the previous response. The layout sizes are drawn from the synthetic layout generator with
+the weights of --mix. Every size has --variants differently seeded layouts, so that concurrent requests are not
+all coalesced into one computation. The report is printed in JSON format.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+from layouts import generate_layouts
+
+from migration_procedure_generator.encoding import BINARY_MEDIA_TYPE
+from migration_procedure_generator.server import APP_IMPORT_STRING
+
+PATH = "/cdim/api/v1/migration-procedures"
+READY_TIMEOUT = 60
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(entry: str) -> tuple[int, float]:
+    """Parse an entry of the request mix
+
+    Args:
+        entry (str): number of nodes, optionally followed by a colon and the weight of the size
+
+    Returns:
+        tuple[int, float]: number of nodes and weight
+    """
+    nodes, _, weight = entry.partition(":")
+    return int(nodes), float(weight or 1)
+
+
+def build_payloads(mix: list, variants: int, move_ratio: float) -> dict:
+    """Serialize the request bodies once, so that the clients measure the server rather than json.dumps
+
+    Args:
+        mix (list[tuple[int, float]]): number of nodes and weight of each size
+        variants (int): number of differently seeded layouts of each size
+        move_ratio (float): ratio of devices attached to another node in the desired layout
+
+    Returns:
+        dict: list of request bodies by number of nodes
+    """
+    payloads = {}
+    for node_count, _ in mix:
+        payloads[node_count] = []
+        for seed in range(variants):
+            current, desired = generate_layouts(node_count, move_ratio=move_ratio, seed=seed)
+            body = {"currentLayout": current, "desiredLayout": desired}
+            payloads[node_count].append(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+    return payloads
+
+
+def free_port(host: str) -> int:
+    """Find a port that is not in use"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def start_server(host: str, port: int, workers: int) -> subprocess.Popen:
+    """Start the application with uvicorn and wait until it is ready
+
+    Args:
+        host (str): host to bind
+        port (int): port to bind
+        workers (int): number of uvicorn worker processes
+
+    Returns:
+        subprocess.Popen: server process
+    """
+    command = [sys.executable, "-m", "uvicorn", APP_IMPORT_STRING, "--host", host, "--port", str(port)]
+    command += ["--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command)  # pylint:disable=R1732
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            if httpx.get(f"http://{host}:{port}/health/ready").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server not ready within {READY_TIMEOUT} seconds")
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: list) -> dict:
+    """Latency distribution in milliseconds
+
+    Args:
+        latencies (list[float]): latencies in seconds
+
+    Returns:
+        dict: minimum, mean, percentiles and maximum
+    """
+    if not latencies:
+        return {}
+    values = sorted(latency * 1000 for latency in latencies)
+    summary = {"min": values[0], "mean": sum(values) / len(values)}
+    summary.update({f"p{percent}": percentile(values, percent) for percent in PERCENTILES})
+    summary["max"] = values[-1]
+    return {key: round(value, 3) for key, value in summary.items()}
+
+
+async def run_level(url: str, payloads: dict, mix: list, args, concurrency: int) -> dict:
+    """Send the requests of one concurrency level
+
+    Args:
+        url (str): URL of the migration procedure endpoint
+        payloads (dict): request bodies by number of nodes
+        mix (list[tuple[int, float]]): number of nodes and weight of each size
+        args (argparse.Namespace): command line arguments
+        concurrency (int): number of clients sending requests at the same time
+
+    Returns:
+        dict: latency distribution, throughput and errors of the level
+    """
+    rng = random.Random(args.seed)
+    sizes = rng.choices([nodes for nodes, _ in mix], weights=[weight for _, weight in mix], k=args.requests)
+    headers = {"Content-Type": "application/json", "Accept": args.accept, "Accept-Encoding": args.accept_encoding}
+    samples = []
+    statuses = Counter()
+    errors = Counter()
+    queue = iter(enumerate(sizes))
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for index, node_count in queue:
+            body = payloads[node_count][index % len(payloads[node_count])]
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, content=body, headers=headers)
+                await response.aread()
+            except httpx.HTTPError as err:
+                errors[type(err).__name__] += 1
+                continue
+            statuses[response.status_code] += 1
+            if response.is_success:
+                samples.append((node_count, time.perf_counter() - start))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    failed = args.requests - len(samples)
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 3),
+        "error_rate": round(failed / args.requests, 4),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "transport_errors": dict(errors),
+        "latency_ms": summarize([latency for _, latency in samples]),
+        "latency_ms_by_nodes": {
+            str(nodes): summarize([latency for size, latency in samples if size == nodes]) for nodes, _ in mix
+        },
+    }
+
+
+async def run(url: str, payloads: dict, mix: list, args) -> list:
+    """Send the warm-up requests and then the requests of every concurrency level"""
+    levels = []
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        for node_count, _ in mix:
+            for index in range(args.warmup):
+                body = payloads[node_count][index % len(payloads[node_count])]
+                await client.post(url, content=body, headers={"Content-Type": "application/json"})
+    for concurrency in args.concurrency:
+        levels.append(await run_level(url, payloads, mix, args, concurrency))
+    return levels
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="load test of the migration procedure endpoint")
+    parser.add_argument("--mix", nargs="+", default=["100:8", "1000:2"], help="NODES[:WEIGHT] of each layout size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests of each concurrency level")
+    parser.add_argument("--variants", type=int, default=8, help="differently seeded layouts of each size")
+    parser.add_argument("--move-ratio", type=float, default=0.1)
+    parser.add_argument("--accept", choices=["application/json", BINARY_MEDIA_TYPE], default="application/json")
+    parser.add_argument("--accept-encoding", default="identity")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests of each size before the load")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for a response")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the order of the request mix")
+    parser.add_argument("--url", help="base URL of a running server; by default one is started locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes of the local server")
+    parser.add_argument("--output", help="file to write the report to, instead of the standard output")
+    args = parser.parse_args()
+
+    mix = [parse_mix(entry) for entry in args.mix]
+    payloads = build_payloads(mix, args.variants, args.move_ratio)
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port(args.host)
+        process = start_server(args.host, port, args.workers)
+        base_url = f"http://{args.host}:{port}"
+    try:
+        levels = asyncio.run(run(base_url.rstrip("/") + PATH, payloads, mix, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "server": {"url": base_url, "local": process is not None, "workers": args.workers if process else None},
+        "mix": {str(nodes): weight for nodes, weight in mix},
+        "accept": args.accept,
+        "accept_encoding": args.accept_encoding,
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "levels": levels,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
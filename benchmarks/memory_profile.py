@@ -0,0 +1,207 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Peak and retained memory of each request phase for synthetic layouts
+
+Usage: python benchmarks/memory_profile.py [--nodes 100 1000 10000] [--devices-per-node 4] [--endpoint] [--json]
+
+Each phase is measured with tracemalloc while the results of the previous phases are kept alive, as they are
+while a request is handled. "peak" is the highest memory use above the start of the phase and "retained" is
+the memory still held by the result of the phase. Both are also reported per node and per device.
+
+After each request has completed, the live planner objects are counted with the garbage collector. Objects that
+are still alive are reported as leaks together with the allocation sites of the retained memory, and the script
+exits with status 1. With --endpoint the request is also sent through the FastAPI application so that the
+logging, the profiler hook and the response encoding are included.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from collections import Counter
+
+from layouts import generate_layouts
+
+from migration_procedure_generator.model import NodeLayout, convert_devicetype_lowercase
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import Node, System
+
+TRACKED_TYPES = (NodeLayout, System, Node, Plan, Task)
+LEAK_SITES = 5
+
+
+class PhaseMemory:
+    """Measure the memory of the phases of one request"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.records = []
+
+    def run(self, phase: str, func, *args, **kwargs):
+        """Run a phase and record its peak and retained memory
+
+        Args:
+            phase (str): phase name
+            func (Callable): phase body
+            *args: positional arguments of the phase body
+            **kwargs: keyword arguments of the phase body
+
+        Returns:
+            Any: return value of the phase body
+        """
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+        self.records.append({"phase": phase, "peak": peak - before, "retained": current - before})
+        return result
+
+
+def live_objects() -> Counter:
+    """Count the live instances of the request and planner classes
+
+    Returns:
+        Counter: class name and number of instances
+    """
+    gc.collect()
+    return Counter(type(obj).__name__ for obj in gc.get_objects() if isinstance(obj, TRACKED_TYPES))
+
+
+def profile_phases(body: bytes) -> list:
+    """Handle one request phase by phase, in the same order as the endpoint
+
+    Args:
+        body (bytes): request body
+
+    Returns:
+        list: phase records
+    """
+    memory = PhaseMemory()
+    request = memory.run("request JSON", json.loads, body)
+    memory.run("convert_devicetype_lowercase", lambda: [convert_devicetype_lowercase(request[key]) for key in request])
+    nodelayout = memory.run("NodeLayout", NodeLayout, **request)
+    bound_devices_map = nodelayout.desiredLayout.get("boundDevices", {})
+    prev = memory.run("System current", System.decode_json, nodelayout.currentLayout, bound_devices_map)
+    new = memory.run("System desired", System.decode_json, nodelayout.desiredLayout, bound_devices_map)
+    with Task.op_id_scope():
+        plan = memory.run("Task graph", Plan.system_update_plan, prev, new)
+    procedures = memory.run("encode_json", plan.encode_json)
+    memory.run("response body", lambda: json.dumps(procedures, separators=(",", ":")).encode("utf-8"))
+    return memory.records
+
+
+def profile_endpoint(body: bytes, client) -> None:
+    """Send one request through the FastAPI application
+
+    Args:
+        body (bytes): request body
+        client (TestClient): client of the application
+    """
+    response = client.post(
+        "/cdim/api/v1/migration-procedures", content=body, headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+
+
+def check_leaks(name: str, func, *args) -> list:
+    """Run a request twice and report what the second run left behind.
+    The first run warms up caches, imports and logging so that they are not reported.
+
+    Args:
+        name (str): request name
+        func (Callable): request
+        *args: arguments of the request
+
+    Returns:
+        list: leaks, each a dict with the class counts and the retained bytes
+    """
+    func(*args)
+    before_objects = live_objects()
+    before = tracemalloc.take_snapshot()
+    func(*args)
+    remaining = live_objects() - before_objects
+    after = tracemalloc.take_snapshot()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    if not remaining:
+        return []
+    own_frames = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(own_frames).compare_to(before.filter_traces(own_frames), "lineno")
+    sites = [str(stat) for stat in stats[:LEAK_SITES]]
+    return [{"request": name, "objects": dict(remaining), "retained": retained, "sites": sites}]
+
+
+def per_unit(size: int, count: int) -> float:
+    """Bytes per node or per device"""
+    return round(size / count, 1) if count else 0.0
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="profile the memory of each request phase")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--devices-per-node", type=int, default=4)
+    parser.add_argument("--endpoint", action="store_true", help="also check requests sent through the application")
+    parser.add_argument("--json", action="store_true", help="print the report in JSON format")
+    args = parser.parse_args()
+
+    client = None
+    if args.endpoint:
+        from fastapi.testclient import TestClient  # pylint:disable=C0415
+
+        from migration_procedure_generator.server import app  # pylint:disable=C0415
+
+        client = TestClient(app)
+
+    tracemalloc.start()
+    report, leaks = [], []
+    for node_count in args.nodes:
+        current, desired = generate_layouts(node_count, devices_per_node=args.devices_per_node)
+        body = json.dumps({"currentLayout": current, "desiredLayout": desired}).encode("utf-8")
+        device_count = node_count * args.devices_per_node
+        for record in profile_phases(body):
+            record.update(
+                nodes=node_count,
+                peak_per_node=per_unit(record["peak"], node_count),
+                peak_per_device=per_unit(record["peak"], device_count),
+                retained_per_node=per_unit(record["retained"], node_count),
+                retained_per_device=per_unit(record["retained"], device_count),
+            )
+            report.append(record)
+        leaks.extend(check_leaks(f"phases, {node_count} nodes", profile_phases, body))
+        if client:
+            leaks.extend(check_leaks(f"endpoint, {node_count} nodes", profile_endpoint, body, client))
+    tracemalloc.stop()
+
+    if args.json:
+        print(json.dumps({"phases": report, "leaks": leaks}, indent=2))
+    else:
+        header = f"{'nodes':>7}  {'phase':<30}{'peak KiB':>12}{'B/node':>10}{'B/device':>10}"
+        print(f"{header}{'retained KiB':>14}{'B/node':>10}")
+        for record in report:
+            print(
+                f"{record['nodes']:>7}  {record['phase']:<30}{record['peak'] / 1024:>12.1f}"
+                f"{record['peak_per_node']:>10.0f}{record['peak_per_device']:>10.0f}"
+                f"{record['retained'] / 1024:>14.1f}{record['retained_per_node']:>10.0f}"
+            )
+        for leak in leaks:
+            print(f"\nObjects still alive after the request ({leak['request']}): {leak['objects']}")
+            print(f"  retained {leak['retained']} bytes, largest allocation sites:", *leak["sites"], sep="\n    ")
+    if leaks:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Performance regression gate of the planner on seeded large layouts
+
+Usage:
+    python benchmarks/regression_gate.py                 compare with benchmarks/baseline.json
+    python benchmarks/regression_gate.py --update        rewrite the baseline from this machine
+    python benchmarks/regression_gate.py --nodes 1000    run only some of the layout sizes
+
+Wall time is the best of several runs, timed with the garbage collector disabled as timeit does, since a full
+collection lands in a different phase from run to run; peak memory is measured by tracemalloc in a separate run
+so that tracing does not distort the timings. Exits with status 1 when a budget is exceeded.
+The time budget of a phase is its baseline increased by the relative "time" tolerance plus the absolute "slack"
+in seconds, since a few milliseconds of scheduling noise would exceed the relative budget of the shortest phases.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from layouts import generate_layouts
+
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+from migration_procedure_generator.tracing import PhaseTimer
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_NODES = [1000, 10000, 50000]
+SEED = 20250101
+# Network interfaces are hot-pluggable, so that remove_hotplug_power_cycles keeps the nodes whose only changes
+# are network interfaces running.
+HOTPLUG_TYPES = ["networkInterface"]
+# At most a tenth of the nodes may be offline at the same time, so that limit_offline_nodes is timed as well.
+OFFLINE_RATIO = 0.1
+
+
+def run_pipeline(current: dict, desired: dict, max_offline: int) -> dict:
+    """Decode the layouts, create the migration procedure and encode it
+
+    Args:
+        current (dict): current layout
+        desired (dict): desired layout
+        max_offline (int): maximum number of nodes offline at the same time
+
+    Returns:
+        dict: phase name and elapsed seconds
+    """
+    timer = PhaseTimer()
+    with Task.op_id_scope():
+        start = time.perf_counter()
+        prev, new = System.decode_json(current, {}), System.decode_json(desired, {})
+        decoded = time.perf_counter()
+        plan = Plan.system_update_plan(prev, new, hooks=[timer], hotplug_types=HOTPLUG_TYPES, max_offline=max_offline)
+        planned = time.perf_counter()
+        plan.encode_json()
+        encoded = time.perf_counter()
+    phases = {"decode": decoded - start}
+    phases.update({record.phase: record.elapsed for record in timer.records})
+    phases["encode_json"] = encoded - planned
+    phases["total"] = encoded - start
+    return phases
+
+
+def measure(node_count: int, repeat: int) -> dict:
+    """Measure the wall time of each phase and the peak memory for one layout size
+
+    Args:
+        node_count (int): number of nodes
+        repeat (int): number of timed runs
+
+    Returns:
+        dict: phase timings in seconds and peak memory in bytes
+    """
+    current, desired = generate_layouts(node_count, seed=SEED)
+    max_offline = max(int(node_count * OFFLINE_RATIO), 2)
+    runs = []
+    for _ in range(repeat):
+        layouts = json.loads(json.dumps(current)), json.loads(json.dumps(desired))
+        gc.collect()
+        gc.disable()
+        try:
+            runs.append(run_pipeline(*layouts, max_offline))
+        finally:
+            gc.enable()
+    phases = {phase: min(run[phase] for run in runs) for phase in runs[0]}
+
+    tracemalloc.start()
+    run_pipeline(current, desired, max_offline)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"phases": phases, "peak_memory": peak}
+
+
+def compare(node_count: int, measured: dict, baseline: dict, tolerance: dict) -> list:
+    """Compare measurements with the baseline and print a per-phase report
+
+    Args:
+        node_count (int): number of nodes
+        measured (dict): measurements
+        baseline (dict): baseline of the same layout size
+        tolerance (dict): allowed relative increase of "time" and "memory",
+            and "slack", the seconds allowed on top of the relative time budget
+
+    Returns:
+        list: exceeded budgets
+    """
+    failures = []
+    print(f"== {node_count} nodes ==")
+    print(f"{'phase':<32}{'baseline':>12}{'measured':>12}{'change':>10}{'budget':>10}")
+    for phase, elapsed in measured["phases"].items():
+        expected = baseline["phases"].get(phase)
+        if expected is None:
+            print(f"{phase:<32}{'-':>12}{elapsed:>12.4f}{'new':>10}{'-':>10}")
+            continue
+        change = (elapsed - expected) / expected if expected else 0.0
+        budget = expected * (1 + tolerance["time"]) + tolerance.get("slack", 0.0)
+        exceeded = elapsed > budget
+        mark = "  FAIL" if exceeded else ""
+        print(f"{phase:<32}{expected:>12.4f}{elapsed:>12.4f}{change:>+10.1%}{budget:>10.4f}{mark}")
+        if exceeded:
+            failures.append(f"{node_count} nodes: {phase} took {elapsed:.4f}s, budget {budget:.4f}s")
+    expected, peak = baseline["peak_memory"], measured["peak_memory"]
+    exceeded = peak > expected * (1 + tolerance["memory"])
+    mark = "  FAIL" if exceeded else ""
+    change = (peak - expected) / expected
+    print(
+        f"{'peak memory (MiB)':<32}{expected / 2**20:>12.1f}{peak / 2**20:>12.1f}{change:>+10.1%}"
+        f"{tolerance['memory']:>+10.0%}{mark}"
+    )
+    if exceeded:
+        failures.append(f"{node_count} nodes: peak memory {peak} bytes, budget {expected} bytes")
+    return failures
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="performance regression gate of the planner")
+    parser.add_argument("--nodes", type=int, nargs="+", default=DEFAULT_NODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update", action="store_true", help="write the measurements as the new baseline")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+
+    failures = []
+    for node_count in args.nodes:
+        measured = measure(node_count, args.repeat)
+        if args.update:
+            baseline["layouts"][str(node_count)] = measured
+            print(f"{node_count} nodes: {json.dumps(measured)}")
+        elif str(node_count) not in baseline["layouts"]:
+            failures.append(f"{node_count} nodes: no baseline, run with --update")
+        else:
+            failures.extend(compare(node_count, measured, baseline["layouts"][str(node_count)], baseline["tolerance"]))
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2)
+            fh.write("\n")
+    if failures:
+        print("\nPerformance budget exceeded:", *failures, sep="\n  ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
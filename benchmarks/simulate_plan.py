@@ -0,0 +1,127 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Wall time of executing a generated migration procedure at a given level of parallelism
+
+Usage:
+    python benchmarks/simulate_plan.py [--nodes 100] [--workers 1 8 32] [--time-scale 0.01]
+    python benchmarks/simulate_plan.py --latency boot=120 shutdown=30 --failure-rate connect=0.01 --http
+
+The migration procedure of a synthetic layout is executed on a thread pool that dispatches each operation as soon
+as its dependencies have completed. The operations are executed by a mock operation service whose latencies
+default to the durations of the configuration file and are multiplied by --time-scale, so that operations of
+minutes are simulated in fractions of a second. With --http, the operations are posted to a local HTTP stand-in
+of the service over pooled connections, so that the overhead of the requests is included.
+The report is printed in JSON format. Times are in simulated seconds, that is divided by --time-scale.
+"""
+
+import argparse
+import json
+import sys
+
+from layouts import generate_layouts
+
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.setting import MigrationConfigReader
+from migration_procedure_generator.simulation import (
+    OperationClient,
+    OperationService,
+    OperationServiceStandIn,
+    PlanExecutor,
+    critical_path_time,
+)
+from migration_procedure_generator.system import System
+
+
+def parse_assignments(entries: list, value_type) -> dict:
+    """Parse OPERATION=VALUE entries
+
+    Args:
+        entries (list[str]): entries
+        value_type (type): type of the values
+
+    Returns:
+        dict: operation and value
+    """
+    pairs = (entry.partition("=") for entry in entries or [])
+    return {operation: value_type(value) for operation, _, value in pairs}
+
+
+def scaled(report: dict, time_scale: float) -> dict:
+    """Convert the times of a report to simulated seconds
+
+    Args:
+        report (dict): encoded execution report
+        time_scale (float): factor applied to the latencies
+
+    Returns:
+        dict: report with the times divided by time_scale
+    """
+    report["wallTime"] = round(report["wallTime"] / time_scale, 3)
+    report["criticalPath"] = round(report["criticalPath"] / time_scale, 3)
+    report["criticalPathUtilization"] = round(report["criticalPathUtilization"], 4)
+    report["concurrency"]["mean"] = round(report["concurrency"]["mean"], 3)
+    for point in report["concurrency"].get("timeline", []):
+        point["time"] = round(point["time"] / time_scale, 3)
+    return report
+
+
+def main():
+    """entry point"""
+    parser = argparse.ArgumentParser(description="simulate the execution of a migration procedure")
+    parser.add_argument("--nodes", type=int, default=100, help="number of nodes of the synthetic layouts")
+    parser.add_argument("--move-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32], help="concurrent operations")
+    parser.add_argument("--latency", nargs="+", help="OPERATION=SECONDS, by default the configured durations")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="factor applied to the latencies")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum relative deviation of each latency")
+    parser.add_argument("--failure-rate", nargs="+", help="OPERATION=PROBABILITY of a failure")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the layouts, the jitter and the failures")
+    parser.add_argument("--http", action="store_true", help="post the operations to a local HTTP stand-in")
+    parser.add_argument("--timeline", action="store_true", help="include the running operations over time")
+    args = parser.parse_args()
+
+    current, desired = generate_layouts(args.nodes, move_ratio=args.move_ratio, seed=args.seed)
+    with Task.op_id_scope():
+        plan = Plan.system_update_plan(System.decode_json(current, {}), System.decode_json(desired, {}))
+    latencies = {**MigrationConfigReader().durations_config, **parse_assignments(args.latency, float)}
+    failure_rates = parse_assignments(args.failure_rate, float)
+
+    results = []
+    for workers in args.workers:
+        service = OperationService(latencies, args.time_scale, args.jitter, failure_rates, seed=args.seed)
+        if args.http:
+            with OperationServiceStandIn(service) as stand_in:
+                client = OperationClient(stand_in.url, connections=workers)
+                report = PlanExecutor(client, workers).run(plan)
+                client.close()
+        else:
+            report = PlanExecutor(service, workers).run(plan)
+        results.append(scaled(report.encode_json(timeline=args.timeline), args.time_scale))
+
+    expected = {task.op_id: service.latencies[task.operation] for task in plan.tasks}
+    report = {
+        "nodes": args.nodes,
+        "operations": len(plan.tasks),
+        "latencies": service.latencies,
+        "time_scale": args.time_scale,
+        "transport": "http" if args.http else "in-process",
+        "expected_critical_path": critical_path_time(plan, expected),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,22 @@ def lint(session):
 def tests(session):
     """conduct testing"""
     session.run("pdm", "run", "pytest")
+
+
+@nox.session(python=False)
+def benchmark(session):
+    """measure the responses and the planner for synthetic large plans"""
+    session.run("pdm", "run", "python", "benchmarks/bench_compression.py")
+    session.run("pdm", "run", "python", "benchmarks/bench_plan_order.py")
+
+
+@nox.session(python=False)
+def perf(session):
+    """check the planner against the wall time and memory budgets in benchmarks/baseline.json"""
+    session.run("pdm", "run", "python", "benchmarks/regression_gate.py", *session.posargs)
+
+
+@nox.session(python=False)
+def memory(session):
+    """report the memory of each request phase and the objects left alive after a request"""
+    session.run("pdm", "run", "python", "benchmarks/memory_profile.py", "--endpoint", *session.posargs)
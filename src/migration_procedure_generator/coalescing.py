@@ -0,0 +1,105 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Coalescing of identical concurrent requests into a single computation"""
+
+import hashlib
+import json
+import threading
+
+
+def canonical_hash(*values) -> str:
+    """Hash JSON-compatible values independently of the order of their object keys
+
+    Args:
+        *values: values to hash
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    canonical = json.dumps(values, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """Computation shared by the requests with the same key"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run a function once for concurrent calls with the same key and share its result.
+    A call that arrives after the computation has finished starts a new one, so results are never cached.
+    """
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.computations = 0
+        self.coalesced = 0
+
+    def run(self, key: str, func, *args):
+        """Call the function, or wait for the call with the same key that is already in flight
+
+        Args:
+            key (str): key of identical calls
+            func (Callable): function to call
+            *args: arguments of the function
+
+        Returns:
+            Any: return value of the function. The exception raised by the function is raised in every caller.
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computations += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                call.result = func(*args)
+            except Exception as err:
+                call.error = err
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def encode_json(self) -> dict:
+        """Encode the counters in JSON format
+
+        Returns:
+            dict: number of requests, of computations and of requests that shared another computation
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "computations": self.computations,
+                "coalesced": self.coalesced,
+                "inFlight": len(self._calls),
+            }
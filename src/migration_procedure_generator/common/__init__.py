@@ -14,7 +14,7 @@
 # License for the specific language governing permissions and limitations
 #  under the License.
 
-from .api import BaseApiClient  # NOQA: F401; pragma: no cover
+from .api import AsyncBaseApiClient, BaseApiClient  # NOQA: F401; pragma: no cover
 from .cli import AbstractBaseCommandLine  # NOQA: F401; pragma: no cover
 from .config import BaseConfig  # NOQA: F401; pragma: no cover
 from .dateutil import get_now, get_str_now  # NOQA: F401; pragma: no cover
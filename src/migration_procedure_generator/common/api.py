@@ -13,18 +13,191 @@
 #  under the License.
 """API-related packages"""
 
+import asyncio
+import contextlib
 import json
+from collections.abc import Iterator
 from typing import Any
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Methods retried by default, as they can be sent more than once without changing the result
+IDEMPOTENT_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"])
+RETRY_STATUSES = (502, 503, 504)
+BACKOFF_MAX = 120
+
+
+def backoff_time(backoff_factor: float, retry_number: int) -> float:
+    """Return the time to wait before a retry, with the formula of urllib3:
+    no wait before the first retry and backoff_factor * 2 ** (n - 1) seconds before the n-th, up to BACKOFF_MAX.
+
+    Args:
+        backoff_factor (float): The backoff factor.
+        retry_number (int): The number of the retry, starting from 1.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    if retry_number <= 1:
+        return 0.0
+    return min(BACKOFF_MAX, backoff_factor * 2 ** (retry_number - 1))
+
+
+def is_stream(data: Any) -> bool:
+    """Check whether a request body is an iterable of chunks, such as a generator, to be streamed.
+
+    Args:
+        data (Any): Request body.
+
+    Returns:
+        bool: true or false
+    """
+    return not isinstance(data, (str, bytes, bytearray, dict, list, tuple)) and (
+        hasattr(data, "__iter__") or hasattr(data, "__aiter__")
+    )
+
+
+def json_chunks(data: Any, chunk_size: int = 65536, depth: int = 2) -> Iterator[bytes]:
+    """Encode JSON-compatible data in compact JSON format in chunks, to stream it as a request body
+    without building the whole document in memory. The objects and arrays down to the given depth are split into
+    their members, which are each encoded by json.dumps.
+
+    Args:
+        data (Any): JSON-compatible data.
+        chunk_size (int, optional): Minimum size in bytes of the chunks but the last. Defaults to 65536.
+        depth (int, optional): Levels of objects and arrays split into their members. Defaults to 2.
+
+    Yields:
+        bytes: JSON text encoded in UTF-8.
+    """
+    buffer = []
+    size = 0
+    for piece in _json_pieces(data, depth):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _json_pieces(data: Any, depth: int) -> Iterator[str]:
+    """Encode JSON-compatible data in compact JSON format in pieces, see json_chunks.
+
+    Args:
+        data (Any): JSON-compatible data.
+        depth (int): Levels of objects and arrays split into their members.
+
+    Yields:
+        str: JSON text.
+    """
+    if depth > 0 and isinstance(data, (list, tuple)):
+        yield "["
+        for index, item in enumerate(data):
+            if index:
+                yield ","
+            yield from _json_pieces(item, depth - 1)
+        yield "]"
+    elif depth > 0 and isinstance(data, dict) and all(isinstance(key, str) for key in data):
+        yield "{"
+        for index, (key, value) in enumerate(data.items()):
+            yield ("," if index else "") + json.dumps(key) + ":"
+            yield from _json_pieces(value, depth - 1)
+        yield "}"
+    else:
+        yield json.dumps(data, separators=(",", ":"))
 
 
 class BaseApiClient:
     """Base class for executing API requests"""
 
-    def __init__(self) -> None:
-        """Constructor"""
-        self.session = requests.session()
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        max_connections_per_host: int | None = None,
+        keep_alive: bool = True,
+        retries: int = 0,
+        backoff_factor: float = 0.5,
+        retry_statuses: tuple = RETRY_STATUSES,
+    ) -> None:
+        """Constructor
+
+        Args:
+            pool_connections (int, optional): Number of hosts whose connections are pooled. Defaults to 10.
+            pool_maxsize (int, optional): Connections kept alive for each host. Defaults to 10.
+            max_connections_per_host (int | None, optional): Connections open at the same time to each host.
+                Further requests wait for a free connection. Defaults to None, which opens as many connections
+                as needed and keeps pool_maxsize of them.
+            keep_alive (bool, optional): Reuse the connections for the following requests. Defaults to True.
+            retries (int, optional): Retries of the requests that fail to connect, and of the requests with
+                an idempotent method and a body other than a stream that time out or respond with one of
+                retry_statuses. Defaults to 0.
+            backoff_factor (float, optional): Backoff factor between the retries, see backoff_time.
+                Defaults to 0.5.
+            retry_statuses (tuple, optional): Response status codes that are retried. Defaults to RETRY_STATUSES.
+        """
+        pool = {
+            "pool_connections": pool_connections,
+            "pool_maxsize": max_connections_per_host or pool_maxsize,
+            "pool_block": max_connections_per_host is not None,
+        }
+        retry = Retry(
+            total=retries,
+            read=retries if retries else False,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, **pool)
+        self.session = self._new_session(adapter, keep_alive)
+        # A streamed body is consumed by the first attempt, so a request with one is only retried when it fails
+        # to connect, before any of the body has been sent. Its adapter shares the connection pools of the other,
+        # so that max_connections_per_host limits the connections of both.
+        stream_adapter = HTTPAdapter(max_retries=Retry(total=retries, read=False, backoff_factor=backoff_factor))
+        stream_adapter.poolmanager = adapter.poolmanager
+        stream_adapter.proxy_manager = adapter.proxy_manager
+        self._stream_session = self._new_session(stream_adapter, keep_alive)
+
+    @staticmethod
+    def _new_session(adapter: HTTPAdapter, keep_alive: bool) -> requests.Session:
+        """Create a session sending the requests through an adapter.
+
+        Args:
+            adapter (HTTPAdapter): The adapter with the connection pool and the retry policy.
+            keep_alive (bool): Reuse the connections for the following requests.
+
+        Returns:
+            requests.Session: Session.
+        """
+        session = requests.session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+        self._stream_session.close()
+
+    def _session_for(self, data: Any) -> requests.Session:
+        """Return the session that sends a request body.
+
+        Args:
+            data (Any): Request body, after _modify_data_and_header.
+
+        Returns:
+            requests.Session: The session whose retries do not replay a streamed body.
+        """
+        return self._stream_session if is_stream(data) else self.session
 
     def _get(
         self,
@@ -55,6 +228,7 @@ class BaseApiClient:
         data: Any = None,
         timeout_sec: int = 30,
         headers: dict = None,
+        content_type: str | None = None,
     ):
         """Execute the post method of the requests library and return the request result.
         If the content-type of data corresponds to application/json, this will be added to the headers.
@@ -66,11 +240,12 @@ class BaseApiClient:
             data (dict, optional): Set the request body. Defaults to None.
             timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
             headers (dict, optional): Header information. Defaults to None.
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header.
         Returns:
             requests.Response: Response.
         """
-        headers, data = self._modify_data_and_header(headers, data)
-        response = self.session.post(url, params=params, data=data, timeout=timeout_sec, headers=headers)
+        headers, data = self._modify_data_and_header(headers, data, content_type)
+        response = self._session_for(data).post(url, params=params, data=data, timeout=timeout_sec, headers=headers)
         return response
 
     def _put(
@@ -80,6 +255,7 @@ class BaseApiClient:
         data: dict = None,
         timeout_sec: int = 30,
         headers: dict = None,
+        content_type: str | None = None,
     ):
         """Execute the put method of the requests library and return the request result.
         If the content-type of data corresponds to application/json, add the above to the header.
@@ -90,12 +266,13 @@ class BaseApiClient:
             data (dict, optional): Set the request body. Defaults to None
             timeout_sec (int, optional): Timeout in seconds. Defaults to 30
             headers (dict, optional): Header information. Defaults to None
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header
 
         Returns:
             requests.Response: Response
         """
-        headers, data = self._modify_data_and_header(headers, data)
-        response = self.session.put(url, params=params, data=data, timeout=timeout_sec, headers=headers)
+        headers, data = self._modify_data_and_header(headers, data, content_type)
+        response = self._session_for(data).put(url, params=params, data=data, timeout=timeout_sec, headers=headers)
         return response
 
     def _delete(
@@ -105,6 +282,7 @@ class BaseApiClient:
         data: dict = None,
         timeout_sec: int = 30,
         headers: dict = None,
+        content_type: str | None = None,
     ):
         """Execute the delete method of the requests library and return the request results.
         If the content-type of the data matches application/json, add the aforementioned to the header.
@@ -115,24 +293,42 @@ class BaseApiClient:
             data (dict, optional): Set the request body. Defaults to None.
             timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
             headers (dict, optional): Header information. Defaults to None.
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header.
 
         Returns:
             requests.Response: Response
         """
-        headers, data = self._modify_data_and_header(headers, data)
-        response = self.session.delete(url, params=params, data=data, timeout=timeout_sec, headers=headers)
+        headers, data = self._modify_data_and_header(headers, data, content_type)
+        response = self._session_for(data).delete(url, params=params, data=data, timeout=timeout_sec, headers=headers)
         return response
 
-    def _modify_data_and_header(self, headers: Any, data: Any) -> tuple[Any, Any]:
-        """Correct the appropriate data and headers for the data to be sent in application/json.
+    def _modify_data_and_header(self, headers: Any, data: Any, content_type: str | None = None) -> tuple[Any, Any]:
+        """Correct the appropriate data and headers for the data to be sent.
+        The content type is given by content_type, otherwise by the Content-Type header. A dict is then converted
+        to JSON only if the content type is JSON, and the other data are sent as they are. Only when neither is
+        given, a dict is converted to JSON and a str is parsed to find out whether "Content-Type": "application/json"
+        is added. To send a large body without copying or parsing it, pass a content type with bytes, or with an
+        iterable of bytes, such as json_chunks, which is streamed with chunked transfer encoding.
 
         Args:
             headers (Any): Request headers
             data (Any): Request body
+            content_type (str | None, optional): Content type of the request body. Defaults to None.
 
         Returns:
             tuple[Any, Any]: Correctly adjusted data and headers
         """
+        declared = content_type or next(
+            (value for key, value in (headers or {}).items() if key.lower() == "content-type"), None
+        )
+        if declared is not None:
+            if content_type is not None:
+                headers = {key: value for key, value in (headers or {}).items() if key.lower() != "content-type"}
+                headers["Content-Type"] = content_type
+            media_type = declared.split(";")[0].strip().lower()
+            if isinstance(data, dict) and (media_type == "application/json" or media_type.endswith("+json")):
+                data = json.dumps(data)
+            return headers, data
 
         # In the case of a dict type, convert it to JSON and add "Content-Type": "application/json".
         add_header = {"Content-Type": "application/json"}
@@ -155,3 +351,238 @@ class BaseApiClient:
             headers = {**headers, **add_header}
 
         return headers, data
+
+
+class AsyncBaseApiClient:
+    """Base class for executing API requests from asyncio, with the same methods as BaseApiClient as coroutines.
+    It requires httpx.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        max_connections_per_host: int | None = None,
+        keep_alive: bool = True,
+        retries: int = 0,
+        backoff_factor: float = 0.5,
+        retry_statuses: tuple = RETRY_STATUSES,
+    ) -> None:
+        """Constructor
+
+        Args:
+            max_connections (int, optional): Connections open at the same time to all hosts. Defaults to 100.
+            max_keepalive_connections (int, optional): Idle connections kept alive. Defaults to 20.
+            max_connections_per_host (int | None, optional): Requests sent at the same time to each host.
+                Further requests wait for one of them to complete. Defaults to None, which sets no limit.
+            keep_alive (bool, optional): Reuse the connections for the following requests. Defaults to True.
+            retries (int, optional): Retries of the requests with an idempotent method that fail to connect,
+                time out or respond with one of retry_statuses. Defaults to 0.
+            backoff_factor (float, optional): Backoff factor between the retries, see backoff_time.
+                Defaults to 0.5.
+            retry_statuses (tuple, optional): Response status codes that are retried. Defaults to RETRY_STATUSES.
+        """
+        import httpx  # pylint: disable=C0415
+
+        self._httpx = httpx
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections if keep_alive else 0,
+        )
+        self.client = httpx.AsyncClient(limits=limits)
+        self.max_connections_per_host = max_connections_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = retry_statuses
+        self._host_limits = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+    async def _get(
+        self,
+        url: str,
+        params: dict = None,
+        timeout_sec: int = 30,
+        headers: dict = None,
+    ):
+        """Send a GET request and return the response.
+
+        Args:
+            url (str): The URL to which the request is sent.
+            params (dict, optional): Query parameters. Defaults to None.
+            timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
+            headers (dict, optional): Header information. Defaults to None.
+
+        Returns:
+            httpx.Response: Response
+        """
+        return await self._request("GET", url, params, None, timeout_sec, headers)
+
+    async def _post(
+        self,
+        url: str,
+        params: dict = None,
+        data: Any = None,
+        timeout_sec: int = 30,
+        headers: dict = None,
+        content_type: str | None = None,
+    ):
+        """Send a POST request and return the response.
+        If the content-type of data corresponds to application/json, this will be added to the headers.
+
+        Args:
+            url (str): The URL to which the request is sent.
+            params (dict, optional): Query parameters. Defaults to None.
+            data (Any, optional): Request body. Defaults to None.
+            timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
+            headers (dict, optional): Header information. Defaults to None.
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header.
+
+        Returns:
+            httpx.Response: Response
+        """
+        return await self._request("POST", url, params, data, timeout_sec, headers, content_type)
+
+    async def _put(
+        self,
+        url: str,
+        params: dict = None,
+        data: Any = None,
+        timeout_sec: int = 30,
+        headers: dict = None,
+        content_type: str | None = None,
+    ):
+        """Send a PUT request and return the response.
+        If the content-type of data corresponds to application/json, this will be added to the headers.
+
+        Args:
+            url (str): The URL to which the request is sent.
+            params (dict, optional): Query parameters. Defaults to None.
+            data (Any, optional): Request body. Defaults to None.
+            timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
+            headers (dict, optional): Header information. Defaults to None.
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header.
+
+        Returns:
+            httpx.Response: Response
+        """
+        return await self._request("PUT", url, params, data, timeout_sec, headers, content_type)
+
+    async def _delete(
+        self,
+        url: str,
+        params: dict = None,
+        data: Any = None,
+        timeout_sec: int = 30,
+        headers: dict = None,
+        content_type: str | None = None,
+    ):
+        """Send a DELETE request and return the response.
+        If the content-type of data corresponds to application/json, this will be added to the headers.
+
+        Args:
+            url (str): The URL to which the request is sent.
+            params (dict, optional): Query parameters. Defaults to None.
+            data (Any, optional): Request body. Defaults to None.
+            timeout_sec (int, optional): Timeout in seconds. Defaults to 30.
+            headers (dict, optional): Header information. Defaults to None.
+            content_type (str | None, optional): Content type of data. Defaults to None, see _modify_data_and_header.
+
+        Returns:
+            httpx.Response: Response
+        """
+        return await self._request("DELETE", url, params, data, timeout_sec, headers, content_type)
+
+    _modify_data_and_header = BaseApiClient._modify_data_and_header
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: dict,
+        data: Any,
+        timeout_sec: int,
+        headers: dict,
+        content_type: str | None = None,
+    ):
+        """Send a request within the limit of its host and retry it as BaseApiClient does:
+        a request that fails to connect is retried whatever its method and body, one that times out or responds with
+        one of retry_statuses only if its method is idempotent and its body is not a stream.
+
+        Args:
+            method (str): HTTP method.
+            url (str): The URL to which the request is sent.
+            params (dict): Query parameters.
+            data (Any): Request body.
+            timeout_sec (int): Timeout in seconds.
+            headers (dict): Header information.
+            content_type (str | None, optional): Content type of data. Defaults to None.
+
+        Returns:
+            httpx.Response: Response. The last response when the retries are exhausted.
+
+        Raises:
+            httpx.TransportError: The request failed, and the retries are exhausted or do not apply.
+        """
+        headers, data = self._modify_data_and_header(headers, data, content_type)
+        stream = is_stream(data)
+        if stream and not hasattr(data, "__aiter__"):
+            data = _aiter(data)
+        body = {"content": data} if stream or isinstance(data, (str, bytes)) else {"data": data}
+        idempotent = method in IDEMPOTENT_METHODS and not stream
+        retry_number = 0
+        while True:
+            try:
+                async with self._host_limit(url):
+                    response = await self.client.request(
+                        method, url, params=params, headers=headers, timeout=timeout_sec, **body
+                    )
+            except (self._httpx.ConnectError, self._httpx.ConnectTimeout):
+                if retry_number >= self.retries:
+                    raise
+            except self._httpx.TransportError:
+                if not idempotent or retry_number >= self.retries:
+                    raise
+            else:
+                if not idempotent or response.status_code not in self.retry_statuses or retry_number >= self.retries:
+                    return response
+                await response.aclose()
+            retry_number += 1
+            await asyncio.sleep(backoff_time(self.backoff_factor, retry_number))
+
+    def _host_limit(self, url: str):
+        """Return the semaphore limiting the requests sent at the same time to the host of a URL.
+
+        Args:
+            url (str): The URL to which the request is sent.
+
+        Returns:
+            asyncio.Semaphore | contextlib.nullcontext: Semaphore of the host, or a null context without limit.
+        """
+        if self.max_connections_per_host is None:
+            return contextlib.nullcontext()
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+
+
+async def _aiter(iterable):
+    """Iterate over the chunks of a streamed body from asyncio, as httpx.AsyncClient requires.
+
+    Args:
+        iterable (Iterable[bytes]): Chunks.
+
+    Yields:
+        bytes: Chunk.
+    """
+    for chunk in iterable:
+        yield chunk
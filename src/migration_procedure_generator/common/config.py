@@ -13,31 +13,99 @@
 #  under the License.
 "Configuration File Related Packages"
 
+import os
+import pathlib
+import threading
 from importlib import resources
 
 import yaml
 
 
 class BaseConfig:
-    "Base class for configuration files"
+    """Base class for configuration files.
+    The configuration is read and validated once per process and class, and read again when the modification time
+    or the size of the file changes.
+    """
 
-    def __init__(self, package: str, file_name: str) -> None:
+    # Validated configurations by class and file, with the modification time and size they were read at
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, package: str, file_name: str, env_var: str | None = None) -> None:
         """Constructor
 
         Args:
             package (str): The name of the package where the resources are located.
             file_name (str): The file name of the resource to be loaded.
+            env_var (str | None, optional): The name of an environment variable that holds the path of an external
+                configuration file to be loaded instead of the resource. Defaults to None.
         """
-        self._config = self._read_yaml(package, file_name)
+        path = os.environ.get(env_var) if env_var else None
+        source = pathlib.Path(path) if path else resources.files(package).joinpath(file_name)
+        self._config = self._load(source)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Discard the cached configurations, so that the files are read again by the next constructors."""
+        with BaseConfig._cache_lock:
+            BaseConfig._cache.clear()
 
-    def _read_yaml(self, pacakge: str, file_name: str):
-        """Load a YAML format configuration file added as a resource.
+    def _load(self, source) -> dict:
+        """Return the cached configuration, or read and validate the file if it is not cached or has changed.
+        The returned configuration is shared by the instances and must not be modified.
 
         Args:
-            package (str): The name of the package where the resources are located.
-            file_name (str): The file name of the resource to be loaded.
+            source (Traversable): The configuration file.
 
         Returns:
-            _type_: _description_
+            dict: The configuration.
+        """
+        key = (type(self), str(source))
+        version = self._file_version(source)
+        with BaseConfig._cache_lock:
+            cached = BaseConfig._cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        config = self._read_yaml(source)
+        self._validate(config)
+        with BaseConfig._cache_lock:
+            BaseConfig._cache[key] = (version, config)
+        return config
+
+    @staticmethod
+    def _file_version(source) -> tuple | None:
+        """Return the modification time and size of a configuration file.
+
+        Args:
+            source (Traversable): The configuration file.
+
+        Returns:
+            tuple | None: The modification time in nanoseconds and the size,
+                or None if the file is not on the file system, such as a resource in a zip archive.
+
+        Raises:
+            FileNotFoundError: The file does not exist.
+        """
+        if not isinstance(source, pathlib.Path):
+            return None
+        stat = source.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_yaml(self, source):
+        """Load a YAML format configuration file.
+
+        Args:
+            source (Traversable): The configuration file.
+
+        Returns:
+            Any: The loaded configuration.
+        """
+        return yaml.safe_load(source.read_text(encoding="utf-8"))
+
+    def _validate(self, config) -> None:
+        """Validate a configuration that has been read. Override to validate it only when the file is read,
+        instead of each time the class is instantiated.
+
+        Args:
+            config (Any): The loaded configuration.
         """
-        return yaml.safe_load(resources.read_text(pacakge, file_name))
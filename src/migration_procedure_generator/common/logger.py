@@ -13,10 +13,15 @@
 #  under the License.
 """Common logger package"""
 
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import json
-import inspect
+import os
+import queue
+import sys
+import threading
 import traceback
 import datetime
 
@@ -35,9 +40,63 @@ class MicrosecondFormatter(logging.Formatter):
             return super().formatTime(record, datefmt)
 
 
+class OverflowQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that applies an overflow policy when its bounded queue is full"""
+
+    def __init__(self, log_queue: queue.Queue, overflow: str):
+        """Constructor
+
+        Args:
+            log_queue (queue.Queue): bounded queue read by the listener thread
+            overflow (str): "block" waits for room in the queue, "drop_new" discards the record being logged
+                and "drop_oldest" discards the oldest queued record to make room for it.
+        """
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record in the queue according to the overflow policy.
+        Called with the lock of the handler held, so the count of dropped records needs no other lock.
+
+        Args:
+            record (logging.LogRecord): prepared record
+        """
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """Queue listener that can be stopped while its bounded queue is full"""
+
+    def enqueue_sentinel(self) -> None:
+        """Wait for room in the queue to put the sentinel that stops the listener thread,
+        instead of raising queue.Full as the base class does
+        """
+        self.queue.put(self._sentinel)
+
+
 class Logger:
     """Logger class for logging messages"""
 
+    # Listener of the queued mode, shared by all the instances, and the configuration it was set up with
+    _listener = None
+    _listener_config = None
+    _listener_lock = threading.Lock()
+
     def __init__(self, config: dict):
         """Constructor
 
@@ -55,8 +114,81 @@ class Logger:
             logging.GetLogger: Logger
         """
         config["formatters"]["standard"]["()"] = MicrosecondFormatter
-        logging.config.dictConfig(config)
-        return logging.getLogger()
+        queue_config = config.get("queue")
+        with Logger._listener_lock:
+            # The queued mode is kept as long as the configuration does not change, instead of restarting
+            # the listener thread for each request.
+            if queue_config and Logger._listener_config == config:
+                return logging.getLogger()
+            Logger._stop_listener()
+            logging.config.dictConfig({key: value for key, value in config.items() if key != "queue"})
+            root = logging.getLogger()
+            if queue_config:
+                handlers = list(root.handlers)
+                for handler in handlers:
+                    root.removeHandler(handler)
+                log_queue = queue.Queue(queue_config["maxsize"])
+                root.addHandler(OverflowQueueHandler(log_queue, queue_config["overflow"]))
+                Logger._listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+                Logger._listener.start()
+                Logger._listener_config = config
+        return root
+
+    @staticmethod
+    def dropped_records() -> int:
+        """Count the records discarded because the queue of the queued mode was full
+
+        Returns:
+            int: number of discarded records since the queued mode was set up, 0 when it is not used
+        """
+        handlers = logging.getLogger().handlers
+        return sum(handler.dropped for handler in handlers if isinstance(handler, OverflowQueueHandler))
+
+    @staticmethod
+    def stop_listener() -> None:
+        """Write the queued records and stop the listener thread of the queued mode, if any.
+        Records logged afterwards are written directly by the handlers of the root logger.
+        """
+        with Logger._listener_lock:
+            Logger._stop_listener()
+
+    @staticmethod
+    def reset_listener() -> None:
+        """Forget the listener of the queued mode and reset its lock.
+        Called in a child process after fork, where the listener thread of the parent does not run and the lock
+        may have been copied in the locked state. The handlers of the listener are handed back to the root logger,
+        so that the records of the child are written directly until the logger is set up again in the child.
+        """
+        Logger._listener_lock = threading.Lock()
+        Logger._detach_listener()
+
+    @staticmethod
+    def _stop_listener() -> None:
+        """Hand the handlers of the listener back to the root logger and stop the listener thread.
+        Called with the listener lock held.
+        """
+        listener = Logger._detach_listener()
+        if listener is not None:
+            listener.stop()
+
+    @staticmethod
+    def _detach_listener() -> BoundedQueueListener | None:
+        """Hand the handlers of the listener back to the root logger and forget the listener.
+        The queue handler is removed first, so that no record is put in the queue once the listener has stopped.
+
+        Returns:
+            BoundedQueueListener | None: the listener, None when the queued mode is not used
+        """
+        listener, Logger._listener, Logger._listener_config = Logger._listener, None, None
+        if listener is None:
+            return None
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, OverflowQueueHandler) and handler.queue is listener.queue:
+                root.removeHandler(handler)
+        for handler in listener.handlers:
+            root.addHandler(handler)
+        return listener
 
     def _appLogToJson(self, message: str, stacktrace: str = "") -> str:  # pylint: disable=C0103
         """Return the logs formatted as JSON.
@@ -67,82 +199,106 @@ class Logger:
         Returns:
             JSON (str): JSON formatted log message.
         """
+        # Only the frame of the caller is needed, whereas inspect.stack() reads the source of every frame.
+        caller = sys._getframe(3)  # pylint: disable=W0212
         applog = {
-            "file": inspect.stack()[3].filename,
-            "line": inspect.stack()[3].lineno,
+            "file": caller.f_code.co_filename,
+            "line": caller.f_lineno,
             "message": message,
         }
         if stacktrace:
             applog["stacktrace"] = stacktrace.replace("\n", "")
         return json.dumps(applog, separators=(",", ":"), ensure_ascii=False)
 
-    def _process_log(self, level: int, message: str, *args, stack_info: bool = False, **kwargs) -> None:
+    def _process_log(self, level: int, message, *args, stack_info: bool = False, **kwargs) -> None:
         """Attach the stack trace to the message.
+        Nothing is formatted when the level is not enabled.
 
         Args:
             level (int): Log level.
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
+        if not self._logger.isEnabledFor(level):
+            return
+        if callable(message):
+            message = message()
         stacktrace = ""
         if stack_info:
             stacktrace = "".join(traceback.extract_stack().format())[:-1]
         json_message = self._appLogToJson(message, stacktrace)
         self._logger.log(level, json_message, *args, **kwargs)
 
-    def debug(self, message: str, *args, stack_info: bool = False, **kwargs):
+    def log(self, level: int, message, *args, stack_info: bool = False, **kwargs):
+        """Logging function of the given level
+
+        Args:
+            level (int): Log level.
+            message (str | Callable[[], str]): Message for logging, or a function returning it,
+                which is called only when the level is enabled.
+            *args: Additional arguments for logging.
+            stack_info (bool): If True, include stack trace information.
+            **kwargs: Additional keyword arguments for logging.
+        """
+        self._process_log(level, message, *args, stack_info=stack_info, **kwargs)
+
+    def debug(self, message, *args, stack_info: bool = False, **kwargs):
         """Debug logging function
 
         Args:
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
         self._process_log(logging.DEBUG, message, *args, stack_info=stack_info, **kwargs)
 
-    def info(self, message: str, *args, stack_info: bool = False, **kwargs):
+    def info(self, message, *args, stack_info: bool = False, **kwargs):
         """Info logging function
 
         Args:
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
         self._process_log(logging.INFO, message, *args, stack_info=stack_info, **kwargs)
 
-    def warning(self, message: str, *args, stack_info: bool = False, **kwargs):
+    def warning(self, message, *args, stack_info: bool = False, **kwargs):
         """Warning logging function
 
         Args:
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
         self._process_log(logging.WARNING, message, *args, stack_info=stack_info, **kwargs)
 
-    def error(self, message: str, *args, stack_info: bool = False, **kwargs):
+    def error(self, message, *args, stack_info: bool = False, **kwargs):
         """Error logging function
 
         Args:
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
         self._process_log(logging.ERROR, message, *args, stack_info=stack_info, **kwargs)
 
-    def critical(self, message: str, *args, stack_info: bool = False, **kwargs):
+    def critical(self, message, *args, stack_info: bool = False, **kwargs):
         """Critical logging function
 
         Args:
-            message (str): Message for logging.
+            message (str | Callable[[], str]): Message for logging, or a function returning it.
             *args: Additional arguments for logging.
             stack_info (bool): If True, include stack trace information.
             **kwargs: Additional keyword arguments for logging.
         """
         self._process_log(logging.CRITICAL, message, *args, stack_info=stack_info, **kwargs)
+
+
+atexit.register(Logger.stop_listener)
+os.register_at_fork(after_in_child=Logger.reset_listener)
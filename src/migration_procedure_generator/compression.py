@@ -0,0 +1,117 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Negotiated compression of response bodies"""
+
+import functools
+import gzip
+import importlib
+
+
+def _import_optional(name: str):
+    """Import an optional compression module
+
+    Args:
+        name (str): module name
+
+    Returns:
+        module: imported module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _compress_gzip(body: bytes, level: int) -> bytes:
+    """Compress with gzip"""
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _compress_brotli(body: bytes, level: int) -> bytes:
+    """Compress with brotli"""
+    return _import_optional("brotli").compress(body, quality=level)
+
+
+def _compress_zstd(body: bytes, level: int) -> bytes:
+    """Compress with zstandard"""
+    return _import_optional("zstandard").ZstdCompressor(level=level).compress(body)
+
+
+@functools.cache
+def available_codings() -> dict:
+    """Content codings supported in this environment, most preferred first.
+    gzip is always available, brotli and zstandard only when their modules are installed.
+    The result is cached so that missing modules are not searched for on every request.
+
+    Returns:
+        dict: content coding name and compression function
+    """
+    codings = {}
+    if _import_optional("zstandard"):
+        codings["zstd"] = _compress_zstd
+    if _import_optional("brotli"):
+        codings["br"] = _compress_brotli
+    codings["gzip"] = _compress_gzip
+    return codings
+
+
+def select_coding(accept_encoding: str, codings: dict):
+    """Choose a content coding from an Accept-Encoding header
+
+    Args:
+        accept_encoding (str): value of the Accept-Encoding header
+        codings (dict): supported content codings, most preferred first
+
+    Returns:
+        str: content coding name, or None when the body is sent uncompressed
+    """
+    qualities = {}
+    for coding_range in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in coding_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    best_coding, best_quality = None, 0.0
+    for coding in codings:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_coding, best_quality = coding, quality
+    return best_coding
+
+
+def compress_body(body: bytes, accept_encoding: str, minimum_size: int, level: int) -> tuple[bytes, str]:
+    """Compress a response body with the content coding preferred by the client
+
+    Args:
+        body (bytes): rendered response body
+        accept_encoding (str): value of the Accept-Encoding header
+        minimum_size (int): bodies smaller than this number of bytes are not compressed
+        level (int): compression level
+
+    Returns:
+        tuple[bytes, str]: response body and its content coding, which is None when not compressed
+    """
+    if len(body) < minimum_size:
+        return body, None
+    codings = available_codings()
+    coding = select_coding(accept_encoding, codings)
+    if coding is None:
+        return body, None
+    return codings[coding](body, level), coding
@@ -14,20 +14,36 @@
 """CLI package"""
 
 import argparse
+import cProfile
 import json
 import sys
 
 from migration_procedure_generator.custom_exception import (
+    AvailabilityBudgetError,
     CustomBaseException,
     FileReadError,
     JSONDecodeError,
     NotFoundError,
+    PlanVerificationError,
 )
+from migration_procedure_generator.coalescing import canonical_hash
+from migration_procedure_generator.downtime import minimize_downtime
+from migration_procedure_generator.encoding import encode_binary
 from migration_procedure_generator.exitcode import ExitCode
-from migration_procedure_generator.model import validate_layout, convert_devicetype_lowercase
+from migration_procedure_generator.model import layouts_digest, parse_layout
 from migration_procedure_generator.plan import Plan
-from migration_procedure_generator.setting import initialize_log
-from migration_procedure_generator.system import System
+from migration_procedure_generator.schedule import schedule_plan
+from migration_procedure_generator.setting import (
+    MigrationConfigReader,
+    add_config_arguments,
+    apply_config_arguments,
+    initialize_log,
+    log_request,
+)
+from migration_procedure_generator.submission import LayoutApplySubmitter
+from migration_procedure_generator.system import System, device_types
+from migration_procedure_generator.tracing import PhaseTimer, PlanTracer
+from migration_procedure_generator.verifier import verify_plan
 
 
 def get_validate_json_file(file_path) -> dict:
@@ -77,25 +93,155 @@ def main():
         metavar="DESIRED_LAYOUT_FILE",
     )
 
+    cli_parser.add_argument(
+        "--format",
+        action="store",
+        choices=["json", "binary"],
+        default="json",
+        help="Output format of the migration procedures. 'binary' is the compact columnar encoding",
+    )
+
+    cli_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Replay the generated migration procedure against the current layout before printing it",
+    )
+
+    cli_parser.add_argument(
+        "--hotplug",
+        action="store",
+        nargs="+",
+        help="Device types that can be connected and disconnected while the CPU is running."
+        " Defaults to the device types in the configuration file",
+        metavar="DEVICE_TYPE",
+    )
+
+    cli_parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Also print the time slots and the execution order within the concurrency caps of the configuration file."
+        " The output is then a JSON object with 'procedures' and 'schedule'",
+    )
+
+    cli_parser.add_argument(
+        "--optimize",
+        action="store",
+        choices=["downtime"],
+        help="Order the migration procedures so that each node is offline as briefly as possible and also print the"
+        " estimated downtime of each node before and after the optimization."
+        " The output is then a JSON object with 'procedures' and 'downtime'",
+    )
+
+    cli_parser.add_argument(
+        "--max-offline",
+        action="store",
+        type=int,
+        help="Maximum number of nodes offline at the same time."
+        " Boots are made to precede shutdowns of other nodes as needed",
+        metavar="NODE_COUNT",
+    )
+
+    cli_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the elapsed time and the task count of each planner phase to stderr in JSON format",
+    )
+
+    cli_parser.add_argument(
+        "--profile-out",
+        action="store",
+        type=str,
+        help="Path of a file to which the cProfile statistics of the planner are written",
+        metavar="PROFILE_FILE",
+    )
+
+    cli_parser.add_argument(
+        "--submit",
+        action="store_true",
+        help="Also post the migration procedures to the layout apply service of the configuration file."
+        " The output is then a JSON object with 'procedures' and 'layoutApply', the response of the service",
+    )
+
+    add_config_arguments(cli_parser)
+
     args = cli_parser.parse_args()
+    apply_config_arguments(args)
+    if args.schedule and args.format == "binary":
+        cli_parser.error("--schedule cannot be used with --format binary")
+    if args.optimize and args.format == "binary":
+        cli_parser.error("--optimize cannot be used with --format binary")
+    if args.submit and args.format == "binary":
+        cli_parser.error("--submit cannot be used with --format binary")
+    if args.max_offline is not None and args.max_offline < 1:
+        cli_parser.error("--max-offline must be at least 1")
 
     try:
         logger = initialize_log()
-        prev_data = convert_devicetype_lowercase(get_validate_json_file(args.prev))
-        new_data = convert_devicetype_lowercase(get_validate_json_file(args.new))
-        validate_layout(prev_data)
-        validate_layout(new_data)
+        scheduling_config = MigrationConfigReader().scheduling_config if args.schedule else None
+        durations_config = MigrationConfigReader().durations_config if args.optimize else None
+        hotplug_types = args.hotplug if args.hotplug else MigrationConfigReader().hotplug_config["device_types"]
+        prev_data = parse_layout(get_validate_json_file(args.prev))
+        new_data = parse_layout(get_validate_json_file(args.new))
         logger.info("Start running")
-        logger.info(f"input param prev:{prev_data}, new:{new_data}")
+        log_request(
+            logger,
+            layouts_digest(prev_data, new_data, canonical_hash(prev_data, new_data)),
+            lambda: f"input param prev:{prev_data}, new:{new_data}",
+        )
     except CustomBaseException as err:
         err.output_stderr()
         sys.exit(err.exit_code)
     bound_devices_map = new_data.get("boundDevices", {})
-    plan = Plan.system_update_plan(
-        System.decode_json(prev_data, bound_devices_map), System.decode_json(new_data, bound_devices_map)
-    )
+    timer = PhaseTimer()
+    profiler = cProfile.Profile() if args.profile_out else None
+    plan_args = (System.decode_json(prev_data, bound_devices_map), System.decode_json(new_data, bound_devices_map))
+    plan_kwargs = {"hooks": [timer], "hotplug_types": hotplug_types, "max_offline": args.max_offline}
+    try:
+        if profiler:
+            plan = profiler.runcall(Plan.system_update_plan, *plan_args, **plan_kwargs)
+            profiler.dump_stats(args.profile_out)
+        else:
+            plan = Plan.system_update_plan(*plan_args, **plan_kwargs)
+    except AvailabilityBudgetError as err:
+        logger.error(err.message)
+        err.output_stderr()
+        sys.exit(err.exit_code)
+    extras = {}
+    if args.optimize == "downtime":
+        report = PlanTracer([timer]).run("minimize_downtime", minimize_downtime, plan, durations_config, plan=plan)
+        extras["downtime"] = report.encode_json()
+    if args.schedule:
+        plan_schedule = PlanTracer([timer]).run(
+            "schedule", schedule_plan, plan, device_types(*plan_args), scheduling_config, plan=plan
+        )
+        extras["schedule"] = plan_schedule.encode_json()
+    if args.timings:
+        print(json.dumps({"timings": timer.encode_json()}), file=sys.stderr)
+    if args.verify:
+        violations = verify_plan(plan, *plan_args, hotplug_types=hotplug_types)
+        if violations:
+            err = PlanVerificationError(violations)
+            logger.error(err.message)
+            err.output_stderr()
+            sys.exit(err.exit_code)
+    if args.submit:
+        submitter = LayoutApplySubmitter()
+        try:
+            extras["layoutApply"] = submitter.submit(plan)
+        except CustomBaseException as err:
+            logger.error(err.message)
+            err.output_stderr()
+            sys.exit(err.exit_code)
+        finally:
+            submitter.close()
     logger.info("Completed successfully")
-    print(json.dumps(plan.encode_json()))
+    if args.format == "binary":
+        sys.stdout.buffer.write(encode_binary(plan))
+        sys.stdout.flush()
+    elif extras:
+        print(json.dumps({"procedures": plan.encode_json(), **extras}))
+    else:
+        print(json.dumps(plan.encode_json()))
     sys.exit(ExitCode.NORMAL)
 
 
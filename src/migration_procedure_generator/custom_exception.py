@@ -20,6 +20,9 @@ from fastapi.exceptions import RequestValidationError
 
 from migration_procedure_generator.exitcode import ExitCode
 
+# CPU device IDs listed in an error message, which would otherwise list every node of a large layout.
+SHOWN_CPU_IDS = 5
+
 
 class CustomBaseException(Exception):
     """Base Exception class"""
@@ -209,3 +212,204 @@ class LogInitializationError(CustomBaseException):
     def response_msg(self) -> dict:
         """Return a response message"""
         return {"code": "E50006", "message": self.message}
+
+
+class PlanVerificationError(CustomBaseException):
+    """Migration procedure verification error class"""
+
+    def __init__(self, violations):
+        """constructor
+
+        Args:
+            violations (list): violations found by the verification
+        """
+        super().__init__(violations)
+        self.message = "Generated migration procedure failed verification\n" + "\n".join(violations)
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50007]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.INTERNAL_ERR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50007", "message": self.message}
+
+
+class AvailabilityBudgetError(CustomBaseException):
+    """Availability budget error class"""
+
+    def __init__(self, max_offline, offline_cpus):
+        """constructor
+
+        Args:
+            max_offline (int): maximum number of nodes offline at the same time
+            offline_cpus (list): CPU device IDs of the nodes exchanging devices for which no order was found
+        """
+        super().__init__(max_offline, offline_cpus)
+        shown = ", ".join(offline_cpus[:SHOWN_CPU_IDS])
+        if len(offline_cpus) > SHOWN_CPU_IDS:
+            shown += f" and {len(offline_cpus) - SHOWN_CPU_IDS} more"
+        self.message = (
+            f"Migration procedure cannot keep at most {max_offline} nodes offline at the same time. "
+            f"No order was found for the {len(offline_cpus)} nodes exchanging devices: {shown}"
+        )
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50008]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.VALIDATION_ERROR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50008", "message": self.message}
+
+
+class JobNotFoundError(CustomBaseException):
+    """Job not found error class"""
+
+    def __init__(self, job_id):
+        """constructor
+
+        Args:
+            job_id (str): job ID
+        """
+        super().__init__(job_id)
+        self.message = f"Specified job not found or expired: {job_id}"
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50009]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.VALIDATION_ERROR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50009", "message": self.message}
+
+
+class JobNotCompletedError(CustomBaseException):
+    """Job without result error class"""
+
+    def __init__(self, job_id, status):
+        """constructor
+
+        Args:
+            job_id (str): job ID
+            status (str): job status
+        """
+        super().__init__(job_id, status)
+        self.message = f"Specified job has no result because it is {status}: {job_id}"
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50010]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.VALIDATION_ERROR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50010", "message": self.message}
+
+
+class LayoutApplyError(CustomBaseException):
+    """Layout apply submission error class"""
+
+    def __init__(self, url, reason):
+        """constructor
+
+        Args:
+            url (str): URL of the layout apply service
+            reason (str): reason of the failure
+        """
+        super().__init__(url, reason)
+        self.message = f"Failed to submit the migration procedure to layout apply at {url}: {reason}"
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50011]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.INTERNAL_ERR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50011", "message": self.message}
+
+
+class JobQueueFullError(CustomBaseException):
+    """Job queue full error class"""
+
+    def __init__(self, max_queued):
+        """constructor
+
+        Args:
+            max_queued (int): maximum number of jobs waiting for a worker
+        """
+        super().__init__(max_queued)
+        self.message = f"Too many jobs are waiting for a worker, at most {max_queued}. Retry later."
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50012]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.INTERNAL_ERR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50012", "message": self.message}
+
+
+class JobsUnavailableError(CustomBaseException):
+    """Jobs unavailable error class"""
+
+    def __init__(self, workers):
+        """constructor
+
+        Args:
+            workers (int): number of worker processes of the server
+        """
+        super().__init__(workers)
+        self.message = (
+            f"Jobs are not available with {workers} worker processes, since each process keeps its own jobs. "
+            "Set migration_procedures.workers to 1 to use jobs."
+        )
+
+    def output_stderr(self) -> None:
+        """Print messages for CLI"""
+        print(f"[E50013]{self.message}", file=sys.stderr)
+
+    @property
+    def exit_code(self) -> int:
+        """Retrieve ExitCode"""
+        return ExitCode.INTERNAL_ERR
+
+    @property
+    def response_msg(self) -> dict:
+        """Return a response message"""
+        return {"code": "E50013", "message": self.message}
@@ -0,0 +1,176 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Ordering of migration procedures that keeps the nodes offline as briefly as possible"""
+
+import bisect
+
+from migration_procedure_generator.operation import Operation
+
+DEFAULT_DURATIONS = {
+    str(Operation.POWEROFF): 1,
+    str(Operation.CONNECT): 1,
+    str(Operation.DISCONNECT): 1,
+    str(Operation.POWERON): 1,
+}
+# Operations that take a node offline or that only prepare devices for other nodes are started as late as possible.
+LATE_OPERATIONS = (Operation.POWEROFF, Operation.DISCONNECT)
+
+
+def earliest_start_times(plan, durations: dict) -> dict:
+    """Estimate the start time of each operation when it starts as soon as its dependencies have completed
+
+    Args:
+        plan (Plan): migration procedures. Dependencies have lower operation IDs than the tasks depending on them.
+        durations (dict): operation and its duration
+
+    Returns:
+        dict: operation ID and start time
+    """
+    starts = {}
+    for task in plan.tasks:
+        starts[task.op_id] = max(
+            (starts[depending.op_id] + durations[depending.operation] for depending in task.dependencies), default=0
+        )
+    return starts
+
+
+def downtime_start_times(plan, durations: dict) -> dict:
+    """Estimate start times that shorten the offline window of each node without delaying the migration.
+    Connect and boot start as soon as possible, so each node is back online as early as its devices allow.
+    Shutdown and disconnect then start as late as the operations depending on them allow, walking the plan
+    backwards, so each node goes offline only just before its devices are needed.
+
+    Args:
+        plan (Plan): migration procedures. Dependencies have lower operation IDs than the tasks depending on them.
+        durations (dict): operation and its duration
+
+    Returns:
+        dict: operation ID and start time
+    """
+    starts = earliest_start_times(plan, durations)
+    dependents = {task.op_id: [] for task in plan.tasks}
+    for task in plan.tasks:
+        for depending in task.dependencies:
+            dependents[depending.op_id].append(task)
+    for task in reversed(plan.tasks):
+        if task.operation in LATE_OPERATIONS and dependents[task.op_id]:
+            starts[task.op_id] = (
+                min(starts[dependent.op_id] for dependent in dependents[task.op_id]) - durations[task.operation]
+            )
+    return starts
+
+
+def node_downtimes(plan, starts: dict, durations: dict) -> dict:
+    """Estimate how long each node is offline, from the start of its shutdown to the end of its boot.
+    Nodes that are only shut down or only booted are not included.
+
+    Args:
+        plan (Plan): migration procedures
+        starts (dict): operation ID and start time
+        durations (dict): operation and its duration
+
+    Returns:
+        dict: CPU device ID and downtime
+    """
+    shutdowns = plan.get_shutdown_tasks()
+    downtimes = {}
+    for cpu_id, boot in plan.get_boot_tasks().items():
+        if cpu_id in shutdowns:
+            downtimes[cpu_id] = starts[boot.op_id] + durations[boot.operation] - starts[shutdowns[cpu_id].op_id]
+    return downtimes
+
+
+def enforce_start_times(plan, starts: dict, durations: dict) -> None:
+    """Add dependencies so that operations started as soon as their dependencies have completed do not start
+    before the given start times. Each shutdown and disconnect meant to start later than its dependencies allow
+    is made to depend on the operation finishing last by that time among the operations before it.
+
+    Args:
+        plan (Plan): migration procedures in the order of the start times
+        starts (dict): operation ID and start time
+        durations (dict): operation and its duration
+    """
+    earliest = earliest_start_times(plan, durations)
+    ends = sorted(
+        (starts[task.op_id] + durations[task.operation], position, task) for position, task in enumerate(plan.tasks)
+    )
+    end_times = [end for end, _, _ in ends]
+    for position, task in enumerate(plan.tasks):
+        start = starts[task.op_id]
+        if task.operation not in LATE_OPERATIONS or start <= earliest[task.op_id]:
+            continue
+        index = bisect.bisect_right(end_times, start)
+        while index and end_times[index - 1] > earliest[task.op_id]:
+            index -= 1
+            _, before, depended = ends[index]
+            # Operations with zero duration may end at the start time and still come later in the order.
+            if before < position:
+                task.dependencies.add(depended)
+                break
+
+
+class DowntimeReport:
+    """Downtime of each node in the baseline plan and in the downtime-minimizing plan"""
+
+    def __init__(self, baseline: dict, optimized: dict, starts: dict) -> None:
+        """constructor
+
+        Args:
+            baseline (dict): CPU device ID and downtime when every operation starts as soon as possible
+            optimized (dict): CPU device ID and downtime with the downtime-minimizing start times
+            starts (dict): operation ID and start time in the downtime-minimizing plan
+        """
+        self.baseline = baseline
+        self.optimized = optimized
+        self.starts = starts
+
+    def encode_json(self) -> dict:
+        """Encode the report in JSON format
+
+        Returns:
+            dict: per-node and total downtime, and the estimated start time of each operation
+        """
+        return {
+            "starts": [{"operationID": op_id, "start": start} for op_id, start in sorted(self.starts.items())],
+            "nodes": {
+                cpu_id: {"baseline": self.baseline[cpu_id], "optimized": self.optimized[cpu_id]}
+                for cpu_id in sorted(self.baseline)
+            },
+            "total": {"baseline": sum(self.baseline.values()), "optimized": sum(self.optimized.values())},
+        }
+
+
+def minimize_downtime(plan, durations: dict = None) -> DowntimeReport:
+    """Order the migration procedures so that each node is offline as briefly as possible.
+    The operation IDs are renumbered in the order of the estimated start times, so executing the operations in
+    operation ID order follows the downtime-minimizing plan. Shutdowns and disconnects that start later than
+    their dependencies allow are also made to depend on an operation finishing by their start time, so that
+    executors starting each operation as soon as its dependencies have completed follow the plan as well.
+    The total migration time is not changed.
+
+    Args:
+        plan (Plan): migration procedures, renumbered in place
+        durations (dict, optional): operation and its duration. Defaults to 1 for every operation.
+
+    Returns:
+        DowntimeReport: downtime of each node before and after the optimization, with the start times
+    """
+    durations = {**DEFAULT_DURATIONS, **(durations or {})}
+    baseline = node_downtimes(plan, earliest_start_times(plan, durations), durations)
+    starts = downtime_start_times(plan, durations)
+    tasks_by_op_id = {task.op_id: task for task in plan.tasks}
+    plan.renumber(key=lambda task: (starts[task.op_id], task.op_id))
+    starts = {task.op_id: starts[op_id] for op_id, task in tasks_by_op_id.items()}
+    enforce_start_times(plan, starts, durations)
+    return DowntimeReport(baseline, node_downtimes(plan, starts, durations), starts)
@@ -0,0 +1,195 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Compact columnar encoding of migration procedures
+
+All integers are little-endian. The layout is:
+
+    magic         4 bytes           b"MPLN"
+    version       u8                1
+    id count      u32               number of entries in the ID table
+    id table      (u16 + bytes) * m UTF-8 encoded CPU and device IDs, each prefixed by its byte length
+    task count    u32               number of tasks n
+    op ids        u32 * n           operation IDs
+    opcodes       u8 * n            0: shutdown, 1: connect, 2: disconnect, 3: boot
+    cpu           u32 * n           index of the CPU ID in the ID table
+    device        i32 * n           index of the device ID in the ID table, -1 when the task has no device
+    dep offsets   u32 * (n + 1)     CSR row offsets into the dependency array
+    dependencies  u32 * k           operation IDs of the dependencies, k = dep offsets[n]
+"""
+
+import struct
+
+from migration_procedure_generator.operation import Operation
+
+JSON_MEDIA_TYPE = "application/json"
+BINARY_MEDIA_TYPE = "application/vnd.cdim.migration-procedures"
+FORMAT_MAGIC = b"MPLN"
+FORMAT_VERSION = 1
+OPCODES = (Operation.POWEROFF, Operation.CONNECT, Operation.DISCONNECT, Operation.POWERON)
+NO_DEVICE = -1
+
+
+def encode_binary(plan) -> bytes:
+    """Encode the migration procedures in the columnar binary format
+
+    Args:
+        plan (Plan): migration procedures
+
+    Returns:
+        bytes: encoded migration procedures
+    """
+    id_table = {}
+    opcode_table = {operation: opcode for opcode, operation in enumerate(OPCODES)}
+    op_ids, opcodes, cpus, devices, dep_offsets, dependencies = [], [], [], [], [0], []
+    for task in plan.tasks:
+        op_ids.append(task.op_id)
+        opcodes.append(opcode_table[task.operation])
+        cpus.append(id_table.setdefault(task.cpu_id, len(id_table)))
+        devices.append(NO_DEVICE if task.device_id is None else id_table.setdefault(task.device_id, len(id_table)))
+        dependencies.extend(task.dependencies.op_ids())
+        dep_offsets.append(len(dependencies))
+
+    count = len(op_ids)
+    chunks = [FORMAT_MAGIC, struct.pack("<BI", FORMAT_VERSION, len(id_table))]
+    for identifier in id_table:
+        encoded = identifier.encode("utf-8")
+        chunks.append(struct.pack("<H", len(encoded)))
+        chunks.append(encoded)
+    chunks.append(struct.pack("<I", count))
+    chunks.append(struct.pack(f"<{count}I", *op_ids))
+    chunks.append(struct.pack(f"<{count}B", *opcodes))
+    chunks.append(struct.pack(f"<{count}I", *cpus))
+    chunks.append(struct.pack(f"<{count}i", *devices))
+    chunks.append(struct.pack(f"<{count + 1}I", *dep_offsets))
+    chunks.append(struct.pack(f"<{len(dependencies)}I", *dependencies))
+    return b"".join(chunks)
+
+
+def decode_binary(data: bytes) -> list:
+    """Decode migration procedures encoded by 'encode_binary'
+
+    Args:
+        data (bytes): encoded migration procedures
+
+    Raises:
+        ValueError: data is not in the columnar binary format
+
+    Returns:
+        list: migration procedure in the same form as 'Plan.encode_json'
+    """
+    reader = _Reader(data)
+    if reader.read(4) != FORMAT_MAGIC:
+        raise ValueError("Not a migration procedures binary")
+    version, id_count = reader.unpack("<BI")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported migration procedures binary version: {version}")
+    id_table = [reader.read(reader.unpack("<H")[0]).decode("utf-8") for _ in range(id_count)]
+    (count,) = reader.unpack("<I")
+    op_ids = reader.unpack(f"<{count}I")
+    opcodes = reader.unpack(f"<{count}B")
+    cpus = reader.unpack(f"<{count}I")
+    devices = reader.unpack(f"<{count}i")
+    dep_offsets = reader.unpack(f"<{count + 1}I")
+    dependencies = reader.unpack(f"<{dep_offsets[-1]}I")
+
+    procedures = []
+    for index, op_id in enumerate(op_ids):
+        operation = OPCODES[opcodes[index]]
+        json_data = {
+            "operationID": op_id,
+            "operation": str(operation),
+            "dependencies": list(dependencies[dep_offsets[index] : dep_offsets[index + 1]]),
+        }
+        device_id = id_table[devices[index]] if devices[index] != NO_DEVICE else None
+        if operation != Operation.POWERON and operation != Operation.POWEROFF:
+            json_data["targetCPUID"] = id_table[cpus[index]]
+            if device_id:
+                json_data["targetDeviceID"] = device_id
+        else:
+            json_data["targetDeviceID"] = id_table[cpus[index]]
+        procedures.append(json_data)
+    return procedures
+
+
+def select_media_type(accept: str) -> str:
+    """Choose the response encoding from an Accept header
+
+    Args:
+        accept (str): value of the Accept header
+
+    Returns:
+        str: JSON_MEDIA_TYPE or BINARY_MEDIA_TYPE
+    """
+    qualities = {}
+    for media_range in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        if media_type in ("application/*", "*/*"):
+            media_type = "*"
+        qualities[media_type] = max(quality, qualities.get(media_type, 0.0))
+    binary_quality = qualities.get(BINARY_MEDIA_TYPE, 0.0)
+    # JSON stays the default: the binary format is chosen only when it is explicitly preferred.
+    if binary_quality > qualities.get(JSON_MEDIA_TYPE, 0.0) and binary_quality >= qualities.get("*", 0.0):
+        return BINARY_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+class _Reader:
+    """Sequential reader over a bytes object"""
+
+    def __init__(self, data: bytes) -> None:
+        """constructor
+
+        Args:
+            data (bytes): data to read
+        """
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def read(self, size: int) -> bytes:
+        """Read bytes
+
+        Args:
+            size (int): number of bytes
+
+        Raises:
+            ValueError: data is truncated
+
+        Returns:
+            bytes: read bytes
+        """
+        if self._offset + size > len(self._data):
+            raise ValueError("Truncated migration procedures binary")
+        chunk = self._data[self._offset : self._offset + size].tobytes()
+        self._offset += size
+        return chunk
+
+    def unpack(self, fmt: str) -> tuple:
+        """Read and unpack values
+
+        Args:
+            fmt (str): struct format
+
+        Returns:
+            tuple: unpacked values
+        """
+        return struct.unpack(fmt, self.read(struct.calcsize(fmt)))
@@ -0,0 +1,81 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Readiness of the server, which is reached once the one-time costs of the first request have been paid"""
+
+import threading
+
+# Two nodes exchanging their memory and a node that gets a new one, to run every planner phase once
+WARMUP_LAYOUTS = {
+    "currentLayout": {
+        "nodes": [
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-1"]}, "memory": {"deviceIDs": ["warmup-memory-1"]}}},
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-2"]}, "memory": {"deviceIDs": ["warmup-memory-2"]}}},
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-3"]}}},
+        ]
+    },
+    "desiredLayout": {
+        "nodes": [
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-1"]}, "memory": {"deviceIDs": ["warmup-memory-2"]}}},
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-2"]}, "memory": {"deviceIDs": ["warmup-memory-1"]}}},
+            {"device": {"cpu": {"deviceIDs": ["warmup-cpu-3"]}, "memory": {"deviceIDs": ["warmup-memory-3"]}}},
+        ]
+    },
+}
+
+
+class Readiness:
+    """Warm-up run in the background, and whether the server is ready to handle requests"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.ready = threading.Event()
+        self.error = None
+        self._thread = None
+
+    def start(self, func) -> None:
+        """Start the warm-up in a background thread. The server is ready once it has completed without error.
+
+        Args:
+            func (Callable): warm-up, called without arguments
+        """
+        self._thread = threading.Thread(target=self._run, args=(func,), name="warm-up", daemon=True)
+        self._thread.start()
+
+    def _run(self, func) -> None:
+        """Run the warm-up and record its outcome
+
+        Args:
+            func (Callable): warm-up
+        """
+        try:
+            func()
+        except Exception as err:  # pylint:disable=W0718
+            self.error = err
+        else:
+            self.ready.set()
+
+    def encode_json(self) -> dict:
+        """Encode the readiness in JSON format
+
+        Returns:
+            dict: status, and the error of a failed warm-up
+        """
+        if self.ready.is_set():
+            return {"status": "ready"}
+        if self.error is not None:
+            return {
+                "status": "failed",
+                "error": getattr(self.error, "response_msg", {"message": "Internal server error."}),
+            }
+        return {"status": "warming up"}
@@ -0,0 +1,277 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Asynchronous jobs that generate migration procedures on a bounded worker pool"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum, _simple_enum
+
+from migration_procedure_generator.custom_exception import JobQueueFullError
+from migration_procedure_generator.tracing import PlanHook
+
+
+@_simple_enum(StrEnum)
+class JobStatus:
+    """constants for job status"""
+
+    def __new__(cls, value):
+        obj = str.__new__(cls, value)
+        obj._value_ = value
+        return obj
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobCancelledError(Exception):
+    """Raised inside a job when it has been cancelled, to stop it at the next planner phase"""
+
+
+class JobProgress(PlanHook):
+    """Hook that records the progress of a job and stops it when it has been cancelled"""
+
+    def __init__(self, cancelled: threading.Event) -> None:
+        """constructor
+
+        Args:
+            cancelled (threading.Event): set when the job has been cancelled
+        """
+        self.cancelled = cancelled
+        self.phase = None
+        self.completed_phases = 0
+
+    def phase_start(self, phase: str) -> None:
+        """Remember the running phase, or stop the job if it has been cancelled
+
+        Args:
+            phase (str): phase name
+
+        Raises:
+            JobCancelledError: the job has been cancelled
+        """
+        if self.cancelled.is_set():
+            raise JobCancelledError(phase)
+        self.phase = phase
+
+    def phase_end(self, phase: str, plan) -> None:
+        """Count the completed phase
+
+        Args:
+            phase (str): phase name
+            plan (Plan): migration procedures produced or updated by the phase
+        """
+        self.completed_phases += 1
+
+    def encode_json(self) -> dict:
+        """Encode the progress in JSON format
+
+        Returns:
+            dict: running phase and number of completed phases
+        """
+        return {"phase": self.phase, "completedPhases": self.completed_phases}
+
+
+class Job:
+    """Generation of a migration procedure running in the background"""
+
+    def __init__(self, ttl: float) -> None:
+        """constructor
+
+        Args:
+            ttl (float): seconds the job may wait for a worker, and is kept after it has finished
+        """
+        self.job_id = uuid.uuid4().hex
+        self.status = JobStatus.QUEUED
+        self.cancelled = threading.Event()
+        self.progress = JobProgress(self.cancelled)
+        self.result = None
+        self.error = None
+        self.ttl = ttl
+        self.created_at = time.monotonic()
+        self.finished_at = None
+        self.future = None
+
+    def finish(self, status: JobStatus, result=None, error: Exception = None) -> None:
+        """Record the outcome of the job and start its time to live
+
+        Args:
+            status (JobStatus): final status
+            result (Any, optional): return value of the job. Defaults to None.
+            error (Exception, optional): exception raised by the job. Defaults to None.
+        """
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+
+    def expired(self, now: float) -> bool:
+        """Check whether the time to live of a queued or finished job has passed.
+        The time to live of a queued job starts when it is submitted, and that of a finished job when it finishes.
+
+        Args:
+            now (float): current time of time.monotonic()
+
+        Returns:
+            bool: true or false
+        """
+        if self.status == JobStatus.QUEUED:
+            return now - self.created_at >= self.ttl
+        return self.finished_at is not None and now - self.finished_at >= self.ttl
+
+    def encode_json(self) -> dict:
+        """Encode the status of the job in JSON format
+
+        Returns:
+            dict: job ID, status and progress, and the error of a failed job
+        """
+        json_data = {"jobID": self.job_id, "status": self.status, "progress": self.progress.encode_json()}
+        if self.status == JobStatus.FAILED:
+            json_data["error"] = getattr(self.error, "response_msg", {"message": "Internal server error."})
+        return json_data
+
+
+class JobManager:
+    """Run jobs on a bounded thread pool and keep them until their time to live has passed.
+    The number of queued jobs is bounded too, and a job that waits for a worker longer than its time to live is
+    cancelled, so that jobs abandoned by their clients do not pile up.
+    """
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, workers: int, ttl: float, max_queued: int) -> Job:
+        """Queue a job. The worker pool is created by the first job with the given number of workers.
+
+        Args:
+            func (Callable): job body, called with the job and the arguments. It reports its progress through
+                job.progress, which must be passed to the planner as a hook so that cancellation can stop it.
+            *args: arguments of the job body
+            workers (int): maximum number of jobs running at the same time
+            ttl (float): seconds the job may wait for a worker, and is kept after it has finished
+            max_queued (int): maximum number of jobs waiting for a worker
+
+        Raises:
+            JobQueueFullError: max_queued jobs are already waiting for a worker
+
+        Returns:
+            Job: queued job
+        """
+        self.purge()
+        with self._lock:
+            if sum(1 for job in self._jobs.values() if job.status == JobStatus.QUEUED) >= max_queued:
+                raise JobQueueFullError(max_queued)
+            job = Job(ttl)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="migration-job")
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job, func, *args)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Retrieve a job that has not expired
+
+        Args:
+            job_id (str): job ID
+
+        Returns:
+            Job | None: job, or None if it is unknown or has expired
+        """
+        self.purge()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job. A running job stops at the start of its next planner phase.
+        A finished job is discarded together with its result.
+
+        Args:
+            job_id (str): job ID
+
+        Returns:
+            Job | None: job, or None if it is unknown or has expired
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status in FINISHED_STATUSES:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            return job
+        job.cancelled.set()
+        if job.future.cancel():
+            job.finish(JobStatus.CANCELLED)
+        return job
+
+    def purge(self) -> None:
+        """Discard the jobs whose time to live has passed, cancelling those that are still queued.
+        A queued job that a worker has just taken stops at its next planner phase, and is discarded once its time
+        to live after finishing has passed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for job in [job for job in self._jobs.values() if job.expired(now)]:
+                if job.status == JobStatus.QUEUED:
+                    job.cancelled.set()
+                    if not job.future.cancel():
+                        continue
+                    job.finish(JobStatus.CANCELLED)
+                del self._jobs[job.job_id]
+
+    def shutdown(self) -> None:
+        """Cancel the queued jobs and wait for the running ones to stop"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancelled.set()
+            if job.future.cancel():
+                job.finish(JobStatus.CANCELLED)
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _run(job: Job, func, *args) -> None:
+        """Run the body of a job on a worker and record its outcome
+
+        Args:
+            job (Job): job
+            func (Callable): job body
+            *args: arguments of the job body
+        """
+        if job.cancelled.is_set():
+            job.finish(JobStatus.CANCELLED)
+            return
+        job.status = JobStatus.RUNNING
+        try:
+            result = func(job, *args)
+        except JobCancelledError:
+            job.finish(JobStatus.CANCELLED)
+        except Exception as err:  # pylint:disable=W0718
+            job.finish(JobStatus.FAILED, error=err)
+        else:
+            if job.cancelled.is_set():
+                job.finish(JobStatus.CANCELLED)
+            else:
+                job.finish(JobStatus.SUCCEEDED, result=result)
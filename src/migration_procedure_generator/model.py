@@ -13,47 +13,191 @@
 #  under the License.
 """pydantic data model"""
 
-from jsonschema import ValidationError, validate
-from pydantic import BaseModel, field_validator
+from typing import Annotated
+
+from jsonschema import ValidationError as SchemaValidationError
+from jsonschema import validate
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    StringConstraints,
+    TypeAdapter,
+    ValidationError,
+    field_validator,
+    with_config,
+)
+from typing_extensions import NotRequired, TypedDict
 
 from migration_procedure_generator.custom_exception import JsonSchemaError
 from migration_procedure_generator.schema import layout_schema
 
+# The typed layouts below accept exactly what layout_schema accepts. Device types are converted to lowercase
+# while the layout is validated. Patterns are matched with the re module, as jsonschema does.
+DeviceType = Annotated[str, StringConstraints(pattern=r"^[0-9a-zA-Z]+$", to_lower=True)]
+
+
+@with_config(ConfigDict(extra="allow", regex_engine="python-re"))
+class DeviceEntry(TypedDict):
+    """devices of a device type attached to a node"""
+
+    deviceIDs: list[str]
+
+
+def check_cpu(device: dict) -> dict:
+    """Check that a node has exactly one CPU
+
+    Args:
+        device (dict): devices of a node by device type
+
+    Returns:
+        dict: devices of the node
+    """
+    if len(device.get("cpu", {}).get("deviceIDs", ())) != 1:
+        raise ValueError("A node must have exactly one cpu device ID")
+    return device
+
+
+@with_config(ConfigDict(extra="forbid", regex_engine="python-re"))
+class NodeEntry(TypedDict):
+    """node of a layout"""
+
+    device: NotRequired[Annotated[dict[DeviceType, DeviceEntry], AfterValidator(check_cpu)]]
+
+
+def drop_node_properties(nodes):
+    """Keep only the devices of the nodes whose devices are mapped by device type
+
+    Args:
+        nodes (Any): nodes
+
+    Returns:
+        Any: nodes to validate
+    """
+    # Same as the conversion of the device types to lowercase, which has always ignored the other properties
+    if not isinstance(nodes, list):
+        return nodes
+    return [
+        {"device": node["device"]} if isinstance(node, dict) and isinstance(node.get("device"), dict) else node
+        for node in nodes
+    ]
+
+
+def drop_unmapped_bound_devices(bound_devices):
+    """Drop the nodes whose bound devices are not mapped by device type, unless no node has them mapped
+
+    Args:
+        bound_devices (Any): bound devices by CPU device ID
+
+    Returns:
+        Any: bound devices to validate
+    """
+    # Same as the conversion of the device types to lowercase, which has always ignored these nodes
+    if isinstance(bound_devices, dict):
+        mapped = {cpu_id: devices for cpu_id, devices in bound_devices.items() if isinstance(devices, dict)}
+        if mapped:
+            return mapped
+    return bound_devices
+
+
+@with_config(ConfigDict(extra="allow", regex_engine="python-re"))
+class Layout(TypedDict):
+    """layout of the nodes and of the devices that cannot be detached from them"""
+
+    nodes: Annotated[list[NodeEntry], BeforeValidator(drop_node_properties)]
+    boundDevices: NotRequired[
+        Annotated[
+            dict[Annotated[str, StringConstraints(pattern=r"^(.+)$")], dict[DeviceType, list[str]]],
+            BeforeValidator(drop_unmapped_bound_devices),
+        ]
+    ]
+
+
+layout_adapter = TypeAdapter(Layout)
+
 
 class NodeLayout(BaseModel, extra="forbid"):
     """current layout and desired layout a data model to store the data"""
 
-    currentLayout: dict
-    desiredLayout: dict
+    currentLayout: Layout
+    desiredLayout: Layout
+    hotplugDeviceTypes: list[str] | None = None
 
-    @field_validator("currentLayout")
-    def validate_currentLayout(cls, currentLayout):  # pylint:disable=E0213,C0103
-        """Validation checks for currentLayout
+    @field_validator("currentLayout", "desiredLayout", mode="wrap")
+    def validate_layouts(cls, layout, handler):  # pylint:disable=E0213
+        """Validation checks for currentLayout and desiredLayout
 
         Args:
-            currentLayout (dict): Layout that performs validation checks
+            layout (Any): Layout that performs validation checks
+            handler (ValidatorFunctionWrapHandler): validation against the typed layout
 
         Returns:
-            dict: Layout with completed validation check
+            dict: Layout with completed validation check and the device types converted to lowercase
         """
-        currentLayout = convert_devicetype_lowercase(currentLayout)
-        validate_layout(currentLayout)
+        try:
+            return handler(layout)
+        except ValidationError as err:
+            # A layout that is not an object is reported as any other invalid request parameter.
+            if not isinstance(layout, dict):
+                raise
+            raise layout_error(layout, err) from err
 
-        return currentLayout
 
-    @field_validator("desiredLayout")
-    def validate_desiredLayout(cls, desiredLayout):  # pylint:disable=E0213,C0103
-        """Validation checks for desiredLayout
+def parse_layout(layout: dict) -> dict:
+    """Validation checks for layout, converting the device types to lowercase
 
-        Args:
-            desiredLayout (dict): Layout that performs validation checks
+    Args:
+        layout (dict): Layout that performs validation checks
+
+    Returns:
+        dict: Layout with completed validation check
+
+    Raises:
+        JsonSchemaError: the layout is invalid
+    """
+    try:
+        return layout_adapter.validate_python(layout)
+    except ValidationError as err:
+        raise layout_error(layout, err) from err
 
-        Returns:
-            dict: Layout with completed validation check
-        """
-        desiredLayout = convert_devicetype_lowercase(desiredLayout)
-        validate_layout(desiredLayout)
-        return desiredLayout
+
+def layout_error(layout: dict, err: ValidationError) -> JsonSchemaError:
+    """Describe why a layout is invalid with the message of the jsonschema validation
+
+    Args:
+        layout (dict): Layout rejected by the typed layout
+        err (ValidationError): errors of the typed layout
+
+    Returns:
+        JsonSchemaError: error to raise
+    """
+    # Only invalid layouts are validated again, so that the error messages stay the same as before.
+    try:
+        validate_layout(convert_devicetype_lowercase(layout))
+    except JsonSchemaError as schema_error:
+        return schema_error
+    return JsonSchemaError(err.errors()[0]["msg"])
+
+
+def layouts_digest(current: dict, desired: dict, request_hash: str) -> dict:
+    """Summarize the valid layouts of a request for logging
+
+    Args:
+        current (dict): current layout
+        desired (dict): desired layout
+        request_hash (str): hash identifying the request
+
+    Returns:
+        dict: hash, and numbers of nodes and of devices of each layout
+    """
+
+    def counts(layout: dict) -> dict:
+        nodes = layout["nodes"]
+        devices = sum(len(entry["deviceIDs"]) for node in nodes for entry in node.get("device", {}).values())
+        return {"nodes": len(nodes), "devices": devices}
+
+    return {"hash": request_hash, "currentLayout": counts(current), "desiredLayout": counts(desired)}
 
 
 def validate_layout(layout: dict) -> None:
@@ -65,7 +209,7 @@ def validate_layout(layout: dict) -> None:
 
     try:
         validate(layout, layout_schema)
-    except ValidationError as err:
+    except SchemaValidationError as err:
         raise JsonSchemaError(err.message) from err
 
 
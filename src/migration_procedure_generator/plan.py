@@ -13,23 +13,146 @@
 #  under the License.
 """Migration procedure generation related packages"""
 
+import bisect
+import heapq
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from operator import attrgetter
+
+from migration_procedure_generator.custom_exception import AvailabilityBudgetError
 from migration_procedure_generator.operation import Operation
+from migration_procedure_generator.system import device_types
+from migration_procedure_generator.tracing import PlanTracer
+
+_scoped_op_ids = ContextVar("scoped_op_ids", default=None)
+_op_id_key = attrgetter("op_id")
+
+
+class DependencySet:
+    """Ordered set of the Tasks a Task depends on, keyed by operation ID.
+    Membership tests, additions and removals take constant time, and iteration follows the order of addition.
+    """
+
+    __slots__ = ("_tasks",)
+
+    def __init__(self, tasks=None):
+        """constructor
+
+        Args:
+            tasks (Iterable[Task], optional): initial dependencies. Defaults to None.
+        """
+        self._tasks = {}
+        for task in tasks or ():
+            self.add(task)
+
+    def add(self, task):
+        """Add a dependency. Adding a Task that is already a dependency has no effect.
+
+        Args:
+            task (Task): migration procedure
+        """
+        self._tasks.setdefault(task.op_id, task)
+
+    def discard(self, task):
+        """Remove a dependency if present
+
+        Args:
+            task (Task): migration procedure
+        """
+        self._tasks.pop(task.op_id, None)
+
+    def op_ids(self):
+        """Retrieve the operation IDs in ascending order
+
+        Returns:
+            list: operation IDs
+        """
+        return sorted(self._tasks)
+
+    def copy(self):
+        """Copy the dependencies
+
+        Returns:
+            DependencySet: dependencies
+        """
+        return DependencySet(self)
+
+    def __contains__(self, task):
+        """Membership test by operation ID"""
+        return isinstance(task, Task) and task.op_id in self._tasks
+
+    def __iter__(self):
+        """Iterate over the Tasks in the order of addition"""
+        return iter(self._tasks.values())
+
+    def __len__(self):
+        """Number of dependencies"""
+        return len(self._tasks)
+
+    def __eq__(self, other):
+        """Comparison method: comparing the Tasks in order with another DependencySet or a list
+
+        Args:
+            other (DependencySet | list): dependencies
+
+        Returns:
+            bool: true or false
+        """
+        if isinstance(other, (DependencySet, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        """Representation listing the operation IDs"""
+        return f"DependencySet({list(self._tasks)})"
 
 
 class Task:
     """migration procedure task class"""
 
     __index_op_id__ = 0
+    _op_id_lock = threading.Lock()
 
     @classmethod
     def new_op_id(cls):
         """Increment the variable '__index_op_id__'"
+        Inside 'op_id_scope', the operation id is taken from the counter of the scope instead.
 
         Returns:
             int : operation id
         """
-        cls.__index_op_id__ += 1
-        return cls.__index_op_id__
+        scoped_op_ids = _scoped_op_ids.get()
+        if scoped_op_ids is not None:
+            return next(scoped_op_ids)
+        with cls._op_id_lock:
+            cls.__index_op_id__ += 1
+            return cls.__index_op_id__
+
+    @classmethod
+    def reset_op_id(cls):
+        """Reset the variable '__index_op_id__' and its lock.
+        Called in a child process after fork, where the lock may have been copied in the locked state.
+        """
+        cls._op_id_lock = threading.Lock()
+        cls.__index_op_id__ = 0
+
+    @classmethod
+    @contextmanager
+    def op_id_scope(cls):
+        """Number the tasks created in the current context from 1,
+        independently of other threads and requests.
+
+        Yields:
+            None
+        """
+        token = _scoped_op_ids.set(itertools.count(1))
+        try:
+            yield
+        finally:
+            _scoped_op_ids.reset(token)
 
     def __init__(self, operation, cpu_id, device_id=None, dependencies=None):
         """constructor
@@ -38,13 +161,13 @@ class Task:
             operation (str): Operating Procedures
             cpu_id (str): CPU device ID
             device_id (str, optional): Device ID. Defaults to None.
-            dependencies (Task, optional): Task Dependencies. Defaults to None.
+            dependencies (Iterable[Task], optional): Task Dependencies. Defaults to None.
         """
         self.op_id = Task.new_op_id()
         self.operation = operation
         self.cpu_id = cpu_id
         self.device_id = device_id
-        self.dependencies = dependencies if dependencies else []
+        self.dependencies = DependencySet(dependencies)
 
     def encode_json(self):
         """Encode the migration procedures in JSON format
@@ -55,7 +178,7 @@ class Task:
         json_data = {
             "operationID": self.op_id,
             "operation": self.operation,
-            "dependencies": [task.op_id for task in self.dependencies],
+            "dependencies": self.dependencies.op_ids(),
         }
         if self.operation != Operation.POWERON and self.operation != Operation.POWEROFF:
             json_data["targetCPUID"] = self.cpu_id
@@ -71,7 +194,11 @@ class Task:
         Returns:
             list : dependencies
         """
-        return sum([task.get_all_dependencies() for task in self.dependencies], self.dependencies)
+        dependencies = list(self.dependencies)
+        for task in self.dependencies:
+            if task.dependencies:
+                dependencies += task.get_all_dependencies()
+        return dependencies
 
     def __eq__(self, other):
         """Comparison method: comparing the input operation ID
@@ -98,16 +225,157 @@ class Task:
         return self.op_id < other.op_id
 
 
+os.register_at_fork(after_in_child=Task.reset_op_id)
+
+
+def _strongly_connected_components(graph):
+    """Find the strongly connected components of a directed graph with Tarjan's algorithm, without recursion
+
+    Args:
+        graph (dict): node and the nodes it has edges to
+
+    Returns:
+        list: components, each a list of nodes
+    """
+    index, lowlink, on_stack, stack, components = {}, {}, set(), [], []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, edges = work[-1]
+            for successor in edges:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+# Nodes shut down or tried by _offline_order before it gives up.
+OFFLINE_ORDER_SEARCH_LIMIT = 200000
+
+
+def _offline_order(donors, max_offline, priority):
+    """Search an order in which to shut down nodes so that at most max_offline nodes are offline at the same time.
+    A node boots as soon as it and all the nodes giving it devices have been shut down. A node whose donors are
+    already offline goes offline next, as it boots right away. Otherwise each node that may go offline is tried in
+    turn, with backtracking, and the sets of shut down nodes from which no order was found are not tried again.
+
+    Args:
+        donors (dict): node and the nodes giving it devices
+        max_offline (int): maximum number of nodes offline at the same time
+        priority (Callable): key of the nodes, those with the lowest key are tried first
+
+    Returns:
+        list: nodes in the order they are shut down, or None if no order was found within
+            OFFLINE_ORDER_SEARCH_LIMIT steps
+    """
+    receivers = {cpu_id: [] for cpu_id in donors}
+    for cpu_id, donor_ids in donors.items():
+        for donor_id in donor_ids:
+            receivers[donor_id].append(cpu_id)
+    missing = {cpu_id: len(donor_ids) for cpu_id, donor_ids in donors.items()}
+    free = {cpu_id for cpu_id, count in missing.items() if count == 0}
+    order, taken = [], set()
+    # Nodes offline that still wait for donors, each of which keeps a node offline.
+    holding = 0
+
+    def shut(cpu_id):
+        nonlocal holding
+        order.append(cpu_id)
+        taken.add(cpu_id)
+        free.discard(cpu_id)
+        holding += missing[cpu_id] > 0
+        for receiver in receivers[cpu_id]:
+            missing[receiver] -= 1
+            if missing[receiver] == 0:
+                if receiver in taken:
+                    holding -= 1
+                else:
+                    free.add(receiver)
+
+    def undo(mark):
+        nonlocal holding
+        while len(order) > mark:
+            cpu_id = order.pop()
+            for receiver in receivers[cpu_id]:
+                if missing[receiver] == 0:
+                    if receiver in taken:
+                        holding += 1
+                    else:
+                        free.discard(receiver)
+                missing[receiver] += 1
+            taken.discard(cpu_id)
+            holding -= missing[cpu_id] > 0
+            if missing[cpu_id] == 0:
+                free.add(cpu_id)
+
+    failed = set()
+    frames = []
+    steps = 0
+    while True:
+        while free and holding < max_offline:
+            shut(min(free, key=priority))
+            steps += 1
+        if len(order) == len(donors):
+            return order
+        state = frozenset(taken)
+        if holding < max_offline and state not in failed:
+            candidates = sorted(
+                (cpu_id for cpu_id in donors if cpu_id not in taken),
+                key=lambda cpu_id: (missing[cpu_id], priority(cpu_id)),
+            )
+            steps += len(candidates)
+            frames.append((state, len(order), iter(candidates)))
+        while True:
+            if not frames or steps > OFFLINE_ORDER_SEARCH_LIMIT:
+                return None
+            state, mark, candidates = frames[-1]
+            undo(mark)
+            cpu_id = next(candidates, None)
+            if cpu_id is not None:
+                break
+            failed.add(state)
+            frames.pop()
+        shut(cpu_id)
+        steps += 1
+
+
 class Plan:
-    """migration procedures class"""
+    """migration procedures class.
+    The Tasks are kept in ascending operation ID order. Tasks are created with increasing operation IDs,
+    so appending and extending normally only add to the end of the list and no full sort is needed.
+    """
 
     def __init__(self, tasks):
         """constructor
 
         Args:
-            tasks (system): migration procedure
+            tasks (list[Task]): migration procedure
         """
-        self.tasks = tasks
+        self.tasks = sorted(tasks, key=_op_id_key)
 
     def append(self, task):
         """Add to Task list
@@ -115,15 +383,21 @@ class Plan:
         Args:
             task (Task): migration procedure
         """
-        self.tasks.append(task)
+        if self.tasks and task.op_id < self.tasks[-1].op_id:
+            bisect.insort(self.tasks, task, key=_op_id_key)
+        else:
+            self.tasks.append(task)
 
     def extend(self, other):
         """Add a list to Task list
 
         Args:
-            other (Task): migration procedure
+            other (Plan): migration procedure
         """
-        self.tasks += other.tasks
+        if self.tasks and other.tasks and other.tasks[0].op_id < self.tasks[-1].op_id:
+            self.tasks = list(heapq.merge(self.tasks, other.tasks, key=_op_id_key))
+        else:
+            self.tasks += other.tasks
 
     def remove(self, task):
         """Remove from the list
@@ -133,6 +407,23 @@ class Plan:
         """
         self.tasks.remove(task)
 
+    def renumber(self, key):
+        """Reorder the Tasks and reassign their operation IDs in the new order, starting from the lowest ID.
+        The order must keep every dependency before the Tasks depending on it.
+
+        Args:
+            key (Callable): sort key of a Task
+        """
+        if not self.tasks:
+            return
+        first_op_id = self.tasks[0].op_id
+        self.tasks.sort(key=key)
+        for op_id, task in enumerate(self.tasks, start=first_op_id):
+            task.op_id = op_id
+        # The dependencies are keyed by operation ID, so they are rebuilt with the new IDs.
+        for task in self.tasks:
+            task.dependencies = DependencySet(sorted(task.dependencies, key=_op_id_key))
+
     def encode_json(self):
         """Encode the migration procedure into a list type
 
@@ -165,6 +456,29 @@ class Plan:
         """
         return [task for task in self.tasks if task.cpu_id == cpu_id]
 
+    def device_slices(self):
+        """Group the Tasks by device ID in a single pass, skipping Tasks without a device
+
+        Returns:
+            dict: device ID and the Tasks on that device, in plan order
+        """
+        slices = {}
+        for task in self.tasks:
+            if task.device_id is not None:
+                slices.setdefault(task.device_id, []).append(task)
+        return slices
+
+    def cpu_slices(self):
+        """Group the Tasks by CPU device ID in a single pass
+
+        Returns:
+            dict: CPU device ID and the Tasks on that CPU, in plan order
+        """
+        slices = {}
+        for task in self.tasks:
+            slices.setdefault(task.cpu_id, []).append(task)
+        return slices
+
     def get_all_cpus(self):
         """Retrieve Tasks that have a cpu_id
 
@@ -199,88 +513,269 @@ class Plan:
 
     def complete_device_dependencies(self):
         """Organize dependencies"""
-        self.tasks.sort()
         self.create_device_dependencies()
         self.create_shutdown_dependencies()
         self.create_boot_dependencies()
 
     def create_device_dependencies(self):
         """create connect and disconnect task dependencies"""
-        for device_id in self.get_all_devices():
-            device_slice = self.device_slice(device_id)
+        for device_slice in self.device_slices().values():
             # Verifying from the next task, as the 0th element contains the same task.
             for depended, depending in zip(device_slice, device_slice[1:]):
-                depending.dependencies.append(depended)
+                depending.dependencies.add(depended)
 
     def create_shutdown_dependencies(self):
         """create shutdown task dependencies"""
         shutdown_tasks = self.get_shutdown_tasks()
         for task in self.tasks:
             if task.operation == Operation.CONNECT and task.cpu_id in shutdown_tasks:
-                shutdown_task = shutdown_tasks[task.cpu_id]
-                if shutdown_task not in task.dependencies:
-                    task.dependencies.append(shutdown_task)
+                task.dependencies.add(shutdown_tasks[task.cpu_id])
 
     def create_boot_dependencies(self):
         """create boot task dependencies"""
         boot_tasks = self.get_boot_tasks()
         for task in self.tasks:
             if task.operation == Operation.DISCONNECT and task.cpu_id in boot_tasks:
-                boot_task = boot_tasks[task.cpu_id]
-                if task not in boot_task.dependencies:
-                    boot_task.dependencies.append(task)
+                boot_tasks[task.cpu_id].dependencies.add(task)
 
     @classmethod
-    def system_update_plan(cls, prev, new):
+    def system_update_plan(cls, prev, new, hooks=None, hotplug_types=None, max_offline=None):
         """Create migration procedure
 
         Args:
             prev (task): current Layout
             new (task): desired Layout
+            hooks (list[PlanHook], optional): hooks called around each phase. Defaults to None.
+            hotplug_types (list[str], optional): device types that can be connected and disconnected
+                while the CPU is running. Defaults to None.
+            max_offline (int, optional): maximum number of nodes offline at the same time. Defaults to None.
 
         Returns:
             plan: migration procedures
         """
-        plan = Plan.system_destruct_plan(prev)
-        new_construct_plan = Plan.system_construct_plan(new)
+        tracer = PlanTracer(hooks)
+        plan = tracer.run("destruct", Plan.system_destruct_plan, prev)
+        new_construct_plan = tracer.run("construct", Plan.system_construct_plan, new)
         plan.extend(new_construct_plan)
-        plan.remove_redundant_tasks()
-        plan.complete_device_dependencies()
-        plan.remove_indirect_dependencies()
+        tracer.run("remove_redundant_tasks", plan.remove_redundant_tasks, plan=plan)
+        tracer.run(
+            "remove_hotplug_power_cycles",
+            plan.remove_hotplug_power_cycles,
+            device_types(prev, new) if hotplug_types else {},
+            hotplug_types,
+            plan=plan,
+        )
+        tracer.run("complete_device_dependencies", plan.complete_device_dependencies, plan=plan)
+        tracer.run("remove_indirect_dependencies", plan.remove_indirect_dependencies, plan=plan)
+        if max_offline is not None:
+            tracer.run("limit_offline_nodes", plan.limit_offline_nodes, max_offline, plan=plan)
         return plan
 
     def remove_redundant_tasks(self):
         """Remove redundant migration procedure"""
-        self.tasks.sort()
-        for device_id in self.get_all_devices():
-            device_slice = self.device_slice(device_id)
+        # Removing one task at a time is linear in the plan size, so collect the removed IDs and filter once.
+        removed = set()
+        for device_slice in self.device_slices().values():
             # Verifying whether the operations on the same device are limited to two (connect and disconnect only).
             if len(device_slice) == 2 and device_slice[0].cpu_id == device_slice[1].cpu_id:
-                self.remove(device_slice[0])
-                self.remove(device_slice[1])
-        for cpu_id in self.get_all_cpus():
-            cpu_slice = self.cpu_slice(cpu_id)
+                removed.update(task.op_id for task in device_slice)
+        self.tasks = [task for task in self.tasks if task.op_id not in removed]
+        for cpu_slice in self.cpu_slices().values():
             # Verifying whether the operations on the CPU are limited to two (boot and shutdown only).
             if len(cpu_slice) == 2 and cpu_slice[0].device_id is None and cpu_slice[1].device_id is None:
-                self.remove(cpu_slice[0])
-                self.remove(cpu_slice[1])
+                removed.update(task.op_id for task in cpu_slice)
+        self.tasks = [task for task in self.tasks if task.op_id not in removed]
+        self.remove_invalid_dependencies()
+
+    def remove_hotplug_power_cycles(self, types, hotplug_types):
+        """Remove the shutdown and the boot of the nodes whose device changes are all hot-pluggable.
+        Nodes that are added or removed keep their boot or shutdown.
+
+        Args:
+            types (dict): device ID and device type
+            hotplug_types (list[str]): device types that can be connected and disconnected while the CPU is running
+        """
+        if not hotplug_types:
+            return
+        hotplug_types = {device_type.lower() for device_type in hotplug_types}
+        removed = set()
+        for cpu_slice in self.cpu_slices().values():
+            power_tasks = [task for task in cpu_slice if task.device_id is None]
+            if len(power_tasks) == 2 and all(
+                types.get(task.device_id) in hotplug_types for task in cpu_slice if task.device_id is not None
+            ):
+                removed.update(task.op_id for task in power_tasks)
+        self.tasks = [task for task in self.tasks if task.op_id not in removed]
         self.remove_invalid_dependencies()
 
+    def limit_offline_nodes(self, max_offline):
+        """Keep at most the given number of nodes offline at the same time.
+        The plan is simulated in time slots where every operation takes one slot. A node going offline takes one
+        of the max_offline tokens and its boot hands the token over to the shutdown of a later node, which then
+        depends on that boot. A node can boot once the nodes giving it devices have been shut down, so nodes go
+        offline after the nodes giving them devices where possible.
+        Nodes that exchange devices in a cycle cannot all wait for each other: one of them goes offline first and
+        stays offline until the others have handed their devices around the cycle, so a cycle needs at least two
+        tokens, and more when its nodes receive devices from several others. The nodes of one cycle at a time go
+        offline before their donors. When all the tokens end up held by nodes waiting for devices of nodes that
+        are still online, the order of the shutdowns is searched with backtracking instead, see _offline_order.
+        Among the nodes that may go offline, those with the longest chain of operations depending on them go
+        first, so that as much as possible still runs in parallel.
+        Only nodes that are both shut down and booted are counted. When dependencies were added, the operation IDs
+        are renumbered in the simulated order so that dependencies keep lower operation IDs.
+
+        Args:
+            max_offline (int): maximum number of nodes offline at the same time
+
+        Raises:
+            AvailabilityBudgetError: no order was found that keeps at most max_offline nodes offline
+        """
+        shutdown_tasks = self.get_shutdown_tasks()
+        boot_tasks = self.get_boot_tasks()
+        # For each power-cycled node, the power-cycled nodes its new devices are disconnected from.
+        donors = {cpu_id: set() for cpu_id in shutdown_tasks if cpu_id in boot_tasks}
+        for task in self.tasks:
+            if task.operation == Operation.CONNECT and task.cpu_id in donors:
+                donors[task.cpu_id].update(
+                    depending.cpu_id
+                    for depending in task.dependencies
+                    if depending.operation == Operation.DISCONNECT
+                    and depending.cpu_id in donors
+                    and depending.cpu_id != task.cpu_id
+                )
+        groups = _strongly_connected_components(donors)
+        cyclic = [group for group in groups if len(group) > 1]
+        if cyclic and max_offline < 2:
+            raise AvailabilityBudgetError(max_offline, sorted(cyclic[0]))
+
+        dependents = {task.op_id: [] for task in self.tasks}
+        pending = {}
+        for task in self.tasks:
+            pending[task.op_id] = len(task.dependencies)
+            for depending in task.dependencies:
+                dependents[depending.op_id].append(task)
+        levels = {}
+        for task in reversed(self.tasks):
+            levels[task.op_id] = 1 + max((levels[dependent.op_id] for dependent in dependents[task.op_id]), default=0)
+
+        def priority(cpu_id):
+            shutdown = shutdown_tasks[cpu_id]
+            return -levels[shutdown.op_id], shutdown.op_id, cpu_id
+
+        group_index = {cpu_id: index for index, group in enumerate(groups) for cpu_id in group}
+        receivers = {cpu_id: [] for cpu_id in donors}
+        # Donors still online, and how many of them are outside the cycle of each node.
+        missing = {cpu_id: len(donor_ids) for cpu_id, donor_ids in donors.items()}
+        outside = [0] * len(groups)
+        for cpu_id, donor_ids in donors.items():
+            for donor_id in donor_ids:
+                receivers[donor_id].append(cpu_id)
+                if group_index[donor_id] != group_index[cpu_id]:
+                    outside[group_index[cpu_id]] += 1
+        remaining = [len(group) for group in groups]
+        # Nodes whose donors are all offline, and cycles whose donors outside the cycle are all offline.
+        free = [priority(cpu_id) for cpu_id in donors if missing[cpu_id] == 0]
+        cycles = [(min(priority(cpu_id) for cpu_id in groups[index]), index) for index in range(len(groups))]
+        cycles = [entry for entry in cycles if remaining[entry[1]] > 1 and not outside[entry[1]]]
+        heapq.heapify(free)
+        heapq.heapify(cycles)
+        taken = set()
+        # Nodes offline that still wait for donors, each of which keeps a token.
+        holding = 0
+        # Only one cycle at a time takes nodes that still wait for donors, so that cycles do not block each other.
+        active, members = None, []
+
+        def take():
+            """Take the next node to go offline"""
+            nonlocal active, members, holding
+            if free:
+                cpu_id = heapq.heappop(free)[-1]
+            else:
+                while active is None or remaining[active] == 0:
+                    active = heapq.heappop(cycles)[1]
+                    members = [(missing[cpu_id], *priority(cpu_id)) for cpu_id in groups[active] if cpu_id not in taken]
+                    heapq.heapify(members)
+                while members[0][-1] in taken or members[0][0] != missing[members[0][-1]]:
+                    heapq.heappop(members)
+                cpu_id = heapq.heappop(members)[-1]
+            taken.add(cpu_id)
+            holding += missing[cpu_id] > 0
+            remaining[group_index[cpu_id]] -= 1
+            for receiver in receivers[cpu_id]:
+                missing[receiver] -= 1
+                group = group_index[receiver]
+                if group != group_index[cpu_id]:
+                    outside[group] -= 1
+                    if outside[group] == 0 and len(groups[group]) > 1:
+                        heapq.heappush(cycles, (min(priority(member) for member in groups[group]), group))
+                if receiver in taken:
+                    holding -= missing[receiver] == 0
+                elif missing[receiver] == 0:
+                    heapq.heappush(free, priority(receiver))
+                elif group == active:
+                    heapq.heappush(members, (missing[receiver], *priority(receiver)))
+            return cpu_id
+
+        # The shutdowns are ordered first. A node can go offline as long as not all the tokens are held by nodes
+        # waiting for donors that are still online, as those cannot boot before another node goes offline.
+        order = []
+        while len(order) < len(donors) and holding < max_offline:
+            order.append(take())
+        if len(order) < len(donors):
+            order = _offline_order(donors, max_offline, priority)
+            if order is None:
+                raise AvailabilityBudgetError(max_offline, sorted(groups[active]))
+
+        gated = {shutdown_tasks[cpu_id].op_id for cpu_id in donors}
+        power_cycled_boots = {boot_tasks[cpu_id].op_id for cpu_id in donors}
+        ready = [task for task in self.tasks if pending[task.op_id] == 0 and task.op_id not in gated]
+        # Each token is free from the start or released by the boot of the node that held it.
+        tokens = [None] * max_offline
+        handovers = []
+        slots = {}
+        slot = 0
+        position = 0
+        while True:
+            running = ready
+            while tokens and position < len(order):
+                cpu_id = order[position]
+                position += 1
+                released_by = tokens.pop()
+                if released_by is not None:
+                    handovers.append((shutdown_tasks[cpu_id], released_by))
+                # Shutdowns do not depend on other operations, so they start as soon as they have a token.
+                running.append(shutdown_tasks[cpu_id])
+            if not running:
+                break
+            ready = []
+            for task in running:
+                slots[task.op_id] = slot
+                if task.op_id in power_cycled_boots:
+                    tokens.append(task)
+                for dependent in dependents[task.op_id]:
+                    pending[dependent.op_id] -= 1
+                    if pending[dependent.op_id] == 0 and dependent.op_id not in gated:
+                        ready.append(dependent)
+            slot += 1
+        for shutdown, released_by in handovers:
+            shutdown.dependencies.add(released_by)
+        if handovers:
+            self.renumber(key=lambda task: (slots[task.op_id], task.op_id))
+
     def remove_invalid_dependencies(self):
         """Remove tasks that are invalid from dependencies"""
-        self.tasks.sort()
         task_ids = {task.op_id for task in self.tasks}
         for task in self.tasks:
-            task.dependencies = [depending for depending in task.dependencies if depending.op_id in task_ids]
+            task.dependencies = DependencySet(
+                depending for depending in task.dependencies if depending.op_id in task_ids
+            )
 
     def remove_indirect_dependencies(self):
         """Remove tasks with an indirect status from dependencies"""
-        self.tasks.sort()
         for task in reversed(self.tasks):
             for depending in task.dependencies.copy():
                 for ind_depending in depending.get_all_dependencies():
-                    if ind_depending in task.dependencies:
-                        task.dependencies.remove(ind_depending)
+                    task.dependencies.discard(ind_depending)
 
     @classmethod
     def system_destruct_plan(cls, system):
@@ -0,0 +1,145 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Resource-constrained scheduling of migration procedures"""
+
+import heapq
+from collections import Counter
+
+from migration_procedure_generator.operation import Operation
+
+FABRIC_OPERATIONS = (Operation.CONNECT, Operation.DISCONNECT)
+
+
+class Schedule:
+    """Migration procedures grouped into time slots.
+    The operations of a slot run concurrently and a slot starts when the previous one has completed.
+    """
+
+    def __init__(self, slots):
+        """constructor
+
+        Args:
+            slots (list[list[Task]]): operations of each time slot
+        """
+        self.slots = slots
+
+    @property
+    def order(self):
+        """Get the execution order, slot by slot
+
+        Returns:
+            list: migration procedure
+        """
+        return [task for slot in self.slots for task in slot]
+
+    def encode_json(self):
+        """Encode the schedule in JSON format
+
+        Returns:
+            dict: operation IDs of each time slot and in execution order
+        """
+        return {
+            "slots": [[task.op_id for task in slot] for slot in self.slots],
+            "order": [task.op_id for task in self.order],
+        }
+
+
+def _resources(signature: tuple, caps: dict) -> list:
+    """List the capped resources that an operation uses
+
+    Args:
+        signature (tuple): operation and device type
+        caps (dict): concurrency caps
+
+    Returns:
+        list: resource names and their caps
+    """
+    operation, device_type = signature
+    resources = []
+    if operation in FABRIC_OPERATIONS and "fabric" in caps:
+        resources.append((("fabric",), caps["fabric"]))
+    if operation in caps.get("operations", {}):
+        resources.append((("operation", operation), caps["operations"][operation]))
+    # Device types in the layouts are converted to lowercase, so the configured names are compared in lowercase.
+    device_type_caps = {name.lower(): cap for name, cap in caps.get("device_types", {}).items()}
+    if device_type in device_type_caps:
+        resources.append((("device_type", device_type), device_type_caps[device_type]))
+    return resources
+
+
+def schedule_plan(plan, types: dict, caps: dict) -> Schedule:
+    """Schedule the migration procedures into time slots with list scheduling.
+    In each slot the ready operations are placed in the order of the longest chain of operations depending on
+    them, so that the critical path is started first, until the caps are reached.
+    Operations of the same kind and device type share a queue, so a slot costs time in proportion to the
+    operations placed in it and not to the operations still waiting.
+
+    Args:
+        plan (Plan): migration procedures
+        types (dict): device ID and device type
+        caps (dict): concurrency caps. "fabric" limits the concurrent connect and disconnect operations,
+            "operations" the operations of each kind and "device_types" the operations on each device type.
+
+    Returns:
+        Schedule: schedule
+    """
+    dependents = {task.op_id: [] for task in plan.tasks}
+    pending = {}
+    for task in plan.tasks:
+        pending[task.op_id] = len(task.dependencies)
+        for depending in task.dependencies:
+            dependents[depending.op_id].append(task)
+
+    # Dependencies have lower operation IDs than the tasks depending on them, so the reversed plan is a
+    # reverse topological order.
+    levels = {}
+    for task in reversed(plan.tasks):
+        levels[task.op_id] = 1 + max((levels[dependent.op_id] for dependent in dependents[task.op_id]), default=0)
+
+    queues, signatures = {}, {}
+
+    def release(task):
+        signature = (task.operation, types.get(task.device_id))
+        if signature not in signatures:
+            signatures[signature] = _resources(signature, caps)
+        heapq.heappush(queues.setdefault(signature, []), (-levels[task.op_id], task.op_id, task))
+
+    for task in plan.tasks:
+        if pending[task.op_id] == 0:
+            release(task)
+
+    slots = []
+    while any(queues.values()):
+        slot, usage = [], Counter()
+        candidates = [(queue[0][0], queue[0][1], signature) for signature, queue in queues.items() if queue]
+        heapq.heapify(candidates)
+        while candidates:
+            _, _, signature = heapq.heappop(candidates)
+            resources = signatures[signature]
+            if any(usage[resource] >= cap for resource, cap in resources):
+                # The queue stays blocked for the rest of the slot.
+                continue
+            usage.update(resource for resource, _ in resources)
+            queue = queues[signature]
+            slot.append(heapq.heappop(queue)[2])
+            if queue:
+                heapq.heappush(candidates, (queue[0][0], queue[0][1], signature))
+        slot.sort(key=lambda task: task.op_id)
+        slots.append(slot)
+        for task in slot:
+            for dependent in dependents[task.op_id]:
+                pending[dependent.op_id] -= 1
+                if pending[dependent.op_id] == 0:
+                    release(dependent)
+    return Schedule(slots)
@@ -31,6 +31,164 @@ config_schema = {
                     "type": "integer",
                     "description": "Port number to be used for the waiting process",
                 },
+                "workers": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Number of worker processes. Background jobs are only available with 1, since "
+                    "each process keeps its own jobs.",
+                },
+                "backlog": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of pending connections of the listen socket",
+                },
+                "timeout_keep_alive": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Seconds to keep an idle connection open",
+                },
+                "limit_concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of concurrent connections per worker before responding 503",
+                },
+                "uds": {
+                    "type": "string",
+                    "description": "Unix domain socket path to be used instead of the host and port",
+                },
+            },
+        },
+        "profiling": {
+            "type": "object",
+            "description": "Sampling profiler of the planner",
+            "required": ["interval", "directory"],
+            "properties": {
+                "interval": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Profile every Nth request. 0 disables profiling",
+                },
+                "directory": {
+                    "type": "string",
+                    "description": "Directory where the profile statistics are written",
+                },
+            },
+        },
+        "compression": {
+            "type": "object",
+            "description": "Compression of the responses",
+            "required": ["minimum_size", "level"],
+            "properties": {
+                "minimum_size": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Responses smaller than this number of bytes are not compressed",
+                },
+                "level": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 9,
+                    "description": "Compression level",
+                },
+            },
+        },
+        "hotplug": {
+            "type": "object",
+            "description": "Hot-plug capability of the devices",
+            "required": ["device_types"],
+            "properties": {
+                "device_types": {
+                    "type": "array",
+                    "description": "Device types that can be connected and disconnected while the CPU is running",
+                    "items": {"type": "string"},
+                },
+            },
+        },
+        "scheduling": {
+            "type": "object",
+            "description": "Concurrency caps of the scheduled migration procedure",
+            "additionalProperties": False,
+            "properties": {
+                "fabric": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of concurrent connect and disconnect operations",
+                },
+                "operations": {
+                    "type": "object",
+                    "description": "Maximum number of concurrent operations of each kind",
+                    "propertyNames": {"enum": ["shutdown", "connect", "disconnect", "boot"]},
+                    "additionalProperties": {"type": "integer", "minimum": 1},
+                },
+                "device_types": {
+                    "type": "object",
+                    "description": "Maximum number of concurrent operations on each device type",
+                    "additionalProperties": {"type": "integer", "minimum": 1},
+                },
+            },
+        },
+        "jobs": {
+            "type": "object",
+            "description": "Background jobs that create migration procedures",
+            "required": ["workers", "ttl"],
+            "properties": {
+                "workers": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of jobs running at the same time",
+                },
+                "ttl": {
+                    "type": "number",
+                    "exclusiveMinimum": 0,
+                    "description": "Seconds a job may wait for a worker before it is cancelled, and seconds a job "
+                    "and its result are kept after the job has finished",
+                },
+                "max_queued": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of jobs waiting for a worker before new jobs are refused",
+                },
+            },
+        },
+        "layout_apply": {
+            "type": "object",
+            "description": "Layout apply service to which migration procedures are submitted on request",
+            "required": ["url", "timeout"],
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "pattern": "^https?://",
+                    "description": "URL to which the migration procedures are posted",
+                },
+                "timeout": {
+                    "type": "number",
+                    "exclusiveMinimum": 0,
+                    "description": "Seconds to wait for the connection and for the response",
+                },
+                "retries": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Retries of a submission that fails to connect",
+                },
+            },
+        },
+        "durations": {
+            "type": "object",
+            "description": "Estimated duration of each kind of operation, used to minimize the downtime of the nodes",
+            "propertyNames": {"enum": ["shutdown", "connect", "disconnect", "boot"]},
+            "additionalProperties": {"type": "number", "exclusiveMinimum": 0},
+        },
+        "request_log": {
+            "type": "object",
+            "description": "Logging of the requests",
+            "required": ["sample_interval"],
+            "properties": {
+                "sample_interval": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Log the whole layouts of every Nth request at INFO level. "
+                    "0 logs them only at DEBUG level",
+                },
             },
         },
     },
@@ -98,6 +256,23 @@ log_config_schema = {
             },
             "required": ["level", "handlers"],
         },
+        "queue": {
+            "type": "object",
+            "description": "Queued mode, in which the handlers write the records on a background listener thread",
+            "required": ["maxsize", "overflow"],
+            "properties": {
+                "maxsize": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of records waiting to be written",
+                },
+                "overflow": {
+                    "type": "string",
+                    "enum": ["block", "drop_new", "drop_oldest"],
+                    "description": "What to do with a record logged while the queue is full",
+                },
+            },
+        },
     },
 }
 
@@ -13,33 +13,86 @@
 #  under the License.
 """migration procedure generator restapi"""
 
+import argparse
+import json
+from contextlib import asynccontextmanager
 from http import HTTPStatus
+from typing import Literal
 
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI
+from fastapi import FastAPI, Query, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.middleware.cors import CORSMiddleware
 
+from migration_procedure_generator.common.logger import Logger
 from migration_procedure_generator.custom_exception import (
+    AvailabilityBudgetError,
     CustomBaseException,
+    JobNotCompletedError,
+    JobNotFoundError,
+    JobQueueFullError,
+    JobsUnavailableError,
     JsonSchemaError,
+    LayoutApplyError,
     RequestError,
     SettingFileValidationError,
     LogSettingFileValidationError,
     LogInitializationError,
 )
-from migration_procedure_generator.model import NodeLayout
+from migration_procedure_generator.coalescing import SingleFlight, canonical_hash
+from migration_procedure_generator.compression import compress_body
+from migration_procedure_generator.downtime import minimize_downtime
+from migration_procedure_generator.encoding import BINARY_MEDIA_TYPE, encode_binary, select_media_type
+from migration_procedure_generator.health import WARMUP_LAYOUTS, Readiness
+from migration_procedure_generator.jobs import FINISHED_STATUSES, Job, JobManager, JobStatus
+from migration_procedure_generator.model import NodeLayout, layouts_digest
 from migration_procedure_generator.plan import Plan, Task
-from migration_procedure_generator.setting import MigrationConfigReader, initialize_log
-from migration_procedure_generator.system import System
+from migration_procedure_generator.schedule import schedule_plan
+from migration_procedure_generator.setting import (
+    MigrationConfigReader,
+    add_config_arguments,
+    apply_config_arguments,
+    initialize_log,
+    log_request,
+)
+from migration_procedure_generator.submission import LayoutApplySubmitter
+from migration_procedure_generator.system import System, device_types
+from migration_procedure_generator.tracing import PhaseTimer, PlanTracer, SamplingProfiler
+
+
+@asynccontextmanager
+async def lifespan(_):
+    """Warm up in the background when the application starts.
+    Stop the background jobs, close the connections to layout apply and write the queued log records when it
+    shuts down.
+    """
+    readiness.start(_warm_up)
+    yield
+    job_manager.shutdown()
+    layout_apply_submitter.close()
+    Logger.stop_listener()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+APP_IMPORT_STRING = "migration_procedure_generator.server:app"
 BASEURL = "/cdim/api/v1/"
+JOBS_URL = BASEURL + "migration-procedure-jobs"
 JSON_RESPONSE_HEADERS = {
     "X-Content-Type-Options": "nosniff",
     "Content-Type": "application/json; charset=utf-8",
 }
+BINARY_RESPONSE_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Type": BINARY_MEDIA_TYPE,
+}
+request_profiler = SamplingProfiler()
+job_manager = JobManager()
+request_coalescer = SingleFlight()
+readiness = Readiness()
+layout_apply_submitter = LayoutApplySubmitter()
+# Errors of failed jobs caused by the request rather than by the server
+CLIENT_ERRORS = (JsonSchemaError, AvailabilityBudgetError)
 
 
 # Avoid CORS
@@ -78,6 +131,56 @@ def jsonschema_validation_handler(_, exc: JsonSchemaError):
     )
 
 
+@app.exception_handler(AvailabilityBudgetError)
+def availability_budget_handler(_, exc: AvailabilityBudgetError):
+    """Return an error code and message if the nodes cannot be kept within the availability budget."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.BAD_REQUEST.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
+
+
+@app.exception_handler(JobNotFoundError)
+def job_not_found_handler(_, exc: JobNotFoundError):
+    """Return an error code and message if the job is unknown or has expired."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.NOT_FOUND.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
+
+
+@app.exception_handler(JobNotCompletedError)
+def job_not_completed_handler(_, exc: JobNotCompletedError):
+    """Return an error code and message if the result of a job is requested before the job has succeeded."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.CONFLICT.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
+
+
+@app.exception_handler(JobQueueFullError)
+def job_queue_full_handler(_, exc: JobQueueFullError):
+    """Return an error code and message if too many jobs are waiting for a worker."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
+
+
+@app.exception_handler(JobsUnavailableError)
+def jobs_unavailable_handler(_, exc: JobsUnavailableError):
+    """Return an error code and message if jobs are requested from a server with several worker processes."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.NOT_IMPLEMENTED.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
+
+
 @app.exception_handler(SettingFileValidationError)
 def setting_validation_handler(_, exc: SettingFileValidationError):
     """Return an error code and message if an error occurs in the configuration file."""
@@ -108,17 +211,40 @@ def log_initialization_failed_handler(_, exc: LogInitializationError):
     )
 
 
-def _initialize_ope_id():
-    """operationID initialization"""
-    Task.__index_op_id__ = 0
+@app.exception_handler(LayoutApplyError)
+def layout_apply_handler(_, exc: LayoutApplyError):
+    """Return an error code and message if the migration procedure could not be submitted to layout apply."""
+    return JSONResponse(
+        content=exc.response_msg,
+        status_code=HTTPStatus.BAD_GATEWAY.value,
+        headers=JSON_RESPONSE_HEADERS,
+    )
 
 
 @app.post(BASEURL + "migration-procedures", response_class=JSONResponse)
-def create_migration_procedure(nodelayout: NodeLayout, background_tasks: BackgroundTasks):
+def create_migration_procedure(
+    nodelayout: NodeLayout,
+    request: Request,
+    schedule: bool = False,
+    optimize: Literal["downtime"] | None = None,
+    max_offline: int | None = Query(None, ge=1),
+    submit: bool = False,
+):
     """Creating a migration procedure
 
     Args:
         nodelayout (NodeLayout):current layout and desired layout
+        request (Request): request. The Accept header selects the JSON or the columnar binary encoding.
+        schedule (bool, optional): also return the time slots and the execution order within the concurrency caps
+            of the fabric. The response is then always in JSON format. Defaults to False.
+        optimize (str, optional): "downtime" orders the migration procedure so that each node is offline as briefly
+            as possible and also returns the estimated downtime of each node, before and after the optimization.
+            The response is then always in JSON format. Defaults to None.
+        max_offline (int, optional): maximum number of nodes offline at the same time. Boots are made to precede
+            shutdowns of other nodes as needed. Defaults to None, in which case the number is not limited.
+        submit (bool, optional): also post the migration procedure to the layout apply service of the configuration
+            file and return its response as "layoutApply". The response is then always in JSON format.
+            Defaults to False.
 
     Returns:
         JSONResponse: migration procedure
@@ -126,27 +252,350 @@ def create_migration_procedure(nodelayout: NodeLayout, background_tasks: Backgro
     logger = None
     logger = initialize_log()
     logger.info("Start running")
-    logger.info(f"request param :{nodelayout}")
-    bound_devices_map = nodelayout.desiredLayout.get("boundDevices", {})
-    procedures = Plan.system_update_plan(
-        prev=System.decode_json(nodelayout.currentLayout, bound_devices_map),
-        new=System.decode_json(nodelayout.desiredLayout, bound_devices_map),
+    key = canonical_hash(nodelayout.model_dump(), schedule, optimize, max_offline)
+    log_request(
+        logger,
+        layouts_digest(nodelayout.currentLayout, nodelayout.desiredLayout, key),
+        lambda: f"request param :{nodelayout}",
     )
-    response = JSONResponse(
-        status_code=HTTPStatus.OK.value,
-        content=procedures.encode_json(),
-        headers=JSON_RESPONSE_HEADERS,
+    if submit:
+        # Refuse the request before generating the migration procedure if it could not be submitted.
+        layout_apply_submitter.check_config()
+    timer = PhaseTimer()
+    # Identical requests handled at the same time share one computation. Only that computation records timings.
+    procedures, extras = request_coalescer.run(
+        key, _generate_procedures, nodelayout, schedule, optimize, max_offline, [timer]
     )
-    background_tasks.add_task(_initialize_ope_id)
+    logger.debug(f"phase timings :{timer.encode_json()}")
+    if submit:
+        # The results are shared by the coalesced requests, each of which submits the procedure itself.
+        extras = {**extras, "layoutApply": layout_apply_submitter.submit(procedures)}
+    response = _encode_response(request, procedures, MigrationConfigReader().compression_config, extras)
     logger.info("Completed successfully")
     return response
 
 
+def _generate_procedures(
+    nodelayout: NodeLayout, schedule: bool, optimize: str | None, max_offline: int | None, hooks: list
+) -> tuple:
+    """Generate the migration procedure and the results requested together with it
+
+    Args:
+        nodelayout (NodeLayout): current layout and desired layout
+        schedule (bool): also schedule the migration procedure
+        optimize (str | None): "downtime" orders the migration procedure to minimize the downtime of the nodes
+        max_offline (int | None): maximum number of nodes offline at the same time
+        hooks (list[PlanHook]): hooks called around each planner phase
+
+    Returns:
+        tuple: migration procedure, and the encoded results returned together with it
+    """
+    profiling_config = MigrationConfigReader().profiling_config
+    hotplug_types = nodelayout.hotplugDeviceTypes
+    if hotplug_types is None:
+        hotplug_types = MigrationConfigReader().hotplug_config["device_types"]
+    bound_devices_map = nodelayout.desiredLayout.get("boundDevices", {})
+    prev = System.decode_json(nodelayout.currentLayout, bound_devices_map)
+    new = System.decode_json(nodelayout.desiredLayout, bound_devices_map)
+    # Each request numbers its operations from 1, even when requests are handled concurrently.
+    with Task.op_id_scope():
+        procedures = request_profiler.run(
+            profiling_config["interval"],
+            profiling_config["directory"],
+            Plan.system_update_plan,
+            prev=prev,
+            new=new,
+            hooks=hooks,
+            hotplug_types=hotplug_types,
+            max_offline=max_offline,
+        )
+    extras = {}
+    if optimize == "downtime":
+        report = PlanTracer(hooks).run(
+            "minimize_downtime",
+            minimize_downtime,
+            procedures,
+            MigrationConfigReader().durations_config,
+            plan=procedures,
+        )
+        extras["downtime"] = report.encode_json()
+    if schedule:
+        plan_schedule = PlanTracer(hooks).run(
+            "schedule",
+            schedule_plan,
+            procedures,
+            device_types(prev, new),
+            MigrationConfigReader().scheduling_config,
+            plan=procedures,
+        )
+        extras["schedule"] = plan_schedule.encode_json()
+    return procedures, extras
+
+
+@app.post(JOBS_URL, status_code=HTTPStatus.ACCEPTED.value, response_class=JSONResponse)
+def create_migration_procedure_job(
+    nodelayout: NodeLayout,
+    schedule: bool = False,
+    optimize: Literal["downtime"] | None = None,
+    max_offline: int | None = Query(None, ge=1),
+    submit: bool = False,
+):
+    """Submitting a job that creates a migration procedure in the background.
+    The parameters are the same as those of create_migration_procedure.
+    Jobs are kept in the memory of the worker process, so they are refused when the server runs several worker
+    processes, which would not find the jobs of each other.
+
+    Args:
+        nodelayout (NodeLayout): current layout and desired layout
+        schedule (bool, optional): also return the schedule of the migration procedure. Defaults to False.
+        optimize (str, optional): "downtime" minimizes the downtime of the nodes. Defaults to None.
+        max_offline (int, optional): maximum number of nodes offline at the same time. Defaults to None.
+        submit (bool, optional): also post the migration procedure to layout apply. Defaults to False.
+
+    Raises:
+        JobsUnavailableError: the server runs several worker processes
+        SettingFileValidationError: submit is set and no layout apply service is configured
+        JobQueueFullError: too many jobs are waiting for a worker
+
+    Returns:
+        JSONResponse: status of the queued job, with its URL in the Location header
+    """
+    config = MigrationConfigReader()
+    workers = config.migration_procedures_config.get("workers", 1)
+    if workers > 1:
+        raise JobsUnavailableError(workers)
+    if submit:
+        layout_apply_submitter.check_config()
+    jobs_config = config.jobs_config
+    job = job_manager.submit(
+        _run_migration_job,
+        nodelayout,
+        schedule,
+        optimize,
+        max_offline,
+        submit,
+        workers=jobs_config["workers"],
+        ttl=jobs_config["ttl"],
+        max_queued=jobs_config["max_queued"],
+    )
+    return JSONResponse(
+        content=job.encode_json(),
+        status_code=HTTPStatus.ACCEPTED.value,
+        headers={**JSON_RESPONSE_HEADERS, "Location": f"{JOBS_URL}/{job.job_id}"},
+    )
+
+
+def _run_migration_job(
+    job: Job, nodelayout: NodeLayout, schedule: bool, optimize: str | None, max_offline: int | None, submit: bool
+) -> tuple:
+    """Body of a migration procedure job, run on a worker of the job manager
+
+    Args:
+        job (Job): job
+        nodelayout (NodeLayout): current layout and desired layout
+        schedule (bool): also schedule the migration procedure
+        optimize (str | None): "downtime" orders the migration procedure to minimize the downtime of the nodes
+        max_offline (int | None): maximum number of nodes offline at the same time
+        submit (bool): also post the migration procedure to layout apply
+
+    Returns:
+        tuple: migration procedure, and the encoded results returned together with it
+    """
+    logger = initialize_log()
+    logger.info(f"Start running job {job.job_id}")
+    key = canonical_hash(nodelayout.model_dump(), schedule, optimize, max_offline)
+    log_request(
+        logger,
+        layouts_digest(nodelayout.currentLayout, nodelayout.desiredLayout, key),
+        lambda: f"request param :{nodelayout}",
+    )
+    timer = PhaseTimer()
+    procedures, extras = _generate_procedures(nodelayout, schedule, optimize, max_offline, [timer, job.progress])
+    logger.debug(f"phase timings :{timer.encode_json()}")
+    if submit:
+        extras["layoutApply"] = layout_apply_submitter.submit(procedures)
+    logger.info(f"Job {job.job_id} completed successfully")
+    return procedures, extras
+
+
+def _get_job(job_id: str) -> Job:
+    """Retrieve a job that has not expired
+
+    Args:
+        job_id (str): job ID
+
+    Raises:
+        JobNotFoundError: the job is unknown or has expired
+
+    Returns:
+        Job: job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    return job
+
+
+@app.get(JOBS_URL + "/{job_id}", response_class=JSONResponse)
+def get_migration_procedure_job(job_id: str):
+    """Retrieving the status and the progress of a job
+
+    Args:
+        job_id (str): job ID
+
+    Returns:
+        JSONResponse: status of the job
+    """
+    return JSONResponse(content=_get_job(job_id).encode_json(), headers=JSON_RESPONSE_HEADERS)
+
+
+@app.get(JOBS_URL + "/{job_id}/result", response_class=JSONResponse)
+def get_migration_procedure_job_result(job_id: str, request: Request):
+    """Retrieving the migration procedure created by a job, encoded like the response of create_migration_procedure
+
+    Args:
+        job_id (str): job ID
+        request (Request): request. The Accept header selects the JSON or the columnar binary encoding.
+
+    Raises:
+        JobNotCompletedError: the job is queued, running or cancelled
+
+    Returns:
+        Response: migration procedure, or the error of a failed job
+    """
+    job = _get_job(job_id)
+    if job.status == JobStatus.FAILED:
+        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+        if isinstance(job.error, CLIENT_ERRORS):
+            status_code = HTTPStatus.BAD_REQUEST
+        elif isinstance(job.error, LayoutApplyError):
+            status_code = HTTPStatus.BAD_GATEWAY
+        return JSONResponse(
+            content=job.encode_json()["error"], status_code=status_code.value, headers=JSON_RESPONSE_HEADERS
+        )
+    if job.status != JobStatus.SUCCEEDED:
+        raise JobNotCompletedError(job_id, job.status)
+    procedures, extras = job.result
+    return _encode_response(request, procedures, MigrationConfigReader().compression_config, extras)
+
+
+@app.delete(JOBS_URL + "/{job_id}", response_class=JSONResponse)
+def delete_migration_procedure_job(job_id: str):
+    """Cancelling a queued or running job, or discarding a finished job and its result.
+    A running job stops at the start of its next planner phase.
+
+    Args:
+        job_id (str): job ID
+
+    Raises:
+        JobNotFoundError: the job is unknown or has expired
+
+    Returns:
+        JSONResponse: status of the job. 202 while a running job has not stopped yet.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    status_code = HTTPStatus.OK if job.status in FINISHED_STATUSES else HTTPStatus.ACCEPTED
+    return JSONResponse(content=job.encode_json(), status_code=status_code.value, headers=JSON_RESPONSE_HEADERS)
+
+
+@app.get(BASEURL + "metrics", response_class=JSONResponse)
+def get_metrics():
+    """Retrieving the metrics of the request handling
+
+    Returns:
+        JSONResponse: counters of the coalesced requests and of the log records dropped by the queued logging
+    """
+    content = {"coalescing": request_coalescer.encode_json(), "logging": {"droppedRecords": Logger.dropped_records()}}
+    return JSONResponse(content=content, headers=JSON_RESPONSE_HEADERS)
+
+
+def _encode_response(request: Request, procedures: Plan, compression_config: dict, extras: dict = None) -> Response:
+    """Render the migration procedure in the negotiated encoding and compress it once
+
+    Args:
+        request (Request): request carrying the Accept and Accept-Encoding headers
+        procedures (Plan): migration procedure
+        compression_config (dict): compression settings
+        extras (dict, optional): encoded results returned together with the migration procedure, such as its
+            schedule. When given, they are returned in a JSON object with the migration procedure as "procedures".
+            Defaults to None.
+
+    Returns:
+        Response: migration procedure
+    """
+    if not extras and select_media_type(request.headers.get("accept")) == BINARY_MEDIA_TYPE:
+        body = encode_binary(procedures)
+        headers = BINARY_RESPONSE_HEADERS
+    else:
+        content = procedures.encode_json()
+        if extras:
+            content = {"procedures": content, **extras}
+        # Same rendering as JSONResponse, but kept as bytes so that it is compressed without another copy.
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        headers = JSON_RESPONSE_HEADERS
+    body, coding = compress_body(
+        body,
+        request.headers.get("accept-encoding"),
+        compression_config["minimum_size"],
+        compression_config["level"],
+    )
+    headers = {**headers, "Vary": "Accept, Accept-Encoding"}
+    if coding:
+        headers["Content-Encoding"] = coding
+    return Response(status_code=HTTPStatus.OK.value, content=body, headers=headers)
+
+
+@app.get("/health/live", response_class=JSONResponse)
+def get_liveness():
+    """Checking that the server is running
+
+    Returns:
+        JSONResponse: status of the server
+    """
+    return JSONResponse(content={"status": "alive"}, headers=JSON_RESPONSE_HEADERS)
+
+
+@app.get("/health/ready", response_class=JSONResponse)
+def get_readiness():
+    """Checking that the server has warmed up and is ready to handle requests
+
+    Returns:
+        JSONResponse: readiness of the server, with the status code 503 until the warm-up has completed
+    """
+    status_code = HTTPStatus.OK if readiness.ready.is_set() else HTTPStatus.SERVICE_UNAVAILABLE
+    return JSONResponse(content=readiness.encode_json(), status_code=status_code.value, headers=JSON_RESPONSE_HEADERS)
+
+
+def _warm_up() -> None:
+    """Pay the one-time costs of the first request: read the settings, initialize the log, build the validators
+    and run a dummy migration procedure through every planner phase and both encodings.
+    """
+    logger = initialize_log()
+    logger.info("Start warming up")
+    nodelayout = NodeLayout.model_validate(WARMUP_LAYOUTS)
+    timer = PhaseTimer()
+    procedures, _ = _generate_procedures(nodelayout, True, "downtime", 2, [timer])
+    body = json.dumps(procedures.encode_json()).encode("utf-8") + encode_binary(procedures)
+    # Compress regardless of the size so that the codecs are loaded.
+    compress_body(body, "gzip", 0, MigrationConfigReader().compression_config["level"])
+    logger.debug(f"phase timings :{timer.encode_json()}")
+    logger.info("Warm-up completed")
+
+
 def main():
     """entry point"""
+    cli_parser = argparse.ArgumentParser(description="serve the migration procedure generator over HTTP")
+    add_config_arguments(cli_parser)
+    apply_config_arguments(cli_parser.parse_args())
     try:
         server_config = MigrationConfigReader().migration_procedures_config
-        uvicorn.run(app, **server_config)
+        # Worker processes import the application by themselves, so uvicorn needs an import string for them.
+        target = APP_IMPORT_STRING if server_config.get("workers", 1) > 1 else app
+        uvicorn.run(target, **server_config)
     except CustomBaseException as err:
         err.output_stderr()
     except KeyboardInterrupt:
@@ -13,6 +13,10 @@
 #  under the License.
 """Common module"""
 
+import argparse
+import itertools
+import json
+import logging
 import os
 
 from jsonschema import validate
@@ -27,19 +31,33 @@ from migration_procedure_generator.schema import config_schema, log_config_schem
 from migration_procedure_generator.common.logger import Logger
 
 
+# Environment variables holding the paths of external configuration files that replace the packaged ones
+CONFIG_PATH_ENV = "MIGRATION_PROCEDURES_CONFIG"
+LOG_CONFIG_PATH_ENV = "MIGRATION_PROCEDURES_LOG_CONFIG"
+
+
 class MigrationLogConfigReader(BaseConfig):
     """A class to read logging configuration files"""
     def __init__(self):
         """constructor"""
         try:
-            super().__init__("migration_procedure_generator.config", "migrationprocedures_log_config.yaml")
-            validate(self._config, log_config_schema)
-            filename = self._config.get("handlers", {}).get("file", {}).get("filename")
-            log_dir = os.path.dirname(filename)
-            self._check_directory_exists(log_dir)
+            super().__init__(
+                "migration_procedure_generator.config", "migrationprocedures_log_config.yaml", LOG_CONFIG_PATH_ENV
+            )
         except Exception as error:
             raise LogSettingFileValidationError(error.args) from error
 
+    def _validate(self, config) -> None:
+        """Validate the logging configuration and check that the directory of the log file exists
+
+        Args:
+            config (Any): read config data
+        """
+        validate(config, log_config_schema)
+        filename = config.get("handlers", {}).get("file", {}).get("filename")
+        log_dir = os.path.dirname(filename)
+        self._check_directory_exists(log_dir)
+
     def _check_directory_exists(self, path: str) -> None:
         """Checking if a directory exists
 
@@ -68,12 +86,18 @@ class MigrationConfigReader(BaseConfig):
     def __init__(self) -> None:
         """constructor"""
         try:
-            super().__init__("migration_procedure_generator.config", "migrationprocedures_config.yaml")
-            validate(self._config, config_schema)
-
+            super().__init__("migration_procedure_generator.config", "migrationprocedures_config.yaml", CONFIG_PATH_ENV)
         except Exception as error:
             raise SettingFileValidationError(error.args) from error
 
+    def _validate(self, config) -> None:
+        """Validate the configuration
+
+        Args:
+            config (Any): read config data
+        """
+        validate(config, config_schema)
+
     @property
     def migration_procedures_config(self) -> dict:
         """Reading server settings from a migration procedure configuration file
@@ -83,6 +107,113 @@ class MigrationConfigReader(BaseConfig):
         """
         return self._config.get("migration_procedures")
 
+    @property
+    def profiling_config(self) -> dict:
+        """Reading sampling profiler settings from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("profiling", {"interval": 0, "directory": ""})
+
+    @property
+    def compression_config(self) -> dict:
+        """Reading response compression settings from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("compression", {"minimum_size": 1024, "level": 6})
+
+    @property
+    def hotplug_config(self) -> dict:
+        """Reading the hot-pluggable device types from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("hotplug", {"device_types": []})
+
+    @property
+    def scheduling_config(self) -> dict:
+        """Reading the concurrency caps of the scheduler from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("scheduling", {})
+
+    @property
+    def jobs_config(self) -> dict:
+        """Reading background job settings from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return {"max_queued": 100, **self._config.get("jobs", {"workers": 2, "ttl": 600})}
+
+    @property
+    def layout_apply_config(self) -> dict:
+        """Reading the layout apply service settings from a migration procedure configuration file
+
+        Returns:
+            dict: read config date. The URL is empty when no service is configured.
+        """
+        return {"url": "", "timeout": 60, "retries": 0, **self._config.get("layout_apply", {})}
+
+    @property
+    def durations_config(self) -> dict:
+        """Reading the estimated operation durations from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("durations", {})
+
+    @property
+    def request_log_config(self) -> dict:
+        """Reading request logging settings from a migration procedure configuration file
+
+        Returns:
+            dict: read config date
+        """
+        return self._config.get("request_log", {"sample_interval": 0})
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options giving the paths of external configuration files
+
+    Args:
+        parser (argparse.ArgumentParser): command line parser
+    """
+    parser.add_argument(
+        "--config",
+        action="store",
+        type=str,
+        help=f"Path of the configuration file. Defaults to ${CONFIG_PATH_ENV} or the packaged file",
+        metavar="CONFIG_FILE",
+    )
+    parser.add_argument(
+        "--log-config",
+        action="store",
+        type=str,
+        help=f"Path of the logging configuration file. Defaults to ${LOG_CONFIG_PATH_ENV} or the packaged file",
+        metavar="LOG_CONFIG_FILE",
+    )
+
+
+def apply_config_arguments(args: argparse.Namespace) -> None:
+    """Use the configuration files given on the command line. They are passed through the environment variables,
+    so that they are also used by the worker processes of the server.
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments
+    """
+    if args.config:
+        os.environ[CONFIG_PATH_ENV] = os.path.abspath(args.config)
+    if args.log_config:
+        os.environ[LOG_CONFIG_PATH_ENV] = os.path.abspath(args.log_config)
+
 
 def initialize_log() -> Logger:
     """Logger Object return
@@ -97,3 +228,21 @@ def initialize_log() -> Logger:
     except Exception as err:
         raise LogInitializationError() from err
     return logger
+
+
+_request_counter = itertools.count(1)
+
+
+def log_request(logger: Logger, digest: dict, payload) -> None:
+    """Log the digest of a request at INFO level. The whole request is logged at DEBUG level,
+    and also at INFO level for every Nth request as set in the configuration file.
+
+    Args:
+        logger (Logger): Logger Object
+        digest (dict): counts and hash of the request
+        payload (Callable[[], str]): function formatting the whole request, called only when it is logged
+    """
+    logger.info(lambda: f"request digest :{json.dumps(digest, separators=(',', ':'))}")
+    interval = MigrationConfigReader().request_log_config["sample_interval"]
+    sampled = interval > 0 and next(_request_counter) % interval == 0
+    logger.log(logging.INFO if sampled else logging.DEBUG, payload)
@@ -0,0 +1,386 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Simulated execution of migration procedures against a stand-in of the operation service"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import requests
+
+from migration_procedure_generator.common.api import BaseApiClient
+from migration_procedure_generator.downtime import DEFAULT_DURATIONS
+
+OPERATIONS_PATH = "/operations"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class OperationFailedError(Exception):
+    """Raised when the operation service fails to execute an operation"""
+
+
+class OperationService:
+    """Mock of the service that executes the operations of migration procedures.
+    Each operation takes the latency of its kind and fails when it is injected with a failure.
+    """
+
+    def __init__(
+        self,
+        latencies: dict = None,
+        time_scale: float = 1.0,
+        jitter: float = 0.0,
+        failure_rates: dict = None,
+        failing_op_ids=(),
+        seed: int | None = None,
+    ) -> None:
+        """constructor
+
+        Args:
+            latencies (dict, optional): operation and its latency in seconds. Defaults to DEFAULT_DURATIONS.
+            time_scale (float, optional): factor applied to the latencies, to simulate long operations quickly.
+                Defaults to 1.0.
+            jitter (float, optional): maximum relative deviation of each latency, drawn uniformly. Defaults to 0.0.
+            failure_rates (dict, optional): operation and the probability that it fails. Defaults to None.
+            failing_op_ids (Iterable[int], optional): operation IDs that always fail. Defaults to ().
+            seed (int | None, optional): seed of the jitter and of the failures. Defaults to None.
+        """
+        self.latencies = {**DEFAULT_DURATIONS, **(latencies or {})}
+        self.time_scale = time_scale
+        self.jitter = jitter
+        self.failure_rates = failure_rates or {}
+        self.failing_op_ids = frozenset(failing_op_ids)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, task) -> None:
+        """Execute an operation of the migration procedures
+
+        Args:
+            task (Task): operation
+        """
+        self.perform(task.encode_json())
+
+    def perform(self, operation: dict) -> None:
+        """Execute an operation received in JSON format
+
+        Args:
+            operation (dict): operation in the format of the migration procedures
+
+        Raises:
+            OperationFailedError: the operation has been injected with a failure
+        """
+        with self._lock:
+            deviation = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            failure_rate = self.failure_rates.get(operation["operation"], 0.0)
+            failed = operation["operationID"] in self.failing_op_ids or self._random.random() < failure_rate
+            self.executed += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latencies[operation["operation"]] * self.time_scale * (1 + deviation))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if failed:
+            raise OperationFailedError(f"{operation['operation']} {operation['operationID']} failed")
+
+
+class _OperationRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of the operation service stand-in"""
+
+    protocol_version = "HTTP/1.1"
+    # The headers and the body of a response are written separately. Without TCP_NODELAY, the body waits for the
+    # delayed acknowledgement of the headers on a kept-alive connection.
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:  # pylint:disable=C0103
+        """Execute the posted operation. 200 when it has succeeded and 500 when it has failed."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != OPERATIONS_PATH:
+            self._respond(HTTPStatus.NOT_FOUND, {"message": f"Not found: {self.path}"})
+            return
+        try:
+            self.server.service.perform(json.loads(body))
+        except OperationFailedError as err:
+            self._respond(HTTPStatus.INTERNAL_SERVER_ERROR, {"message": str(err)})
+            return
+        self._respond(HTTPStatus.OK, {"status": SUCCEEDED})
+
+    def _respond(self, status: HTTPStatus, content: dict) -> None:
+        """Send a JSON response
+
+        Args:
+            status (HTTPStatus): status code
+            content (dict): response body
+        """
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status.value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # pylint:disable=W0622
+        """Do not log the requests, which would slow down the simulation"""
+
+
+class OperationServiceStandIn:
+    """Local HTTP server that executes the operations posted to OPERATIONS_PATH with an OperationService.
+    The connections are kept alive and every connection is served by its own thread.
+    """
+
+    def __init__(self, service: OperationService, host: str = "127.0.0.1", port: int = 0) -> None:
+        """constructor
+
+        Args:
+            service (OperationService): service executing the operations
+            host (str, optional): host to bind. Defaults to "127.0.0.1".
+            port (int, optional): port to bind. Defaults to 0, which binds a free port.
+        """
+        self._server = ThreadingHTTPServer((host, port), _OperationRequestHandler)
+        self._server.daemon_threads = True
+        self._server.service = service
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        """URL to which the operations are posted"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{OPERATIONS_PATH}"
+
+    def close(self) -> None:
+        """Stop the server"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class OperationClient(BaseApiClient):
+    """Client executing operations by posting them to an operation service"""
+
+    def __init__(self, url: str, connections: int = 10, timeout: float = 60) -> None:
+        """constructor
+
+        Args:
+            url (str): URL to which the operations are posted
+            connections (int, optional): connections kept alive, at least the number of concurrent operations.
+                Defaults to 10.
+            timeout (float, optional): seconds to wait for an operation to complete. Defaults to 60.
+        """
+        super().__init__(pool_connections=1, pool_maxsize=connections)
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, task) -> None:
+        """Execute an operation of the migration procedures
+
+        Args:
+            task (Task): operation
+
+        Raises:
+            OperationFailedError: the service could not be reached or has failed to execute the operation
+        """
+        try:
+            response = self._post(self.url, data=task.encode_json(), timeout_sec=self.timeout)
+        except requests.RequestException as err:
+            raise OperationFailedError(str(err)) from err
+        if not response.ok:
+            raise OperationFailedError(f"status {response.status_code} {response.text[:200]}")
+
+
+def critical_path_time(plan, durations: dict) -> float:
+    """Length of the longest chain of dependent operations
+
+    Args:
+        plan (Plan): migration procedures. Dependencies have lower operation IDs than the tasks depending on them.
+        durations (dict): operation ID and its duration. Operations that are not included take no time.
+
+    Returns:
+        float: sum of the durations along the longest chain
+    """
+    finishes = {}
+    for task in plan.tasks:
+        start = max((finishes[depending.op_id] for depending in task.dependencies), default=0)
+        finishes[task.op_id] = start + durations.get(task.op_id, 0)
+    return max(finishes.values(), default=0.0)
+
+
+class ExecutionReport:
+    """Result of the simulated execution of migration procedures"""
+
+    def __init__(self, workers: int, wall_time: float, records: dict, plan) -> None:
+        """constructor
+
+        Args:
+            workers (int): maximum number of operations executed at the same time
+            wall_time (float): seconds from the start of the execution to the end of the last operation
+            records (dict): operation ID, and its start and end times in seconds from the start of the execution
+                and its status. The times of skipped operations are None.
+            plan (Plan): executed migration procedures
+        """
+        self.workers = workers
+        self.wall_time = wall_time
+        self.records = records
+        durations = {op_id: end - start for op_id, (start, end, _) in records.items() if end is not None}
+        self.busy_time = sum(durations.values())
+        self.critical_path = critical_path_time(plan, durations)
+
+    def timeline(self) -> list:
+        """Number of operations running over time
+
+        Returns:
+            list[tuple[float, int]]: time and the number of operations running from that time
+        """
+        events = []
+        for start, end, _ in self.records.values():
+            if end is not None:
+                events.extend([(start, 1), (end, -1)])
+        timeline = []
+        running = 0
+        # Ends sort before starts at the same time, so back-to-back operations are not counted as concurrent.
+        for time_point, change in sorted(events):
+            running += change
+            if timeline and timeline[-1][0] == time_point:
+                timeline[-1] = (time_point, running)
+            else:
+                timeline.append((time_point, running))
+        return timeline
+
+    def op_ids(self, status: str) -> list:
+        """Operation IDs with a status
+
+        Args:
+            status (str): SUCCEEDED, FAILED or SKIPPED
+
+        Returns:
+            list[int]: operation IDs in ascending order
+        """
+        return sorted(op_id for op_id, (_, _, task_status) in self.records.items() if task_status == status)
+
+    def encode_json(self, timeline: bool = True) -> dict:
+        """Encode the report in JSON format
+
+        Args:
+            timeline (bool, optional): include the number of running operations over time. Defaults to True.
+
+        Returns:
+            dict: wall time, critical path and its utilization, concurrency, and the operations by status
+        """
+        concurrency = {
+            "max": max((running for _, running in self.timeline()), default=0),
+            "mean": self.busy_time / self.wall_time if self.wall_time else 0.0,
+        }
+        if timeline:
+            concurrency["timeline"] = [
+                {"time": time_point, "running": running} for time_point, running in self.timeline()
+            ]
+        return {
+            "workers": self.workers,
+            "wallTime": self.wall_time,
+            "criticalPath": self.critical_path,
+            "criticalPathUtilization": self.critical_path / self.wall_time if self.wall_time else 1.0,
+            "concurrency": concurrency,
+            "operations": {
+                "succeeded": len(self.op_ids(SUCCEEDED)),
+                "failed": self.op_ids(FAILED),
+                "skipped": self.op_ids(SKIPPED),
+            },
+        }
+
+
+class PlanExecutor:
+    """Executes migration procedures on a thread pool.
+    Each operation is dispatched as soon as all of its dependencies have succeeded. The operations depending on
+    a failed operation, directly or indirectly, are skipped, and the other operations are still executed.
+    """
+
+    def __init__(self, execute: Callable, workers: int = 8) -> None:
+        """constructor
+
+        Args:
+            execute (Callable[[Task], None]): executes an operation, raising OperationFailedError if it fails,
+                such as an OperationService or an OperationClient
+            workers (int, optional): maximum number of operations executed at the same time. Defaults to 8.
+        """
+        self.execute = execute
+        self.workers = workers
+
+    def run(self, plan) -> ExecutionReport:
+        """Execute migration procedures
+
+        Args:
+            plan (Plan): migration procedures
+
+        Returns:
+            ExecutionReport: times and statuses of the operations
+        """
+        dependents = {task.op_id: [] for task in plan.tasks}
+        remaining = {}
+        for task in plan.tasks:
+            remaining[task.op_id] = len(task.dependencies)
+            for depending in task.dependencies:
+                dependents[depending.op_id].append(task)
+        records = {}
+        origin = time.perf_counter()
+
+        def run_task(task) -> tuple:
+            start = time.perf_counter() - origin
+            status = SUCCEEDED
+            try:
+                self.execute(task)
+            except OperationFailedError:
+                status = FAILED
+            return start, time.perf_counter() - origin, status
+
+        def skip_dependents(task) -> None:
+            pending = list(dependents[task.op_id])
+            while pending:
+                dependent = pending.pop()
+                if dependent.op_id not in records:
+                    records[dependent.op_id] = (None, None, SKIPPED)
+                    pending.extend(dependents[dependent.op_id])
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="plan-executor") as pool:
+            running = {pool.submit(run_task, task): task for task in plan.tasks if not task.dependencies}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    records[task.op_id] = future.result()
+                    if records[task.op_id][2] == FAILED:
+                        skip_dependents(task)
+                        continue
+                    for dependent in dependents[task.op_id]:
+                        remaining[dependent.op_id] -= 1
+                        if remaining[dependent.op_id] == 0 and dependent.op_id not in records:
+                            running[pool.submit(run_task, dependent)] = dependent
+        wall_time = max((end for _, end, _ in records.values() if end is not None), default=0.0)
+        return ExecutionReport(self.workers, wall_time, records, plan)
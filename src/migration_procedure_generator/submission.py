@@ -0,0 +1,135 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Submission of the migration procedures to the layout apply service"""
+
+import threading
+
+import requests
+
+from migration_procedure_generator.common.api import BaseApiClient, json_chunks
+from migration_procedure_generator.custom_exception import LayoutApplyError, SettingFileValidationError
+from migration_procedure_generator.plan import Plan
+from migration_procedure_generator.setting import MigrationConfigReader
+
+
+class LayoutApplyClient(BaseApiClient):
+    """Client posting migration procedures to the layout apply service.
+    The procedures are sent in chunks of JSON text as they are encoded, with chunked transfer encoding, over
+    connections that are kept alive for the following submissions.
+    """
+
+    def __init__(self, url: str, timeout: float = 60, retries: int = 0) -> None:
+        """constructor
+
+        Args:
+            url (str): URL to which the migration procedures are posted
+            timeout (float, optional): seconds to wait for the connection and for the response. Defaults to 60.
+            retries (int, optional): retries of a submission that fails to connect. Defaults to 0.
+        """
+        super().__init__(pool_connections=1, retries=retries)
+        self.url = url
+        self.timeout = timeout
+
+    def submit(self, plan: Plan) -> dict:
+        """Post migration procedures
+
+        Args:
+            plan (Plan): migration procedures
+
+        Raises:
+            LayoutApplyError: the service could not be reached or did not accept the procedures
+
+        Returns:
+            dict: status code and JSON body of the response. The body is None if it is not JSON.
+        """
+        body = json_chunks({"procedures": plan.encode_json()})
+        try:
+            response = self._post(self.url, data=body, timeout_sec=self.timeout, content_type="application/json")
+        except requests.RequestException as err:
+            raise LayoutApplyError(self.url, str(err)) from err
+        if not response.ok:
+            raise LayoutApplyError(self.url, f"status {response.status_code} {response.text[:200]}")
+        try:
+            content = response.json()
+        except requests.JSONDecodeError:
+            content = None
+        return {"status": response.status_code, "response": content}
+
+
+class LayoutApplySubmitter:
+    """Submits migration procedures with the layout apply settings of the configuration file.
+    The client is kept while the settings are unchanged, so that the connections are reused across submissions.
+    """
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._lock = threading.Lock()
+        self._client = None
+        self._config = None
+
+    def submit(self, plan: Plan) -> dict:
+        """Post migration procedures to the configured layout apply service
+
+        Args:
+            plan (Plan): migration procedures
+
+        Raises:
+            SettingFileValidationError: no layout apply service is configured
+            LayoutApplyError: the service could not be reached or did not accept the procedures
+
+        Returns:
+            dict: URL of the service, and status code and JSON body of the response
+        """
+        client = self._get_client()
+        return {"url": client.url, **client.submit(plan)}
+
+    def check_config(self) -> dict:
+        """Check that a layout apply service is configured, before the migration procedures are generated
+
+        Raises:
+            SettingFileValidationError: no layout apply service is configured
+
+        Returns:
+            dict: layout apply settings
+        """
+        config = MigrationConfigReader().layout_apply_config
+        if not config["url"]:
+            raise SettingFileValidationError("layout_apply.url is not set in the configuration file")
+        return config
+
+    def close(self) -> None:
+        """Close the connections of the client"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._config = None
+
+    def _get_client(self) -> LayoutApplyClient:
+        """Return the client for the current settings, creating it if the settings have changed
+
+        Raises:
+            SettingFileValidationError: no layout apply service is configured
+
+        Returns:
+            LayoutApplyClient: client
+        """
+        config = self.check_config()
+        with self._lock:
+            if config != self._config:
+                if self._client is not None:
+                    self._client.close()
+                self._client = LayoutApplyClient(config["url"], config["timeout"], config["retries"])
+                self._config = config
+            return self._client
@@ -107,3 +107,22 @@ class System:
         """
         nodes = [Node.decode_json(node, bound_devices_map) for node in json_data["nodes"]]
         return System(nodes)
+
+
+def device_types(*systems) -> dict:
+    """Index the device types of the devices in the layouts
+
+    Args:
+        *systems (System): layouts
+
+    Returns:
+        dict: device ID and device type
+    """
+    return {
+        device_id: device_type
+        for system in systems
+        for node in system.nodes
+        for device_type, device_def in node.devices.items()
+        if device_type != "cpu"
+        for device_id in device_def["deviceIDs"]
+    }
@@ -0,0 +1,182 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Instrumentation hooks for the migration procedure planner"""
+
+import cProfile
+import itertools
+import os
+import threading
+import time
+
+
+class PlanHook:
+    """Base class of the hooks called around each planner phase.
+    Subclasses override only the callbacks they need.
+    """
+
+    def phase_start(self, phase: str) -> None:
+        """Called before a planner phase runs
+
+        Args:
+            phase (str): phase name
+        """
+
+    def phase_end(self, phase: str, plan) -> None:
+        """Called after a planner phase has run
+
+        Args:
+            phase (str): phase name
+            plan (Plan): migration procedures produced or updated by the phase
+        """
+
+
+class PhaseRecord:
+    """Timing of one planner phase"""
+
+    def __init__(self, phase: str, elapsed: float, tasks: int) -> None:
+        """constructor
+
+        Args:
+            phase (str): phase name
+            elapsed (float): wall time of the phase in seconds
+            tasks (int): number of tasks after the phase
+        """
+        self.phase = phase
+        self.elapsed = elapsed
+        self.tasks = tasks
+
+    def encode_json(self) -> dict:
+        """Encode the phase record in JSON format
+
+        Returns:
+            dict: phase record
+        """
+        return {"phase": self.phase, "elapsed": self.elapsed, "tasks": self.tasks}
+
+
+class PhaseTimer(PlanHook):
+    """Hook that records the wall time and the task count of each planner phase"""
+
+    def __init__(self) -> None:
+        """constructor"""
+        self.records = []
+        self._started = {}
+
+    def phase_start(self, phase: str) -> None:
+        """Remember when the phase started
+
+        Args:
+            phase (str): phase name
+        """
+        self._started[phase] = time.perf_counter()
+
+    def phase_end(self, phase: str, plan) -> None:
+        """Record the elapsed time and the number of tasks of the phase
+
+        Args:
+            phase (str): phase name
+            plan (Plan): migration procedures produced or updated by the phase
+        """
+        elapsed = time.perf_counter() - self._started.pop(phase)
+        self.records.append(PhaseRecord(phase, elapsed, len(plan.tasks)))
+
+    def encode_json(self) -> list:
+        """Encode the recorded phases in JSON format
+
+        Returns:
+            list: phase records
+        """
+        return [record.encode_json() for record in self.records]
+
+
+class PlanTracer:
+    """Run planner phases and notify the registered hooks"""
+
+    def __init__(self, hooks=None) -> None:
+        """constructor
+
+        Args:
+            hooks (list[PlanHook], optional): hooks to notify. Defaults to None.
+        """
+        self.hooks = list(hooks) if hooks else []
+
+    def run(self, phase: str, func, *args, plan=None):
+        """Run a planner phase
+
+        Args:
+            phase (str): phase name
+            func (Callable): phase body
+            *args: arguments of the phase body
+            plan (Plan, optional): plan updated in place by the phase.
+                Defaults to None, in which case the return value of the phase body is reported.
+
+        Returns:
+            Any: return value of the phase body
+        """
+        for hook in self.hooks:
+            hook.phase_start(phase)
+        result = func(*args)
+        for hook in self.hooks:
+            hook.phase_end(phase, plan if plan is not None else result)
+        return result
+
+
+class SamplingProfiler:
+    """Profile every Nth call with cProfile and dump the statistics into a directory.
+    Only one call is profiled at a time in the process. From Python 3.12, cProfile can only be enabled once per
+    process and also records the calls of the other threads, so a sampled call that overlaps a profiled one is run
+    without profiling.
+    """
+
+    # Held while a call is profiled, by all the instances
+    _profiling = threading.Lock()
+
+    def __init__(self) -> None:
+        """constructor"""
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def run(self, interval: int, directory: str, func, *args, **kwargs):
+        """Call the function, profiling it when the call number is a multiple of the interval
+        and no other call is being profiled
+
+        Args:
+            interval (int): profile every Nth call. 0 disables profiling.
+            directory (str): directory where the profile statistics are written
+            func (Callable): function to call
+            *args: positional arguments of the function
+            **kwargs: keyword arguments of the function
+
+        Returns:
+            Any: return value of the function
+        """
+        with self._lock:
+            count = next(self._counter)
+        if interval <= 0 or count % interval or not SamplingProfiler._profiling.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool, such as a debugger or a coverage tool, is active.
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                os.makedirs(directory, exist_ok=True)
+                profiler.dump_stats(os.path.join(directory, f"migration-procedures-{os.getpid()}-{count}.prof"))
+        finally:
+            SamplingProfiler._profiling.release()
@@ -0,0 +1,217 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+"""Verification of migration procedures by replaying them against the current layout"""
+
+from collections import deque
+
+from migration_procedure_generator.operation import Operation
+from migration_procedure_generator.system import device_types
+
+
+def _ownership(system) -> dict:
+    """Index the devices of a system by the CPU they are attached to
+
+    Args:
+        system (System): layout
+
+    Returns:
+        dict: device ID and CPU device ID
+    """
+    return {device_id: node.cpu for node in system.nodes for device_id in node.other_devices}
+
+
+def verify_plan(plan, prev, new, hotplug_types=None) -> list:
+    """Replay the migration procedure in topological order and check that
+    - the dependencies form a DAG of known operations,
+    - shutdown and boot are applied to a running and a stopped CPU respectively,
+    - connect and disconnect are applied to a stopped CPU, unless the device type is hot-pluggable,
+    - no device is attached twice and only attached devices are disconnected,
+    - the final state equals the desired layout.
+    Ties between ready operations are broken by their order in the plan, so the replay alone covers only one of the
+    orders in which the operations can be executed. The dependencies are therefore also checked to enforce, in every
+    order, that
+    - the operations on a device are executed one after another,
+    - connect and disconnect of a device that is not hot-pluggable are executed after the shutdown of their CPU
+      and before its boot,
+    - the shutdown of a CPU is executed before its boot.
+
+    Args:
+        plan (Plan): migration procedures
+        prev (System): current layout
+        new (System): desired layout
+        hotplug_types (list[str], optional): device types that can be connected and disconnected
+            while the CPU is running. Defaults to None.
+
+    Returns:
+        list: violations. Empty when the migration procedure is valid.
+    """
+    violations = []
+    tasks = {}
+    for task in plan.tasks:
+        if task.op_id in tasks:
+            violations.append(f"operation {task.op_id}: duplicate operation ID")
+        tasks[task.op_id] = task
+
+    pending = {}
+    dependents = {op_id: [] for op_id in tasks}
+    for op_id, task in tasks.items():
+        pending[op_id] = 0
+        for depending in task.dependencies:
+            if depending.op_id not in tasks:
+                violations.append(f"operation {op_id}: depends on unknown operation {depending.op_id}")
+                continue
+            pending[op_id] += 1
+            dependents[depending.op_id].append(op_id)
+
+    owners = _ownership(prev)
+    running = {node.cpu for node in prev.nodes}
+    hotplug_types = {device_type.lower() for device_type in hotplug_types or []}
+    hotplug_devices = {
+        device_id for device_id, device_type in device_types(prev, new).items() if device_type in hotplug_types
+    }
+    ready = deque(op_id for op_id, count in pending.items() if count == 0)
+    position = {}
+    while ready:
+        task = tasks[ready.popleft()]
+        position[task.op_id] = len(position)
+        violations.extend(_apply(task, owners, running, hotplug_devices))
+        for op_id in dependents[task.op_id]:
+            pending[op_id] -= 1
+            if pending[op_id] == 0:
+                ready.append(op_id)
+
+    if len(position) < len(tasks):
+        cycle = sorted(op_id for op_id, count in pending.items() if count > 0)
+        violations.append(f"dependency cycle among operations {cycle}")
+        return violations
+    violations.extend(_check_ordering(tasks, position, hotplug_devices))
+
+    desired_owners = _ownership(new)
+    for device_id in sorted(owners.keys() | desired_owners.keys()):
+        if owners.get(device_id) != desired_owners.get(device_id):
+            violations.append(
+                f"device {device_id}: attached to {owners.get(device_id)}, desired {desired_owners.get(device_id)}"
+            )
+    desired_running = {node.cpu for node in new.nodes}
+    for cpu_id in sorted(running ^ desired_running):
+        state = "running" if cpu_id in running else "stopped"
+        violations.append(f"CPU {cpu_id}: {state} at the end of the migration procedure")
+    return violations
+
+
+def _check_ordering(tasks: dict, position: dict, hotplug_devices: set) -> list:
+    """Check that the dependencies order the operations that must not run concurrently or in another order
+
+    Args:
+        tasks (dict): operation ID and operation
+        position (dict): operation ID and its position in the replay order
+        hotplug_devices (set): device IDs that can be connected and disconnected while the CPU is running
+
+    Returns:
+        list: violations
+    """
+    violations = []
+    shutdowns, boots, device_operations = {}, {}, {}
+    for task in sorted(tasks.values(), key=lambda task: position[task.op_id]):
+        if task.operation == Operation.POWEROFF:
+            shutdowns[task.cpu_id] = task
+        elif task.operation == Operation.POWERON:
+            boots[task.cpu_id] = task
+        else:
+            device_operations.setdefault(task.device_id, []).append(task)
+
+    for device_id, operations in device_operations.items():
+        for previous, task in zip(operations, operations[1:]):
+            if not _reaches(previous, task, tasks, position):
+                violations.append(
+                    f"operation {task.op_id}: {task.operation} of device {device_id} does not depend on "
+                    f"operation {previous.op_id}: {previous.operation} of the same device"
+                )
+        if device_id in hotplug_devices:
+            continue
+        for task in operations:
+            prefix = f"operation {task.op_id}: {task.operation} of device {device_id}"
+            shutdown, boot = shutdowns.get(task.cpu_id), boots.get(task.cpu_id)
+            if shutdown is not None and not _reaches(shutdown, task, tasks, position):
+                violations.append(f"{prefix} does not depend on the shutdown of CPU {task.cpu_id}")
+            if boot is not None and not _reaches(task, boot, tasks, position):
+                violations.append(f"{prefix} is not a dependency of the boot of CPU {task.cpu_id}")
+    for cpu_id, boot in boots.items():
+        if cpu_id in shutdowns and not _reaches(shutdowns[cpu_id], boot, tasks, position):
+            violations.append(f"operation {boot.op_id}: boot of CPU {cpu_id} does not depend on its shutdown")
+    return violations
+
+
+def _reaches(source, target, tasks: dict, position: dict) -> bool:
+    """Whether an operation depends on another one, directly or indirectly.
+    The dependencies of the target are searched backwards, skipping the operations replayed before the source,
+    which cannot depend on it, so only the operations replayed between the two are visited.
+
+    Args:
+        source (Task): operation that must be executed first
+        target (Task): operation that must be executed after it
+        tasks (dict): operation ID and operation
+        position (dict): operation ID and its position in the replay order
+
+    Returns:
+        bool: True if the target depends on the source
+    """
+    start = position[source.op_id]
+    pending = [target.op_id]
+    visited = {target.op_id}
+    while pending:
+        for depending in tasks[pending.pop()].dependencies:
+            if depending.op_id == source.op_id:
+                return True
+            if depending.op_id not in visited and position.get(depending.op_id, -1) > start:
+                visited.add(depending.op_id)
+                pending.append(depending.op_id)
+    return False
+
+
+def _apply(task, owners: dict, running: set, hotplug_devices: set) -> list:
+    """Apply one operation to the device ownership and power state
+
+    Args:
+        task (Task): operation
+        owners (dict): device ID and CPU device ID it is attached to
+        running (set): CPU device IDs that are powered on
+        hotplug_devices (set): device IDs that can be connected and disconnected while the CPU is running
+
+    Returns:
+        list: violations
+    """
+    violations = []
+    prefix = f"operation {task.op_id}: {task.operation}"
+    if task.operation == Operation.POWEROFF:
+        if task.cpu_id not in running:
+            violations.append(f"{prefix} of CPU {task.cpu_id} that is not running")
+        running.discard(task.cpu_id)
+    elif task.operation == Operation.POWERON:
+        if task.cpu_id in running:
+            violations.append(f"{prefix} of CPU {task.cpu_id} that is already running")
+        running.add(task.cpu_id)
+    else:
+        if task.cpu_id in running and task.device_id not in hotplug_devices:
+            violations.append(f"{prefix} of device {task.device_id} on CPU {task.cpu_id} that is running")
+        owner = owners.get(task.device_id)
+        if task.operation == Operation.CONNECT:
+            if owner is not None:
+                violations.append(f"{prefix} of device {task.device_id} that is already attached to {owner}")
+            owners[task.device_id] = task.cpu_id
+        else:
+            if owner != task.cpu_id:
+                violations.append(f"{prefix} of device {task.device_id} that is not attached to {task.cpu_id}")
+            owners.pop(task.device_id, None)
+    return violations
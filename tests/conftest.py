@@ -0,0 +1,25 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import pytest
+
+from migration_procedure_generator.common.config import BaseConfig
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """Read the configuration files again in each test, which may patch yaml.safe_load or the files."""
+    BaseConfig.clear_cache()
+    yield
+    BaseConfig.clear_cache()
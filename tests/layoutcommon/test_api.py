@@ -13,16 +13,26 @@
 #  under the License.
 """API Related Packages"""
 
+import asyncio
 import json
 import os
+import socket
 import time
 
+import httpx
 import pytest
 import requests
 from pytest_httpserver import HeaderValueMatcher, HTTPServer
 from werkzeug import Request, Response
 
-from src.migration_procedure_generator.common.api import BaseApiClient
+from src.migration_procedure_generator.common.api import (
+    BACKOFF_MAX,
+    AsyncBaseApiClient,
+    BaseApiClient,
+    backoff_time,
+    is_stream,
+    json_chunks,
+)
 
 # NOTICE: Add the dummy server's IP/HOST to the NO_PROXY environment variable.
 os.environ["NO_PROXY"] = "localhost"
@@ -431,3 +441,433 @@ class TestBaseApiClient:
         res_header, res_data = client._modify_data_and_header(headers=headers, data=data)
         assert res_header == headers
         assert res_data == data
+
+
+class TestPooledRetryingApiClient:
+    """Connection pool and retries of BaseApiClient"""
+
+    @pytest.mark.parametrize(
+        "kwargs,pool_maxsize,pool_block",
+        [
+            ({}, 10, False),
+            ({"pool_connections": 2, "pool_maxsize": 50}, 50, False),
+            ({"pool_maxsize": 50, "max_connections_per_host": 4}, 4, True),
+        ],
+    )
+    def test_pool_settings(self, kwargs, pool_maxsize, pool_block):
+        client = BaseApiClient(**kwargs)
+        adapter = client.session.get_adapter("http://localhost")
+        assert client.session.get_adapter("https://localhost") is adapter
+        assert adapter._pool_connections == kwargs.get("pool_connections", 10)
+        assert adapter._pool_maxsize == pool_maxsize
+        assert adapter._pool_block == pool_block
+        assert client.session.headers["Connection"] == "keep-alive"
+        client.close()
+
+    def test_streamed_body_shares_connection_pool(self, httpserver: HTTPServer):
+        httpserver.clear()
+        httpserver.expect_request("/test").respond_with_json({})
+        client = BaseApiClient(max_connections_per_host=1)
+        url = httpserver.url_for("/test")
+
+        assert client._get(url).status_code == 200
+        assert client._put(url, data=iter([b"{}"]), content_type="application/json").status_code == 200
+
+        poolmanager = client.session.get_adapter(url).poolmanager
+        assert client._stream_session.get_adapter(url).poolmanager is poolmanager
+        pools = [poolmanager.pools[key] for key in poolmanager.pools.keys()]
+        assert [(pool.num_requests, pool.num_connections) for pool in pools] == [(2, 1)]
+        client.close()
+
+    def test_keep_alive_disabled(self, httpserver: HTTPServer):
+        httpserver.expect_request("/test", method="GET", headers={"Connection": "close"}).respond_with_json({})
+        client = BaseApiClient(keep_alive=False)
+        assert client._get(httpserver.url_for("/test")).status_code == 200
+
+    @pytest.mark.parametrize(
+        "method,retries,statuses,expected_status,expected_requests",
+        [
+            ("GET", 2, [503, 503, 200], 200, 3),
+            ("PUT", 2, [502, 504, 204], 204, 3),
+            ("DELETE", 1, [503, 503, 204], 503, 2),
+            ("GET", 0, [503, 200], 503, 1),
+            ("GET", 2, [500, 200], 500, 1),
+            ("POST", 2, [503, 201], 503, 1),
+        ],
+    )
+    def test_retry_idempotent_methods(
+        self, httpserver: HTTPServer, method, retries, statuses, expected_status, expected_requests
+    ):
+        httpserver.clear()
+        for status in statuses:
+            httpserver.expect_ordered_request("/test", method=method).respond_with_response(Response("", status=status))
+        client = BaseApiClient(retries=retries, backoff_factor=0)
+        request = getattr(client, f"_{method.lower()}")
+
+        response = request(httpserver.url_for("/test"))
+
+        assert response.status_code == expected_status
+        assert len(httpserver.log) == expected_requests
+
+    def test_retry_connection_error_of_any_method(self, caplog):
+        client = BaseApiClient(retries=2, backoff_factor=0)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._post(f"http://localhost:{free_port()}/test", timeout_sec=1)
+        retried = [record for record in caplog.records if record.getMessage().startswith("Retrying")]
+        assert len(retried) == 2
+
+    @pytest.mark.parametrize(
+        "retry_number,expected",
+        [(0, 0.0), (1, 0.0), (2, 1.0), (3, 2.0), (4, 4.0), (20, BACKOFF_MAX)],
+    )
+    def test_backoff_time(self, retry_number, expected):
+        assert backoff_time(0.5, retry_number) == expected
+
+
+def free_port() -> int:
+    """Find a port no server listens on"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class DummyAsyncApiClient(AsyncBaseApiClient):
+    """Dummy Client for Testing AsyncBaseApiClient"""
+
+    def __init__(self, url, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.url = url
+
+    async def get(self, params=None, timeout_sec=5):
+        return await self._get(self.url, params, timeout_sec)
+
+    async def post(self, params=None, data=None, timeout_sec=5):
+        return await self._post(self.url, params=params, data=data, timeout_sec=timeout_sec)
+
+    async def put(self, params=None, data=None, timeout_sec=5):
+        return await self._put(self.url, params=params, data=data, timeout_sec=timeout_sec)
+
+    async def delete(self, params=None, data=None, timeout_sec=5):
+        return await self._delete(self.url, params=params, data=data, timeout_sec=timeout_sec)
+
+
+async def send(client, method, *args, **kwargs):
+    """Send one request and close the client"""
+    async with client:
+        return await getattr(client, method)(*args, **kwargs)
+
+
+class TestAsyncBaseApiClient:
+    """Asynchronous Client for Making API Requests"""
+
+    @pytest.mark.parametrize(
+        "method,status",
+        [("get", 200), ("post", 201), ("put", 200), ("delete", 202)],
+    )
+    @pytest.mark.parametrize(
+        "params,data",
+        [
+            ({"q_key": "q_val"}, {"body_key": "body_val"}),
+            (None, None),
+        ],
+    )
+    def test_can_request(self, httpserver: HTTPServer, method, status, params, data):
+        headers = {"Content-Type": "application/json"} if data and method != "get" else None
+        httpserver.expect_request(
+            "/test", method=method.upper(), query_string=params, headers=headers
+        ).respond_with_response(Response(json.dumps({"method": method}), status=status))
+        client = DummyAsyncApiClient(httpserver.url_for("/test"))
+        args = {"params": params} if method == "get" else {"params": params, "data": data}
+
+        response = asyncio.run(send(client, method, **args))
+
+        assert response.status_code == status
+        assert response.json() == {"method": method}
+        if data and method != "get":
+            assert json.loads(httpserver.log[0][0].get_data()) == data
+
+    def test_form_data_is_sent_as_form(self, httpserver: HTTPServer):
+        httpserver.expect_request("/test", method="POST", data="key=value").respond_with_json({})
+        client = DummyAsyncApiClient(httpserver.url_for("/test"))
+        # A dict that cannot be converted to JSON is form-encoded, as with BaseApiClient.
+        response = asyncio.run(send(client, "post", data={"key": "value", "unused": set()}))
+        assert response.status_code == 500
+        response = asyncio.run(send(DummyAsyncApiClient(httpserver.url_for("/test")), "post", data="key=value"))
+        assert response.status_code == 200
+
+    def test_timeout(self, httpserver: HTTPServer):
+        httpserver.expect_request("/test", method="GET").respond_with_handler(lambda request: time.sleep(1))
+        client = DummyAsyncApiClient(httpserver.url_for("/test"))
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(send(client, "get", timeout_sec=0.5))
+        # Let the server finish the request, so that it is not logged in the next test.
+        while not httpserver.log:
+            time.sleep(0.05)
+
+    @pytest.mark.parametrize(
+        "method,retries,statuses,expected_status,expected_requests",
+        [
+            ("GET", 2, [503, 503, 200], 200, 3),
+            ("PUT", 2, [502, 504, 204], 204, 3),
+            ("DELETE", 1, [503, 503, 204], 503, 2),
+            ("GET", 0, [503, 200], 503, 1),
+            ("GET", 2, [500, 200], 500, 1),
+            ("POST", 2, [503, 201], 503, 1),
+        ],
+    )
+    def test_retry_idempotent_methods(
+        self, httpserver: HTTPServer, method, retries, statuses, expected_status, expected_requests
+    ):
+        httpserver.clear()
+        for status in statuses:
+            httpserver.expect_ordered_request("/test", method=method).respond_with_response(Response("", status=status))
+        client = DummyAsyncApiClient(httpserver.url_for("/test"), retries=retries, backoff_factor=0)
+
+        response = asyncio.run(send(client, method.lower()))
+
+        assert response.status_code == expected_status
+        assert len(httpserver.log) == expected_requests
+
+    def test_retry_read_timeout_of_idempotent_methods_only(self, mocker):
+        client = DummyAsyncApiClient("http://localhost/test", retries=2, backoff_factor=0)
+        request = mocker.patch.object(client.client, "request", side_effect=httpx.ReadTimeout("timed out"))
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(send(client, "post"))
+        assert request.call_count == 1
+
+        client = DummyAsyncApiClient("http://localhost/test", retries=2, backoff_factor=0)
+        request = mocker.patch.object(client.client, "request", side_effect=httpx.ReadTimeout("timed out"))
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(send(client, "get"))
+        assert request.call_count == 3
+
+    def test_retry_connection_error_of_any_method(self, mocker):
+        sleep = mocker.patch("src.migration_procedure_generator.common.api.asyncio.sleep", mocker.AsyncMock())
+        client = DummyAsyncApiClient(f"http://localhost:{free_port()}/test", retries=3, backoff_factor=0.5)
+        request = mocker.spy(client.client, "request")
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(send(client, "post"))
+        assert request.call_count == 4
+        assert [call.args[0] for call in sleep.call_args_list] == [0.0, 1.0, 2.0]
+
+    @pytest.mark.parametrize("keep_alive,expected", [(True, 20), (False, 0)])
+    def test_keep_alive(self, keep_alive, expected):
+        client = AsyncBaseApiClient(keep_alive=keep_alive)
+        pool = client.client._transport._pool
+        assert pool._max_keepalive_connections == expected
+        assert pool._max_connections == 100
+        asyncio.run(client.aclose())
+
+    def test_max_connections_per_host(self, mocker):
+        client = AsyncBaseApiClient(max_connections_per_host=2)
+        in_flight = {}
+        peaks = {}
+
+        async def request(method, url, **kwargs):
+            host = url.split("/")[2]
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+            return httpx.Response(200)
+
+        mocker.patch.object(client.client, "request", side_effect=request)
+
+        async def run():
+            urls = [f"http://{host}/test" for host in ("a:80", "b:80") for _ in range(5)]
+            async with client:
+                return await asyncio.gather(*(client._get(url) for url in urls))
+
+        responses = asyncio.run(run())
+        assert [response.status_code for response in responses] == [200] * 10
+        assert peaks == {"a:80": 2, "b:80": 2}
+
+
+class TestRequestBody:
+    """Content type hints, pre-encoded and streamed bodies"""
+
+    @pytest.mark.parametrize(
+        "headers,data,content_type,expected_headers,expected_data",
+        [
+            # The hint replaces the header, whatever its case, and a dict is converted to JSON.
+            (
+                {"content-type": "text/plain", "x-api-key": "x"},
+                {"key": "val"},
+                "application/json",
+                {"x-api-key": "x", "Content-Type": "application/json"},
+                '{"key": "val"}',
+            ),
+            # A str or bytes body is not parsed.
+            (None, "not json", "application/json", {"Content-Type": "application/json"}, "not json"),
+            (None, b'{"key": 1}', "application/json", {"Content-Type": "application/json"}, b'{"key": 1}'),
+            (None, b"\x00\x01", "application/octet-stream", {"Content-Type": "application/octet-stream"}, b"\x00\x01"),
+            # The Content-Type header is the hint when none is given.
+            (
+                {"Content-Type": "application/merge-patch+json; charset=utf-8"},
+                {"key": "val"},
+                None,
+                {"Content-Type": "application/merge-patch+json; charset=utf-8"},
+                '{"key": "val"}',
+            ),
+            (
+                {"Content-Type": "application/x-www-form-urlencoded"},
+                {"key": "val"},
+                None,
+                {"Content-Type": "application/x-www-form-urlencoded"},
+                {"key": "val"},
+            ),
+            (
+                {"Content-Type": "application/json"},
+                '{"key": "val"}',
+                None,
+                {"Content-Type": "application/json"},
+                '{"key": "val"}',
+            ),
+            # bytes without a hint are sent as they are, without a content type.
+            (None, b'{"key": 1}', None, None, b'{"key": 1}'),
+        ],
+        ids=["hint-dict", "hint-str", "hint-bytes", "hint-binary", "header-json", "header-form", "header-str", "bytes"],
+    )
+    def test_modify_data_and_header_with_content_type(
+        self, mocker, headers, data, content_type, expected_headers, expected_data
+    ):
+        loads = mocker.spy(json, "loads")
+        res_headers, res_data = BaseApiClient()._modify_data_and_header(headers, data, content_type)
+        assert res_headers == expected_headers
+        assert res_data == expected_data
+        loads.assert_not_called()
+
+    def test_modify_data_and_header_passes_stream_through(self):
+        chunks = iter([b"[1,", b"2]"])
+        headers, data = BaseApiClient()._modify_data_and_header(None, chunks, "application/json")
+        assert headers == {"Content-Type": "application/json"}
+        assert data is chunks
+
+    @pytest.mark.parametrize(
+        "data,expected",
+        [
+            ((chunk for chunk in [b"a"]), True),
+            (iter([b"a"]), True),
+            (json_chunks([]), True),
+            (b"a", False),
+            (bytearray(b"a"), False),
+            ("a", False),
+            ({"a": 1}, False),
+            ([b"a"], False),
+            (None, False),
+        ],
+        ids=["generator", "iterator", "json_chunks", "bytes", "bytearray", "str", "dict", "list", "None"],
+    )
+    def test_is_stream(self, data, expected):
+        assert is_stream(data) == expected
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"procedures": [{"operationID": i, "dependencies": list(range(i)), "名前": "ü"} for i in range(50)]},
+            [[1, [2, [3, {"a": None}]]], {"b": [True, 1.5]}],
+            {"1": "a", 2: "b"},
+            {},
+            [],
+            "text",
+            None,
+        ],
+    )
+    @pytest.mark.parametrize("chunk_size,depth", [(1, 2), (100, 2), (65536, 2), (10, 0), (10, 5)])
+    def test_json_chunks(self, data, chunk_size, depth):
+        chunks = list(json_chunks(data, chunk_size, depth))
+        assert b"".join(chunks) == json.dumps(data, separators=(",", ":")).encode("utf-8")
+        assert all(len(chunk) >= chunk_size for chunk in chunks[:-1])
+
+    def test_post_streams_json_chunks(self, httpserver: HTTPServer):
+        httpserver.clear()
+        data = {"procedures": [{"operationID": i, "operation": "boot"} for i in range(10000)]}
+        httpserver.expect_request(
+            "/test",
+            method="POST",
+            headers={"Content-Type": "application/json", "Transfer-Encoding": "chunked"},
+            json=data,
+        ).respond_with_response(Response("", status=202))
+        client = BaseApiClient()
+
+        response = client._post(httpserver.url_for("/test"), data=json_chunks(data), content_type="application/json")
+
+        assert response.status_code == 202
+
+    @pytest.mark.parametrize(
+        "data,expected_requests",
+        [(b'{"key":1}', 3), ((chunk for chunk in [b'{"key":', b"1}"]), 1)],
+        ids=["bytes", "stream"],
+    )
+    def test_streamed_body_is_not_retried(self, httpserver: HTTPServer, data, expected_requests):
+        httpserver.clear()
+        httpserver.expect_request("/test", method="PUT").respond_with_response(Response("", status=503))
+        client = BaseApiClient(retries=2, backoff_factor=0)
+
+        response = client._put(httpserver.url_for("/test"), data=data, content_type="application/json")
+
+        assert response.status_code == 503
+        assert [request.get_data() for request, _ in httpserver.log] == [b'{"key":1}'] * expected_requests
+        client.close()
+
+    @pytest.mark.parametrize("retries,expected_requests", [(2, 3), (0, 1)])
+    def test_streamed_body_is_retried_when_connection_fails(self, caplog, retries, expected_requests):
+        client = BaseApiClient(retries=retries, backoff_factor=0)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._put(f"http://localhost:{free_port()}/test", data=iter([b"{}"]), timeout_sec=1)
+        retried = [record for record in caplog.records if record.getMessage().startswith("Retrying")]
+        assert len(retried) == expected_requests - 1
+
+
+async def async_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestAsyncRequestBody:
+    """Content type hints, pre-encoded and streamed bodies of AsyncBaseApiClient"""
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b'{"key":"val"}',
+            iter([b'{"key":', b'"val"}']),
+            async_chunks([b'{"key":', b'"val"}']),
+            json_chunks({"key": "val"}),
+        ],
+        ids=["bytes", "iterator", "async-iterator", "json_chunks"],
+    )
+    def test_post_with_content_type(self, httpserver: HTTPServer, data):
+        httpserver.clear()
+        httpserver.expect_request(
+            "/test", method="POST", headers={"Content-Type": "application/json"}, json={"key": "val"}
+        ).respond_with_response(Response("", status=202))
+        client = AsyncBaseApiClient()
+
+        url = httpserver.url_for("/test")
+        response = asyncio.run(send(client, "_post", url, data=data, content_type="application/json"))
+
+        assert response.status_code == 202
+
+    @pytest.mark.parametrize("data,expected_requests", [(b"{}", 3), (iter([b"{}"]), 1)], ids=["bytes", "stream"])
+    def test_streamed_body_is_not_retried(self, httpserver: HTTPServer, data, expected_requests):
+        httpserver.clear()
+        httpserver.expect_request("/test", method="PUT").respond_with_response(Response("", status=503))
+        client = AsyncBaseApiClient(retries=2, backoff_factor=0)
+
+        response = asyncio.run(send(client, "_put", httpserver.url_for("/test"), data=data))
+
+        assert response.status_code == 503
+        assert len(httpserver.log) == expected_requests
+
+    def test_delete_with_content_type(self, httpserver: HTTPServer):
+        httpserver.clear()
+        httpserver.expect_request(
+            "/test", method="DELETE", headers={"Content-Type": "text/plain"}, data="ids"
+        ).respond_with_response(Response("", status=202))
+        client = AsyncBaseApiClient()
+
+        url = httpserver.url_for("/test")
+        response = asyncio.run(send(client, "_delete", url, data="ids", content_type="text/plain"))
+
+        assert response.status_code == 202
@@ -13,12 +13,22 @@
 #  under the License.
 """CLI Related Package Test"""
 
+import os
+import zipfile
+
+import pytest
+import yaml
+
 from src.migration_procedure_generator.common.config import BaseConfig
 
+ENV_VAR = "TEST_DUMMY_CONFIG"
+
 
 class DummyConig(BaseConfig):
     """Dummy Class for Testing ICommandLine"""
 
+    validations = 0
+
     def __init__(self) -> None:
         """Constructor. Passes the package name and file name to the BaseConfig constructor.
 
@@ -27,7 +37,13 @@ class DummyConig(BaseConfig):
             file_name (str): The file name of the configuration file.
         """
 
-        super().__init__("tests", "layoutcommon/test_config.yaml")
+        super().__init__("tests", "layoutcommon/test_config.yaml", ENV_VAR)
+
+    def _validate(self, config):
+        """Count the validations and reject a configuration without scalar_config."""
+        DummyConig.validations += 1
+        if "scalar_config" not in config:
+            raise KeyError("scalar_config")
 
     @property
     def list_config(self):
@@ -76,3 +92,73 @@ class TestDummyConig:
         assert type(dummy_config.object_config) is dict
         assert dummy_config.object_config["obj1"] == "obj_val1"
         assert dummy_config.object_config["obj2"] == "obj_val2"
+
+
+class TestCachedConfig:
+    """Test for the cache and the external file of BaseConfig"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, monkeypatch):
+        monkeypatch.delenv(ENV_VAR, raising=False)
+        monkeypatch.setattr(DummyConig, "validations", 0)
+        BaseConfig.clear_cache()
+        yield
+        BaseConfig.clear_cache()
+
+    @staticmethod
+    def write_config(path, value, mtime_ns):
+        path.write_text(f"scalar_config: {value}\n", encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_config_is_read_and_validated_once(self, mocker):
+        """Ensure that the configuration file is read and validated by the first instance only."""
+        safe_load = mocker.spy(yaml, "safe_load")
+        first = DummyConig()
+        second = DummyConig()
+
+        assert second._config is first._config
+        assert second.scalar_config == "scalar_val"
+        assert safe_load.call_count == 1
+        assert DummyConig.validations == 1
+
+        BaseConfig.clear_cache()
+        DummyConig()
+        assert safe_load.call_count == 2
+
+    def test_external_config_from_environment_variable(self, monkeypatch, tmp_path):
+        """Ensure that the file given by the environment variable replaces the resource and is read again
+        when it changes."""
+        path = tmp_path / "dummy.yaml"
+        self.write_config(path, "external", 1_000_000_000)
+        monkeypatch.setenv(ENV_VAR, str(path))
+
+        assert DummyConig().scalar_config == "external"
+        self.write_config(path, "modified", 1_000_000_000)
+        # Neither the modification time nor the size has changed.
+        assert DummyConig().scalar_config == "external"
+        self.write_config(path, "modified", 2_000_000_000)
+        assert DummyConig().scalar_config == "modified"
+        assert DummyConig.validations == 2
+
+    def test_invalid_config_is_not_cached(self, monkeypatch, tmp_path):
+        """Ensure that a configuration that fails validation is read again by the next instance."""
+        path = tmp_path / "dummy.yaml"
+        path.write_text("list_config: []\n", encoding="utf-8")
+        monkeypatch.setenv(ENV_VAR, str(path))
+
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                DummyConig()
+        assert DummyConig.validations == 2
+
+        monkeypatch.setenv(ENV_VAR, str(tmp_path / "missing.yaml"))
+        with pytest.raises(FileNotFoundError):
+            DummyConig()
+
+    def test_file_version_of_resource_outside_file_system(self, tmp_path):
+        """Ensure that a resource in a zip archive has no version, so that it is read once."""
+        archive = tmp_path / "package.zip"
+        with zipfile.ZipFile(archive, "w") as file:
+            file.writestr("config.yaml", "scalar_config: zipped\n")
+
+        assert BaseConfig._file_version(zipfile.Path(archive, "config.yaml")) is None
@@ -13,13 +13,23 @@
 #  under the License.
 import pytest
 import logging
+import logging.config
 import json
 import os
 import io
+import queue
+import threading
 import datetime
 import re
+import signal
+import time
 
-from migration_procedure_generator.common.logger import Logger, MicrosecondFormatter
+from migration_procedure_generator.common.logger import (
+    BoundedQueueListener,
+    Logger,
+    MicrosecondFormatter,
+    OverflowQueueHandler,
+)
 
 class TestMicrosecondFormatter:
     """Test for MicrosecondFormatter"""
@@ -227,4 +237,203 @@ class TestLogger:
 
         with open(log_file, "r", encoding="utf-8") as f:
             log_content = f.read()
-            assert re.search(r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}\.\d{6} INFO .*' + re.escape(log_message), log_content)
\ No newline at end of file
+            assert re.search(r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}\.\d{6} INFO .*' + re.escape(log_message), log_content)
+
+    @pytest.mark.parametrize("level,called", [(logging.DEBUG, True), (logging.INFO, False)])
+    def test_log_formats_message_only_when_enabled(self, logger, mocker, level, called):
+        """Verify that a message given as a function is formatted only when the log level is enabled."""
+        stream, handler = self.capture_log_output(logger)
+        message = mocker.Mock(return_value="Lazily formatted message")
+        logger._logger.setLevel(level)
+        try:
+            logger.log(logging.DEBUG, message)
+        finally:
+            logger._logger.setLevel(logging.DEBUG)
+        handler.flush()
+
+        assert message.called == called
+        if called:
+            log_dict = json.loads(stream.getvalue().strip())
+            self.assert_log_structure(log_dict, "Lazily formatted message")
+            assert log_dict["file"] == __file__
+        else:
+            assert stream.getvalue() == ""
+
+
+class TestQueuedLogger:
+    """Test for the queued mode of Logger"""
+
+    @staticmethod
+    def queued_config(filename, overflow="block"):
+        return {
+            "version": 1,
+            "disable_existing_loggers": False,
+            "formatters": {"standard": {"format": "%(levelname)s %(message)s", "datefmt": "%Y/%m/%d %H:%M:%S.%f"}},
+            "handlers": {
+                "file": {"class": "logging.FileHandler", "level": "INFO", "formatter": "standard", "filename": filename}
+            },
+            "root": {"level": "DEBUG", "handlers": ["file"]},
+            "queue": {"maxsize": 100, "overflow": overflow},
+        }
+
+    @pytest.fixture(autouse=True)
+    def stop_listener(self):
+        yield
+        Logger.stop_listener()
+        logging.config.dictConfig({"version": 1, "disable_existing_loggers": False})
+
+    def test_queued_logger_writes_on_listener_thread(self, tmp_path):
+        """Verify that records are written by the listener thread, which is kept while the configuration is the same."""
+        filename = str(tmp_path / "queued.log")
+        logger = Logger(self.queued_config(filename))
+        listener = Logger._listener
+        assert [type(handler) for handler in logging.getLogger().handlers] == [OverflowQueueHandler]
+        assert listener._thread is not None
+
+        logger.info("Queued message")
+        logger.debug("Filtered by the level of the file handler")
+        Logger(self.queued_config(filename)).info("Second message")
+        assert Logger._listener is listener
+        assert Logger.dropped_records() == 0
+        Logger.stop_listener()
+
+        with open(filename, encoding="utf-8") as file:
+            messages = [json.loads(line.split(" ", 1)[1])["message"] for line in file]
+        assert messages == ["Queued message", "Second message"]
+        assert listener._thread is None
+
+    @pytest.mark.parametrize("overflow", ["block", "drop_new"])
+    def test_queued_logger_writes_directly_after_listener_stops(self, tmp_path, overflow):
+        """Verify that records logged after the listener has stopped are written by the handlers of the root logger."""
+        filename = str(tmp_path / "queued.log")
+        config = self.queued_config(filename, overflow)
+        config["queue"]["maxsize"] = 1
+        logger = Logger(config)
+        logger.info("Queued message")
+        # A handler added to the root logger afterwards is kept.
+        logging.getLogger().addHandler(logging.NullHandler())
+        Logger.stop_listener()
+        assert [type(handler) for handler in logging.getLogger().handlers] == [logging.NullHandler, logging.FileHandler]
+
+        for number in range(3):
+            logger.info(f"Message {number} after stop")
+        Logger.stop_listener()
+
+        with open(filename, encoding="utf-8") as file:
+            messages = [json.loads(line.split(" ", 1)[1])["message"] for line in file]
+        assert messages == ["Queued message", "Message 0 after stop", "Message 1 after stop", "Message 2 after stop"]
+
+    def test_reset_listener_hands_handlers_back(self, tmp_path):
+        """Verify that the listener is forgotten and its handlers are handed back to the root logger."""
+        filename = str(tmp_path / "queued.log")
+        config = self.queued_config(filename)
+        logger = Logger(config)
+        listener = Logger._listener
+        Logger.reset_listener()
+        listener.stop()
+        assert Logger._listener is None
+        assert Logger._listener_config is None
+        assert [type(handler) for handler in logging.getLogger().handlers] == [logging.FileHandler]
+
+        logger.info("Direct message")
+        Logger(config).info("Queued message")
+        assert Logger._listener is not listener
+        Logger.stop_listener()
+        with open(filename, encoding="utf-8") as file:
+            messages = [json.loads(line.split(" ", 1)[1])["message"] for line in file]
+        assert messages == ["Direct message", "Queued message"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+    def test_queued_logger_writes_in_child_process(self, tmp_path):
+        """Verify that a process forked in the queued mode writes its records, instead of filling the queue of the
+        listener thread of its parent, which does not run in the child process."""
+        filename = str(tmp_path / "queued.log")
+        config = self.queued_config(filename)
+        config["queue"]["maxsize"] = 1
+        logger = Logger(config)
+        logger.info("Parent message")
+        Logger.stop_listener()
+        Logger(config)
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                for number in range(3):
+                    logger.info(f"Child message {number}")
+                Logger(config).info("Child message after setup")
+                Logger.stop_listener()
+                status = 0
+            finally:
+                os._exit(status)
+        deadline = time.monotonic() + 10
+        while (waited := os.waitpid(pid, os.WNOHANG))[0] == 0:
+            if time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                pytest.fail("the child process hung while logging")
+            time.sleep(0.01)
+        assert os.waitstatus_to_exitcode(waited[1]) == 0
+        Logger.stop_listener()
+
+        with open(filename, encoding="utf-8") as file:
+            messages = [json.loads(line.split(" ", 1)[1])["message"] for line in file]
+        children = [f"Child message {number}" for number in range(3)]
+        assert messages == ["Parent message", *children, "Child message after setup"]
+
+    def test_queued_logger_stops_when_configuration_changes(self, tmp_path):
+        """Verify that the listener is stopped when the logger is set up again with another configuration."""
+        Logger(self.queued_config(str(tmp_path / "queued.log")))
+        listener = Logger._listener
+        Logger(self.queued_config(str(tmp_path / "queued.log"), overflow="drop_new"))
+        assert listener._thread is None
+        assert Logger._listener is not listener
+
+        Logger(TestLogger.TEST_CONFIG)
+        assert Logger._listener is None
+        assert Logger.dropped_records() == 0
+        os.remove("test.log")
+
+    @staticmethod
+    def full_handler(overflow):
+        handler = OverflowQueueHandler(queue.Queue(2), overflow)
+        for message in ("first", "second", "third"):
+            handler.handle(logging.makeLogRecord({"msg": message}))
+        return handler
+
+    @pytest.mark.parametrize(
+        "overflow,expected",
+        [("drop_new", ["first", "second"]), ("drop_oldest", ["second", "third"])],
+    )
+    def test_overflow_queue_handler_drops_records(self, overflow, expected):
+        """Verify that the overflow policy decides which record is discarded when the queue is full."""
+        handler = self.full_handler(overflow)
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == expected
+        assert handler.dropped == 1
+
+    def test_overflow_queue_handler_blocks(self):
+        """Verify that the block policy waits until the listener has made room in the queue."""
+        handler = OverflowQueueHandler(queue.Queue(1), "block")
+        handler.handle(logging.makeLogRecord({"msg": "first"}))
+        threading.Timer(0.1, handler.queue.get).start()
+        handler.handle(logging.makeLogRecord({"msg": "second"}))
+        assert handler.queue.get_nowait().msg == "second"
+        assert handler.dropped == 0
+
+    def test_overflow_queue_handler_drop_oldest_when_queue_drained(self, mocker):
+        """Verify that the record is dropped when the queue changes between the attempts."""
+        handler = OverflowQueueHandler(queue.Queue(1), "drop_oldest")
+        mocker.patch.object(handler.queue, "put_nowait", side_effect=queue.Full)
+        handler.handle(logging.makeLogRecord({"msg": "first"}))
+        assert handler.dropped == 1
+
+    def test_bounded_queue_listener_stops_when_queue_full(self):
+        """Verify that the listener waits for room in a full queue to stop, instead of raising queue.Full."""
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        listener = BoundedQueueListener(queue.Queue(1), handler)
+        listener.queue.put_nowait(logging.makeLogRecord({"msg": "queued"}))
+        listener.start()
+        listener.stop()
+        assert [record.msg for record in records] == ["queued"]
@@ -0,0 +1,88 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import threading
+import time
+
+import pytest
+
+from migration_procedure_generator.coalescing import SingleFlight, canonical_hash
+
+TIMEOUT = 10
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_canonical_hash_ignores_key_order():
+    assert canonical_hash({"a": 1, "b": [1, 2]}, None) == canonical_hash({"b": [1, 2], "a": 1}, None)
+    assert canonical_hash({"a": 1, "b": [1, 2]}) != canonical_hash({"a": 1, "b": [2, 1]})
+    assert canonical_hash({"a": 1}, None) != canonical_hash({"a": 1}, "downtime")
+
+
+def run_concurrently(flight, key, func, count):
+    outcomes = [None] * count
+
+    def call(index):
+        try:
+            outcomes[index] = flight.run(key, func)
+        except ValueError as err:
+            outcomes[index] = err
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    threads[0].start()
+    return threads, outcomes
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_single_flight_shares_in_flight_call(fails):
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        started.set()
+        release.wait(TIMEOUT)
+        if fails:
+            raise ValueError("failed")
+        return object()
+
+    threads, outcomes = run_concurrently(flight, "key", compute, 3)
+    assert started.wait(TIMEOUT)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: flight.coalesced == 2)
+    assert flight.encode_json() == {"requests": 3, "computations": 1, "coalesced": 2, "inFlight": 1}
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert len(calls) == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert isinstance(outcomes[0], ValueError) == fails
+    assert flight.encode_json()["inFlight"] == 0
+
+
+def test_single_flight_does_not_share_finished_or_different_calls():
+    flight = SingleFlight()
+
+    assert flight.run("key", lambda value: [value], 1) == [1]
+    assert flight.run("key", lambda value: [value], 2) == [2]
+    assert flight.run("other", lambda: None) is None
+    assert flight.encode_json() == {"requests": 3, "computations": 3, "coalesced": 0, "inFlight": 0}
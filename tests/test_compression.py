@@ -0,0 +1,101 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import gzip
+import sys
+import types
+
+import pytest
+
+from migration_procedure_generator.compression import available_codings, compress_body, select_coding
+
+BODY = b'{"operationID":1,"operation":"shutdown","dependencies":[]}' * 100
+
+
+@pytest.fixture
+def optional_codecs(monkeypatch):
+    """Install stand-ins of the optional brotli and zstandard modules"""
+    brotli = types.ModuleType("brotli")
+    brotli.compress = lambda body, quality: b"br" + bytes([quality]) + body
+    zstandard = types.ModuleType("zstandard")
+
+    class ZstdCompressor:
+        def __init__(self, level):
+            self.level = level
+
+        def compress(self, body):
+            return b"zstd" + bytes([self.level]) + body
+
+    zstandard.ZstdCompressor = ZstdCompressor
+    monkeypatch.setitem(sys.modules, "brotli", brotli)
+    monkeypatch.setitem(sys.modules, "zstandard", zstandard)
+    available_codings.cache_clear()
+    yield
+    available_codings.cache_clear()
+
+
+@pytest.fixture
+def without_optional_codecs(monkeypatch):
+    """Make the optional brotli and zstandard modules unavailable"""
+    monkeypatch.setitem(sys.modules, "brotli", None)
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    available_codings.cache_clear()
+    yield
+    available_codings.cache_clear()
+
+
+class TestCompression:
+    def test_available_codings_without_optional_modules(self, without_optional_codecs):
+        assert list(available_codings()) == ["gzip"]
+
+    def test_available_codings_with_optional_modules(self, optional_codecs):
+        assert list(available_codings()) == ["zstd", "br", "gzip"]
+
+    @pytest.mark.parametrize(
+        "accept_encoding,expected",
+        [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("GZIP;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("gzip;q=invalid", None),
+            ("*", "zstd"),
+            ("gzip, br", "br"),
+            ("gzip, deflate, br, zstd", "zstd"),
+            ("gzip;q=1.0, br;q=0.8, zstd;q=0.5", "gzip"),
+            ("*;q=0.5, gzip", "gzip"),
+            ("zstd;level=3", "zstd"),
+        ],
+    )
+    def test_select_coding(self, accept_encoding, expected):
+        codings = {"zstd": None, "br": None, "gzip": None}
+        assert select_coding(accept_encoding, codings) == expected
+
+    def test_compress_body_with_gzip(self, without_optional_codecs):
+        body, coding = compress_body(BODY, "gzip, deflate, br, zstd", 1024, 6)
+        assert coding == "gzip"
+        assert len(body) < len(BODY)
+        assert gzip.decompress(body) == BODY
+
+    def test_compress_body_with_optional_modules(self, optional_codecs):
+        assert compress_body(BODY, "br", 1024, 5) == (b"br\x05" + BODY, "br")
+        assert compress_body(BODY, "br, zstd", 1024, 3) == (b"zstd\x03" + BODY, "zstd")
+
+    @pytest.mark.parametrize(
+        "accept_encoding,minimum_size",
+        [("gzip", len(BODY) + 1), ("identity", 0), (None, 0)],
+    )
+    def test_compress_body_not_compressed(self, accept_encoding, minimum_size):
+        assert compress_body(BODY, accept_encoding, minimum_size, 6) == (BODY, None)
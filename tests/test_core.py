@@ -21,6 +21,7 @@ import pytest
 import yaml
 
 from migration_procedure_generator.core import ExitCode, main
+from migration_procedure_generator.encoding import decode_binary
 from migration_procedure_generator.plan import Task
 from migration_procedure_generator.setting import MigrationConfigReader, MigrationLogConfigReader
 from migration_procedure_generator.custom_exception import SettingFileValidationError
@@ -320,6 +321,339 @@ class TestMain:
         assert '"dependencies": [6]' in out
         assert '"targetDeviceID": "EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA"' in out
 
+    def test_main_success_when_timings_are_requested(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--timings",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        assert len(json.loads(out)) == 7
+        timings = json.loads(err)["timings"]
+        assert [timing["phase"] for timing in timings] == [
+            "destruct",
+            "construct",
+            "remove_redundant_tasks",
+            "remove_hotplug_power_cycles",
+            "complete_device_dependencies",
+            "remove_indirect_dependencies",
+        ]
+        assert timings[-1]["tasks"] == 7
+
+    def test_main_success_when_profile_out_is_specified(
+        self, capfd, tmp_path, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        profile_file = tmp_path / "plan.prof"
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--profile-out",
+            str(profile_file),
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        assert len(json.loads(out)) == 7
+        assert err == ""
+        assert profile_file.stat().st_size > 0
+
+    def test_main_success_when_binary_format_is_requested(
+        self, capfdbinary, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = ["core.py", "--prev", get_tmp_oneNode_json_file, "--new", get_tmp_twoNode_json_file]
+        with pytest.raises(SystemExit):
+            main()
+        json_out, _ = capfdbinary.readouterr()
+        Task.__index_op_id__ = 0
+        sys.argv = [*sys.argv, "--format", "binary"]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        binary_out, _ = capfdbinary.readouterr()
+        assert decode_binary(binary_out) == json.loads(json_out)
+
+    def test_main_success_when_schedule_is_requested(
+        self, mocker, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "scheduling_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"fabric": 1},
+        )
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--schedule",
+            "--timings",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        result = json.loads(out)
+        assert len(result["procedures"]) == 7
+        assert sorted(result["schedule"]["order"]) == [task["operationID"] for task in result["procedures"]]
+        fabric_operations = {
+            task["operationID"] for task in result["procedures"] if task["operation"] in ("connect", "disconnect")
+        }
+        assert all(len(fabric_operations.intersection(slot)) <= 1 for slot in result["schedule"]["slots"])
+        assert json.loads(err)["timings"][-1]["phase"] == "schedule"
+
+    def test_main_success_when_hotplug_is_specified(self, capfd, tmp_path):
+        prev_file, new_file = tmp_path / "prev.json", tmp_path / "new.json"
+        memory = {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]}
+        cpu_1 = {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]}
+        cpu_2 = {"deviceIDs": ["EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA"]}
+        prev_nodes = [{"device": {"cpu": cpu_1, "memory": memory}}, {"device": {"cpu": cpu_2}}]
+        new_nodes = [{"device": {"cpu": cpu_1}}, {"device": {"cpu": cpu_2, "memory": memory}}]
+        prev_file.write_text(json.dumps({"nodes": prev_nodes}))
+        new_file.write_text(json.dumps({"nodes": new_nodes}))
+        sys.argv = ["core.py", "--prev", str(prev_file), "--new", str(new_file), "--verify", "--hotplug", "Memory"]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        assert err == ""
+        assert [task["operation"] for task in json.loads(out)] == ["disconnect", "connect"]
+
+    def test_main_failure_when_schedule_is_requested_with_binary_format(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--schedule",
+            "--format",
+            "binary",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 2
+        _, err = capfd.readouterr()
+        assert "--schedule cannot be used with --format binary" in err
+
+    def test_main_success_when_submit_is_requested(
+        self, mocker, capfd, httpserver, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_json({"applyID": "1"})
+        url = httpserver.url_for("/apply")
+        mocker.patch.object(
+            MigrationConfigReader,
+            "layout_apply_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"url": url, "timeout": 5, "retries": 0},
+        )
+        sys.argv = ["core.py", "--prev", get_tmp_oneNode_json_file, "--new", get_tmp_twoNode_json_file, "--submit"]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, _ = capfd.readouterr()
+        result = json.loads(out)
+        assert result["layoutApply"] == {"url": url, "status": 200, "response": {"applyID": "1"}}
+        request, _ = httpserver.log[0]
+        assert json.loads(request.get_data()) == {"procedures": result["procedures"]}
+
+    def test_main_failure_when_submission_fails(
+        self, mocker, capfd, httpserver, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_data("unavailable", status=503)
+        mocker.patch.object(
+            MigrationConfigReader,
+            "layout_apply_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"url": httpserver.url_for("/apply"), "timeout": 5, "retries": 0},
+        )
+        sys.argv = ["core.py", "--prev", get_tmp_oneNode_json_file, "--new", get_tmp_twoNode_json_file, "--submit"]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.INTERNAL_ERR
+        out, err = capfd.readouterr()
+        assert out == ""
+        assert err.startswith("[E50011]") and "status 503 unavailable" in err
+
+    def test_main_failure_when_submit_is_requested_with_binary_format(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--submit",
+            "--format",
+            "binary",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 2
+        _, err = capfd.readouterr()
+        assert "--submit cannot be used with --format binary" in err
+
+    def test_main_success_when_downtime_optimization_is_requested(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--optimize",
+            "downtime",
+            "--schedule",
+            "--verify",
+            "--timings",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        result = json.loads(out)
+        assert [task["operationID"] for task in result["procedures"]] == list(range(1, 8))
+        assert [start["operationID"] for start in result["downtime"]["starts"]] == list(range(1, 8))
+        total = result["downtime"]["total"]
+        assert total["optimized"] <= total["baseline"]
+        assert [timing["phase"] for timing in json.loads(err)["timings"]][-2:] == ["minimize_downtime", "schedule"]
+
+    def test_main_failure_when_optimize_is_requested_with_binary_format(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--optimize",
+            "downtime",
+            "--format",
+            "binary",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 2
+        _, err = capfd.readouterr()
+        assert "--optimize cannot be used with --format binary" in err
+
+    @pytest.mark.parametrize("max_offline", ["1", "2"])
+    def test_main_success_when_max_offline_is_specified(self, capfd, tmp_path, max_offline):
+        prev_file, new_file = tmp_path / "prev.json", tmp_path / "new.json"
+        memory = {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]}
+        cpu_1 = {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]}
+        cpu_2 = {"deviceIDs": ["EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA"]}
+        prev_nodes = [{"device": {"cpu": cpu_1, "memory": memory}}, {"device": {"cpu": cpu_2}}]
+        new_nodes = [{"device": {"cpu": cpu_1}}, {"device": {"cpu": cpu_2, "memory": memory}}]
+        prev_file.write_text(json.dumps({"nodes": prev_nodes}))
+        new_file.write_text(json.dumps({"nodes": new_nodes}))
+        sys.argv = ["core.py", "--prev", str(prev_file), "--new", str(new_file), "--verify"]
+        sys.argv += ["--max-offline", max_offline]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        assert err == ""
+        shutdown = [task for task in json.loads(out) if task["operation"] == "shutdown"][-1]
+        assert shutdown["dependencies"] == ([3] if max_offline == "1" else [])
+
+    def test_main_failure_when_max_offline_cannot_be_kept(self, capfd, tmp_path):
+        prev_file, new_file = tmp_path / "prev.json", tmp_path / "new.json"
+        memory_1 = {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]}
+        memory_2 = {"deviceIDs": ["C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F"]}
+        cpu_1 = {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]}
+        cpu_2 = {"deviceIDs": ["EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA"]}
+        prev_nodes = [{"device": {"cpu": cpu_1, "memory": memory_1}}, {"device": {"cpu": cpu_2, "memory": memory_2}}]
+        new_nodes = [{"device": {"cpu": cpu_1, "memory": memory_2}}, {"device": {"cpu": cpu_2, "memory": memory_1}}]
+        prev_file.write_text(json.dumps({"nodes": prev_nodes}))
+        new_file.write_text(json.dumps({"nodes": new_nodes}))
+        sys.argv = ["core.py", "--prev", str(prev_file), "--new", str(new_file), "--max-offline", "1"]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.VALIDATION_ERROR
+        out, err = capfd.readouterr()
+        assert out == ""
+        assert err.startswith("[E50008]Migration procedure cannot keep at most 1 nodes offline at the same time.")
+
+    def test_main_failure_when_max_offline_is_not_positive(
+        self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--max-offline",
+            "0",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 2
+        _, err = capfd.readouterr()
+        assert "--max-offline must be at least 1" in err
+
+    def test_main_success_when_verify_is_requested(self, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file):
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--verify",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.NORMAL
+        out, err = capfd.readouterr()
+        assert len(json.loads(out)) == 7
+        assert err == ""
+
+    def test_main_failure_when_verification_fails(
+        self, mocker, capfd, get_tmp_oneNode_json_file, get_tmp_twoNode_json_file
+    ):
+        mocker.patch(
+            "migration_procedure_generator.core.verify_plan",
+            return_value=["dependency cycle among operations [1, 2]"],
+        )
+        sys.argv = [
+            "core.py",
+            "--prev",
+            get_tmp_oneNode_json_file,
+            "--new",
+            get_tmp_twoNode_json_file,
+            "--verify",
+        ]
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == ExitCode.INTERNAL_ERR
+        out, err = capfd.readouterr()
+        assert out == ""
+        assert err == (
+            "[E50007]Generated migration procedure failed verification\n"
+            "dependency cycle among operations [1, 2]\n"
+        )
+
     def test_main_success_when_prev_is_empty(self, capfd, get_tmp_oneNode_json_file, get_tmp_Empty_json_file):
         sys.argv = ["core.py", "--prev", get_tmp_Empty_json_file, "--new", get_tmp_oneNode_json_file]
         with pytest.raises(SystemExit) as excinfo:
@@ -0,0 +1,167 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import pytest
+
+from migration_procedure_generator.downtime import (
+    DEFAULT_DURATIONS,
+    DowntimeReport,
+    downtime_start_times,
+    earliest_start_times,
+    enforce_start_times,
+    minimize_downtime,
+    node_downtimes,
+)
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+from migration_procedure_generator.verifier import verify_plan
+
+
+@pytest.fixture(autouse=True)
+def initializetask():
+    Task.__index_op_id__ = 0
+
+
+def swap_plan():
+    """cpu-1 gives memory-1 to cpu-2, cpu-3 is shut down for good and cpu-4 is added"""
+    shutdown_1 = Task("shutdown", "cpu-1")
+    shutdown_2 = Task("shutdown", "cpu-2")
+    shutdown_3 = Task("shutdown", "cpu-3")
+    disconnect = Task("disconnect", "cpu-1", "memory-1", [shutdown_1])
+    connect = Task("connect", "cpu-2", "memory-1", [disconnect, shutdown_2])
+    boot_1 = Task("boot", "cpu-1", dependencies=[disconnect])
+    boot_2 = Task("boot", "cpu-2", dependencies=[connect])
+    boot_4 = Task("boot", "cpu-4")
+    return Plan([shutdown_1, shutdown_2, shutdown_3, disconnect, connect, boot_1, boot_2, boot_4])
+
+
+def test_earliest_start_times_success():
+    durations = {**DEFAULT_DURATIONS, "disconnect": 5}
+
+    assert earliest_start_times(swap_plan(), durations) == {1: 0, 2: 0, 3: 0, 4: 1, 5: 6, 6: 6, 7: 7, 8: 0}
+
+
+def test_downtime_start_times_success():
+    durations = {**DEFAULT_DURATIONS, "disconnect": 5}
+
+    # Only the shutdown of cpu-2 moves, right before the connect that needs it. Operations without dependents,
+    # such as the shutdown of cpu-3, keep their earliest start.
+    assert downtime_start_times(swap_plan(), durations) == {1: 0, 2: 5, 3: 0, 4: 1, 5: 6, 6: 6, 7: 7, 8: 0}
+
+
+def test_node_downtimes_success():
+    plan = swap_plan()
+    starts = earliest_start_times(plan, DEFAULT_DURATIONS)
+
+    assert node_downtimes(plan, starts, DEFAULT_DURATIONS) == {"cpu-1": 3, "cpu-2": 4}
+
+
+def test_minimize_downtime_success():
+    plan = swap_plan()
+
+    report = minimize_downtime(plan, {"boot": 10})
+
+    assert [(task.op_id, task.operation, task.cpu_id) for task in plan.tasks] == [
+        (1, "shutdown", "cpu-1"),
+        (2, "shutdown", "cpu-3"),
+        (3, "boot", "cpu-4"),
+        (4, "shutdown", "cpu-2"),
+        (5, "disconnect", "cpu-1"),
+        (6, "connect", "cpu-2"),
+        (7, "boot", "cpu-1"),
+        (8, "boot", "cpu-2"),
+    ]
+    assert all(depending.op_id < task.op_id for task in plan.tasks for depending in task.dependencies)
+    # The shutdown of cpu-2 waits for the shutdown of cpu-3, so that it also starts late when every operation
+    # starts as soon as its dependencies have completed.
+    assert plan.tasks[3].dependencies.op_ids() == [2]
+    assert earliest_start_times(plan, {**DEFAULT_DURATIONS, "boot": 10}) == report.starts
+    assert report.encode_json() == {
+        "starts": [
+            {"operationID": 1, "start": 0},
+            {"operationID": 2, "start": 0},
+            {"operationID": 3, "start": 0},
+            {"operationID": 4, "start": 1},
+            {"operationID": 5, "start": 1},
+            {"operationID": 6, "start": 2},
+            {"operationID": 7, "start": 2},
+            {"operationID": 8, "start": 3},
+        ],
+        "nodes": {"cpu-1": {"baseline": 12, "optimized": 12}, "cpu-2": {"baseline": 13, "optimized": 12}},
+        "total": {"baseline": 25, "optimized": 24},
+    }
+
+
+def test_minimize_downtime_keeps_the_makespan_and_a_valid_plan_success():
+    # cpu-0 to cpu-4 give their memory to cpu-5 to cpu-9, which keep their own memory.
+    memory = {node: [f"memory-{node}-{index}" for index in range(3)] for node in range(10)}
+    current = {
+        "nodes": [
+            {"device": {"cpu": {"deviceIDs": [f"cpu-{node}"]}, "memory": {"deviceIDs": memory[node]}}}
+            for node in range(10)
+        ]
+    }
+    desired = {
+        "nodes": [
+            {"device": {"cpu": {"deviceIDs": [f"cpu-{node}"]}, "memory": {"deviceIDs": memory[node][:1]}}}
+            for node in range(5)
+        ]
+        + [
+            {
+                "device": {
+                    "cpu": {"deviceIDs": [f"cpu-{node}"]},
+                    "memory": {"deviceIDs": memory[node] + memory[node - 5][1:]},
+                }
+            }
+            for node in range(5, 10)
+        ]
+    }
+    prev, new = System.decode_json(current, {}), System.decode_json(desired, {})
+    plan = Plan.system_update_plan(prev, new)
+    baseline_starts = earliest_start_times(plan, DEFAULT_DURATIONS)
+
+    report = minimize_downtime(plan)
+
+    assert verify_plan(plan, prev, new) == []
+    assert max(report.starts.values()) == max(baseline_starts.values())
+    assert all(report.optimized[cpu_id] <= report.baseline[cpu_id] for cpu_id in report.baseline)
+    assert sum(report.optimized.values()) < sum(report.baseline.values())
+    assert [task.op_id for task in plan.tasks] == sorted(report.starts, key=lambda op_id: report.starts[op_id])
+    assert node_downtimes(plan, earliest_start_times(plan, DEFAULT_DURATIONS), DEFAULT_DURATIONS) == report.optimized
+
+
+def test_enforce_start_times_success():
+    # Shutdowns take no time, so the shutdown of cpu-3 ends when the shutdown of cpu-2 is meant to start, but it
+    # comes later in the order and cannot be depended on. No operation ends before the start of the shutdown of
+    # cpu-4, so it is left as it is.
+    plan = Plan(
+        [Task("boot", "cpu-1"), Task("shutdown", "cpu-4"), Task("shutdown", "cpu-2"), Task("shutdown", "cpu-3")]
+    )
+    durations = {**DEFAULT_DURATIONS, "shutdown": 0}
+    starts = {1: 0, 2: 0.5, 3: 1, 4: 1}
+
+    enforce_start_times(plan, starts, durations)
+
+    assert [task.dependencies.op_ids() for task in plan.tasks] == [[], [], [1], [3]]
+    assert earliest_start_times(plan, durations) == {**starts, 2: 0}
+
+
+def test_downtime_report_encode_json_success():
+    report = DowntimeReport({"cpu-2": 4, "cpu-1": 3}, {"cpu-2": 3, "cpu-1": 3}, {2: 1, 1: 0})
+
+    assert report.encode_json() == {
+        "starts": [{"operationID": 1, "start": 0}, {"operationID": 2, "start": 1}],
+        "nodes": {"cpu-1": {"baseline": 3, "optimized": 3}, "cpu-2": {"baseline": 4, "optimized": 3}},
+        "total": {"baseline": 7, "optimized": 6},
+    }
@@ -0,0 +1,145 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import json
+import struct
+
+import pytest
+
+from migration_procedure_generator.encoding import (
+    BINARY_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    decode_binary,
+    encode_binary,
+    select_media_type,
+)
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+
+
+@pytest.fixture(scope="function", autouse=True)
+def initializetask():
+    # Initialize so that the test for other things doesn't affect it
+    Task.__index_op_id__ = 0
+
+
+def node(cpu_id, **devices):
+    return {"device": {"cpu": {"deviceIDs": [cpu_id]}, **{k: {"deviceIDs": v} for k, v in devices.items()}}}
+
+
+class TestBinaryEncoding:
+    @pytest.mark.parametrize(
+        "prev,new",
+        [
+            ({"nodes": []}, {"nodes": []}),
+            (
+                {"nodes": []},
+                {"nodes": [node("3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6", memory=["895DFB43", "5DFB4893"])]},
+            ),
+            (
+                {
+                    "nodes": [
+                        node("ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", memory=["5DFB4893"], storage=["2CA6D4DF"]),
+                        node("EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA", memory=["895DFB43"]),
+                    ]
+                },
+                {
+                    "nodes": [
+                        node("ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", memory=["895DFB43"], storage=["2CA6D4DF"]),
+                        node("EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA", memory=["5DFB4893"], gpu=["9D8F1EAE"]),
+                        node("3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6", memory=["デバイス"]),
+                    ]
+                },
+            ),
+            ({"nodes": [node("ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", memory=["5DFB4893"])]}, {"nodes": []}),
+        ],
+    )
+    def test_round_trip_matches_encode_json(self, prev, new):
+        plan = Plan.system_update_plan(System.decode_json(prev, {}), System.decode_json(new, {}))
+        encoded = encode_binary(plan)
+        assert decode_binary(encoded) == plan.encode_json()
+        assert json.dumps(decode_binary(encoded)) == json.dumps(plan.encode_json())
+
+    def test_round_trip_connect_without_device(self):
+        shutdown = Task(operation="shutdown", cpu_id="cpu-1")
+        plan = Plan(
+            [
+                shutdown,
+                Task(operation="connect", cpu_id="cpu-1", dependencies=[shutdown]),
+                Task(operation="connect", cpu_id="cpu-1", device_id="", dependencies=[shutdown]),
+            ]
+        )
+        assert decode_binary(encode_binary(plan)) == plan.encode_json()
+
+    def test_binary_is_smaller_than_json(self):
+        prev = {"nodes": [node(f"cpu-{i:04d}-0000-0000-0000", memory=[f"mem-{i:04d}-0000-0000"]) for i in range(50)]}
+        new = {"nodes": [node(f"cpu-{i:04d}-0000-0000-0000", memory=[f"mem-{i + 1:04d}-0000-0000"]) for i in range(50)]}
+        plan = Plan.system_update_plan(System.decode_json(prev, {}), System.decode_json(new, {}))
+        assert len(encode_binary(plan)) * 2 < len(json.dumps(plan.encode_json()))
+
+    @pytest.mark.parametrize(
+        "data,message",
+        [
+            (b"", "Truncated migration procedures binary"),
+            (b"JSON\x01\x00\x00\x00\x00", "Not a migration procedures binary"),
+            (b"MPLN\x02\x00\x00\x00\x00", "Unsupported migration procedures binary version: 2"),
+            (b"MPLN\x01\x00\x00\x00\x00\x01\x00\x00\x00", "Truncated migration procedures binary"),
+        ],
+        ids=["empty", "magic", "version", "truncated"],
+    )
+    def test_decode_failure_when_data_is_invalid(self, data, message):
+        with pytest.raises(ValueError) as excinfo:
+            decode_binary(data)
+        assert str(excinfo.value) == message
+
+    def test_encoded_layout(self):
+        shutdown = Task(operation="shutdown", cpu_id="c")
+        plan = Plan([shutdown, Task(operation="disconnect", cpu_id="c", device_id="d", dependencies=[shutdown])])
+        assert encode_binary(plan) == (
+            b"MPLN"
+            + struct.pack("<BI", 1, 2)
+            + struct.pack("<H", 1)
+            + b"c"
+            + struct.pack("<H", 1)
+            + b"d"
+            + struct.pack("<I", 2)
+            + struct.pack("<2I", 1, 2)
+            + struct.pack("<2B", 0, 2)
+            + struct.pack("<2I", 0, 0)
+            + struct.pack("<2i", -1, 1)
+            + struct.pack("<3I", 0, 0, 1)
+            + struct.pack("<1I", 1)
+        )
+
+
+class TestSelectMediaType:
+    @pytest.mark.parametrize(
+        "accept,expected",
+        [
+            (None, JSON_MEDIA_TYPE),
+            ("", JSON_MEDIA_TYPE),
+            ("*/*", JSON_MEDIA_TYPE),
+            ("application/json", JSON_MEDIA_TYPE),
+            (BINARY_MEDIA_TYPE, BINARY_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE}, */*", BINARY_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE}, application/json", JSON_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE}, application/json;q=0.9", BINARY_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE};q=0.5, application/*", JSON_MEDIA_TYPE),
+            (f"application/json;q=0.1, {BINARY_MEDIA_TYPE.upper()};q=0.8", BINARY_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE};q=0", JSON_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE};level=1;q=invalid", JSON_MEDIA_TYPE),
+            (f"{BINARY_MEDIA_TYPE};level=1", BINARY_MEDIA_TYPE),
+        ],
+    )
+    def test_select_media_type(self, accept, expected):
+        assert select_media_type(accept) == expected
@@ -0,0 +1,53 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import threading
+
+import pytest
+
+from migration_procedure_generator.custom_exception import SettingFileValidationError
+from migration_procedure_generator.health import Readiness
+
+TIMEOUT = 10
+
+
+def test_readiness_becomes_ready_after_warm_up():
+    readiness = Readiness()
+    release = threading.Event()
+    readiness.start(lambda: release.wait(TIMEOUT))
+
+    assert readiness.encode_json() == {"status": "warming up"}
+    release.set()
+    assert readiness.ready.wait(TIMEOUT)
+    assert readiness.encode_json() == {"status": "ready"}
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        (SettingFileValidationError("invalid"), SettingFileValidationError("invalid").response_msg),
+        (ValueError("unexpected"), {"message": "Internal server error."}),
+    ],
+)
+def test_readiness_records_failed_warm_up(error, expected):
+    def fail():
+        raise error
+
+    readiness = Readiness()
+    readiness.start(fail)
+    readiness._thread.join(TIMEOUT)
+
+    assert not readiness.ready.is_set()
+    assert readiness.error is error
+    assert readiness.encode_json() == {"status": "failed", "error": expected}
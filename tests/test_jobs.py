@@ -0,0 +1,220 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from migration_procedure_generator.custom_exception import (
+    AvailabilityBudgetError,
+    JobNotCompletedError,
+    JobNotFoundError,
+    JobQueueFullError,
+    JobsUnavailableError,
+)
+from migration_procedure_generator.jobs import Job, JobManager, JobStatus
+from migration_procedure_generator.tracing import PlanTracer
+
+TIMEOUT = 10
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager()
+    yield manager
+    manager.shutdown()
+
+
+def run_phases(job, *phases):
+    tracer = PlanTracer([job.progress])
+    for phase in phases:
+        tracer.run(phase, lambda: None, plan=[])
+    return list(phases)
+
+
+def blocking(job, started, release):
+    started.set()
+    release.wait(TIMEOUT)
+    return run_phases(job, "after release")
+
+
+def test_job_manager_runs_job_success(manager):
+    job = manager.submit(run_phases, "destruct", "construct", workers=1, ttl=60, max_queued=10)
+    job.future.result(TIMEOUT)
+
+    assert manager.get(job.job_id) is job
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == ["destruct", "construct"]
+    assert job.encode_json() == {
+        "jobID": job.job_id,
+        "status": "succeeded",
+        "progress": {"phase": "construct", "completedPhases": 2},
+    }
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        (AvailabilityBudgetError(1, ["cpu-1", "cpu-2"]), AvailabilityBudgetError(1, ["cpu-1", "cpu-2"]).response_msg),
+        (ValueError("unexpected"), {"message": "Internal server error."}),
+    ],
+)
+def test_job_manager_records_failure(manager, error, expected):
+    def fail(job):
+        raise error
+
+    job = manager.submit(fail, workers=1, ttl=60, max_queued=10)
+    job.future.result(TIMEOUT)
+
+    assert job.status == JobStatus.FAILED
+    assert job.error is error
+    assert job.encode_json()["error"] == expected
+
+
+def test_job_manager_cancels_queued_and_running_jobs(manager):
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit(blocking, started, release, workers=1, ttl=60, max_queued=10)
+    queued = manager.submit(run_phases, "destruct", workers=1, ttl=60, max_queued=10)
+    assert started.wait(TIMEOUT)
+
+    assert manager.cancel(queued.job_id) is queued
+    assert queued.status == JobStatus.CANCELLED
+    assert manager.cancel(running.job_id) is running
+    # A running job stops at the start of its next phase.
+    assert running.status == JobStatus.RUNNING
+    release.set()
+    running.future.result(TIMEOUT)
+    assert running.status == JobStatus.CANCELLED
+    assert running.result is None
+    assert manager.cancel("unknown") is None
+
+
+def test_job_manager_cancels_job_without_remaining_phases():
+    # Cancelled after it was taken by a worker but before it started.
+    job = Job(ttl=60)
+    job.cancelled.set()
+    JobManager._run(job, run_phases, "destruct")
+    assert job.status == JobStatus.CANCELLED
+    assert job.progress.completed_phases == 0
+
+    # Cancelled after its last phase, so the progress hook cannot stop it.
+    job = Job(ttl=60)
+    JobManager._run(job, lambda job: job.cancelled.set())
+    assert job.status == JobStatus.CANCELLED
+    assert job.result is None
+
+
+def test_job_manager_discards_finished_jobs(manager):
+    kept = manager.submit(run_phases, workers=1, ttl=60, max_queued=10)
+    expired = manager.submit(run_phases, workers=1, ttl=0, max_queued=10)
+    kept.future.result(TIMEOUT)
+    expired.future.result(TIMEOUT)
+
+    assert manager.get(expired.job_id) is None
+    assert manager.cancel(kept.job_id) is kept
+    assert manager.get(kept.job_id) is None
+
+
+def test_job_manager_refuses_jobs_when_queue_is_full(manager):
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit(blocking, started, release, workers=1, ttl=60, max_queued=1)
+    assert started.wait(TIMEOUT)
+    queued = manager.submit(run_phases, "destruct", workers=1, ttl=60, max_queued=1)
+
+    with pytest.raises(JobQueueFullError):
+        manager.submit(run_phases, "construct", workers=1, ttl=60, max_queued=1)
+    release.set()
+    running.future.result(TIMEOUT)
+    queued.future.result(TIMEOUT)
+    job = manager.submit(run_phases, "construct", workers=1, ttl=60, max_queued=1)
+    job.future.result(TIMEOUT)
+    assert job.status == JobStatus.SUCCEEDED
+
+
+def test_job_manager_cancels_jobs_queued_longer_than_ttl(manager):
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit(blocking, started, release, workers=1, ttl=0, max_queued=10)
+    assert started.wait(TIMEOUT)
+    queued = manager.submit(run_phases, "destruct", workers=1, ttl=0, max_queued=10)
+
+    # The running job is kept while it runs, whereas the queued one has waited longer than its time to live.
+    assert manager.get(running.job_id) is running
+    assert manager.get(queued.job_id) is None
+    assert queued.status == JobStatus.CANCELLED
+    assert queued.progress.completed_phases == 0
+    release.set()
+    running.future.result(TIMEOUT)
+    assert running.status == JobStatus.SUCCEEDED
+
+
+def test_job_manager_keeps_expired_job_started_by_worker(manager):
+    # The job has been taken by a worker, which has not changed its status yet.
+    job = Job(ttl=0)
+    job.future = Future()
+    job.future.set_running_or_notify_cancel()
+    manager._jobs[job.job_id] = job
+
+    manager.purge()
+    assert manager.get(job.job_id) is job
+    assert job.cancelled.is_set()
+    assert job.status == JobStatus.QUEUED
+
+
+def test_job_manager_shutdown_cancels_queued_jobs():
+    manager = JobManager()
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit(blocking, started, release, workers=1, ttl=60, max_queued=10)
+    queued = manager.submit(run_phases, "destruct", workers=1, ttl=60, max_queued=10)
+    assert started.wait(TIMEOUT)
+
+    threading.Timer(0.1, release.set).start()
+    manager.shutdown()
+
+    assert queued.status == JobStatus.CANCELLED
+    assert running.status == JobStatus.CANCELLED
+    manager.shutdown()
+
+
+@pytest.mark.parametrize(
+    "error,code,message",
+    [
+        (JobNotFoundError("abc"), "E50009", "Specified job not found or expired: abc"),
+        (JobNotCompletedError("abc", "running"), "E50010", "Specified job has no result because it is running: abc"),
+    ],
+)
+def test_job_errors(capfd, error, code, message):
+    assert error.response_msg == {"code": code, "message": message}
+    assert error.exit_code == 1
+    error.output_stderr()
+    assert capfd.readouterr().err == f"[{code}]{message}\n"
+
+
+@pytest.mark.parametrize(
+    "error,code,message",
+    [
+        (JobQueueFullError(100), "E50012", "Too many jobs are waiting for a worker, at most 100. Retry later."),
+        (
+            JobsUnavailableError(4),
+            "E50013",
+            "Jobs are not available with 4 worker processes, since each process keeps its own jobs. "
+            "Set migration_procedures.workers to 1 to use jobs.",
+        ),
+    ],
+)
+def test_job_server_errors(capfd, error, code, message):
+    assert error.response_msg == {"code": code, "message": message}
+    assert error.exit_code == 3
+    error.output_stderr()
+    assert capfd.readouterr().err == f"[{code}]{message}\n"
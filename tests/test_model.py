@@ -0,0 +1,96 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+import pytest
+from pydantic import ValidationError
+
+from migration_procedure_generator.custom_exception import JsonSchemaError
+from migration_procedure_generator.model import NodeLayout, layouts_digest, parse_layout
+
+
+def node(cpu_id, **devices):
+    return {"device": {"cpu": {"deviceIDs": [cpu_id]}, **{key: {"deviceIDs": ids} for key, ids in devices.items()}}}
+
+
+@pytest.mark.parametrize(
+    "layout,expected",
+    [
+        (
+            {"nodes": [node("c1", Memory=["m1"], GPU=[])], "boundDevices": {"c1": {"MEMORY": ["m1"]}}},
+            {"nodes": [node("c1", memory=["m1"], gpu=[])], "boundDevices": {"c1": {"memory": ["m1"]}}},
+        ),
+        # Properties other than the devices are kept where the schema allows them.
+        (
+            {"nodes": [{}, {"device": {"CPU": {"deviceIDs": ["c1"], "note": 1}}}], "extra": 1},
+            {"nodes": [{}, {"device": {"cpu": {"deviceIDs": ["c1"], "note": 1}}}], "extra": 1},
+        ),
+        # The conversion of the device types has always ignored these properties and bound devices.
+        (
+            {"nodes": [{**node("c1"), "unused": 1}], "boundDevices": {"c1": {}, "c2": [], "": None}},
+            {"nodes": [node("c1")], "boundDevices": {"c1": {}}},
+        ),
+    ],
+)
+def test_parse_layout_success(layout, expected):
+    assert parse_layout(layout) == expected
+    assert NodeLayout(currentLayout=layout, desiredLayout=layout).currentLayout == expected
+
+
+@pytest.mark.parametrize(
+    "layout,message",
+    [
+        ([], "[] is not of type 'object'"),
+        ({"nodes": {}}, "{} is not of type 'array'"),
+        ({"nodes": [node("c1", memory=[1])]}, "1 is not of type 'string'"),
+        ({"nodes": [{"device": {"cpu": {"deviceIDs": []}}}]}, "[] should be non-empty"),
+        ({"nodes": [{"device": {"cpu": {"deviceIDs": ["c1", "c2"]}}}]}, "['c1', 'c2'] is too long"),
+        ({"nodes": [{"device": {"memory": {"deviceIDs": []}}}]}, "'cpu' is a required property"),
+        ({"nodes": [{"unused": 1}]}, "Additional properties are not allowed ('unused' was unexpected)"),
+        ({"nodes": [], "boundDevices": {"": {}}}, "'' does not match any of the regexes: '^(.+)$'"),
+        ({"nodes": [], "boundDevices": []}, "[] is not of type 'object'"),
+        (
+            {"nodes": [], "boundDevices": {"c1": {"network-interface": []}}},
+            "'network-interface' does not match any of the regexes: '^[0-9a-zA-Z]+$'",
+        ),
+    ],
+)
+def test_parse_layout_failure(layout, message):
+    with pytest.raises(JsonSchemaError) as excinfo:
+        parse_layout(layout)
+    assert excinfo.value.message == message
+
+
+def test_parse_layout_failure_when_schema_accepts(mocker):
+    # Should the typed layout ever be stricter than the schema, what it rejected is still reported.
+    mocker.patch("migration_procedure_generator.model.validate_layout")
+    with pytest.raises(JsonSchemaError) as excinfo:
+        parse_layout({"nodes": [{"device": {"memory": {"deviceIDs": []}}}]})
+    assert excinfo.value.message == "Value error, A node must have exactly one cpu device ID"
+
+
+def test_node_layout_failure_when_layout_not_object():
+    # Reported as an invalid request parameter, as before the layouts were typed
+    with pytest.raises(ValidationError) as excinfo:
+        NodeLayout(currentLayout=[], desiredLayout={"nodes": []})
+    assert [(error["type"], error["loc"]) for error in excinfo.value.errors()] == [("dict_type", ("currentLayout",))]
+
+
+def test_layouts_digest():
+    current = {"nodes": [node("c1", memory=["m1", "m2"], gpu=[]), {}]}
+    desired = {"nodes": [node("c1", memory=["m1"])]}
+    assert layouts_digest(current, desired, "abc") == {
+        "hash": "abc",
+        "currentLayout": {"nodes": 2, "devices": 3},
+        "desiredLayout": {"nodes": 1, "devices": 2},
+    }
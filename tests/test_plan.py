@@ -11,10 +11,15 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 #  under the License.
+import threading
+
 import pytest
 
-from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.custom_exception import AvailabilityBudgetError
+from migration_procedure_generator.plan import DependencySet, Plan, Task
+from migration_procedure_generator.schedule import schedule_plan
 from migration_procedure_generator.system import System
+from migration_procedure_generator.verifier import verify_plan
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -148,6 +153,101 @@ class TestTask:
         assert task_boot_cpu1 != task_boot_cpu2
         assert task_boot_cpu1 < task_boot_cpu2
 
+    def test_task_op_id_scope_numbers_tasks_from_one(self):
+        Task(operation="shutdown", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6")
+        with Task.op_id_scope():
+            assert Task(operation="boot", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6").op_id == 1
+            with Task.op_id_scope():
+                assert Task(operation="boot", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6").op_id == 1
+            assert Task(operation="boot", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6").op_id == 2
+        assert Task(operation="boot", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6").op_id == 2
+
+    def test_task_op_id_scope_is_independent_between_threads(self):
+        results = {}
+        barrier = threading.Barrier(2)
+
+        def create_tasks(name):
+            with Task.op_id_scope():
+                op_ids = []
+                for _ in range(100):
+                    op_ids.append(Task(operation="boot", cpu_id=name).op_id)
+                    if len(op_ids) == 50:
+                        barrier.wait()
+                results[name] = op_ids
+
+        threads = [threading.Thread(target=create_tasks, args=(name,)) for name in ("cpu1", "cpu2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results["cpu1"] == list(range(1, 101))
+        assert results["cpu2"] == list(range(1, 101))
+
+    def test_task_reset_op_id(self):
+        Task(operation="shutdown", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6")
+        Task._op_id_lock.acquire()
+        Task.reset_op_id()
+        assert not Task._op_id_lock.locked()
+        assert Task(operation="boot", cpu_id="3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6").op_id == 1
+
+
+class TestDependencySet:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        Task.__index_op_id__ = 0
+
+    def test_dependency_set_success(self):
+        first, second, third = Task("shutdown", "cpu-1"), Task("shutdown", "cpu-2"), Task("shutdown", "cpu-3")
+        dependencies = DependencySet([third, first])
+        dependencies.add(second)
+        dependencies.add(third)
+
+        assert len(dependencies) == 3
+        assert list(dependencies) == [third, first, second]
+        assert dependencies.op_ids() == [1, 2, 3]
+        assert first in dependencies
+        assert "cpu-1" not in dependencies
+        assert repr(dependencies) == "DependencySet([3, 1, 2])"
+
+        copied = dependencies.copy()
+        dependencies.discard(first)
+        dependencies.discard(first)
+
+        assert dependencies == [third, second]
+        assert copied == DependencySet([third, first, second])
+        assert dependencies != DependencySet([second, third])
+        assert dependencies != (third, second)
+        assert first not in dependencies
+
+    def test_dependency_set_large_node_success(self):
+        node = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-1"]},
+                        "memory": {"deviceIDs": [f"memory-{index}" for index in range(512)]},
+                    }
+                }
+            ]
+        }
+        moved = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-1"]}}},
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-2"]},
+                        "memory": {"deviceIDs": [f"memory-{index}" for index in range(512)]},
+                    }
+                },
+            ]
+        }
+
+        plan = Plan.system_update_plan(System.decode_json(node, {}), System.decode_json(moved, {}))
+
+        boot = plan.get_boot_tasks()["cpu-2"]
+        assert len(boot.dependencies) == 512
+        assert boot.encode_json()["dependencies"] == sorted(boot.encode_json()["dependencies"])
+
 
 class TestPlan:
 
@@ -302,6 +402,50 @@ class TestPlan:
             plans.device_slice("895DFB43-68CD-41D6-8996-EAC8D1EA1E3F")[0].device_id
             == "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"
         )
+        assert plans.device_slice(None) == []
+
+    def test_plan_keeps_op_id_order_success(self):
+        tasks = [Task("shutdown", f"cpu-{index}") for index in range(6)]
+
+        plan = Plan([tasks[3], tasks[0]])
+        assert [task.op_id for task in plan.tasks] == [1, 4]
+
+        plan.append(tasks[5])
+        plan.append(tasks[1])
+        assert [task.op_id for task in plan.tasks] == [1, 2, 4, 6]
+
+        plan.extend(Plan([tasks[2], tasks[4]]))
+        assert [task.op_id for task in plan.tasks] == [1, 2, 3, 4, 5, 6]
+
+        plan.extend(Plan([Task("boot", "cpu-0")]))
+        assert [task.op_id for task in plan.tasks] == [1, 2, 3, 4, 5, 6, 7]
+
+    def test_plan_renumber_success(self):
+        shutdown = Task(operation="shutdown", cpu_id="cpu-1")
+        disconnect = Task(operation="disconnect", cpu_id="cpu-1", device_id="dev-1", dependencies=[shutdown])
+        shutdown_other = Task(operation="shutdown", cpu_id="cpu-2")
+        connect = Task("connect", "cpu-2", "dev-1", dependencies=[disconnect, shutdown_other])
+        plan = Plan([shutdown, disconnect, shutdown_other, connect])
+        order = {shutdown.op_id: 0, shutdown_other.op_id: 3, disconnect.op_id: 5, connect.op_id: 9}
+
+        plan.renumber(key=lambda task: order[task.op_id])
+
+        assert plan.tasks == [shutdown, shutdown_other, disconnect, connect]
+        assert [task.op_id for task in plan.tasks] == [1, 2, 3, 4]
+        assert connect.dependencies.op_ids() == [2, 3]
+        assert disconnect in connect.dependencies
+        Plan([]).renumber(key=lambda task: task.op_id)
+
+    def test_plan_device_slices_and_cpu_slices_success(self):
+        shutdown = Task(operation="shutdown", cpu_id="cpu-1")
+        disconnect = Task(operation="disconnect", cpu_id="cpu-1", device_id="dev-1", dependencies=[shutdown])
+        connect = Task(operation="connect", cpu_id="cpu-2", device_id="dev-1")
+        connect_other = Task(operation="connect", cpu_id="cpu-2", device_id="dev-2")
+        boot = Task(operation="boot", cpu_id="cpu-2", dependencies=[connect, connect_other])
+        plan = Plan([shutdown, disconnect, connect, connect_other, boot])
+
+        assert plan.device_slices() == {"dev-1": [disconnect, connect], "dev-2": [connect_other]}
+        assert plan.cpu_slices() == {"cpu-1": [shutdown, disconnect], "cpu-2": [connect, connect_other, boot]}
 
     def test_plan_cpu_slice_success(self):
         new = {
@@ -482,15 +626,15 @@ class TestPlan:
 
         assert plan.tasks[0].encode_json()["dependencies"] == []
         assert plan.tasks[1].encode_json()["dependencies"] == [1]
-        assert plan.tasks[2].encode_json()["dependencies"] == [2, 1]
-        assert plan.tasks[3].encode_json()["dependencies"] == [3, 2]
+        assert plan.tasks[2].encode_json()["dependencies"] == [1, 2]
+        assert plan.tasks[3].encode_json()["dependencies"] == [2, 3]
 
         plan.complete_device_dependencies()
 
         assert plan.tasks[0].encode_json()["dependencies"] == []
         assert plan.tasks[1].encode_json()["dependencies"] == [1]
-        assert plan.tasks[2].encode_json()["dependencies"] == [2, 1, 2]
-        assert plan.tasks[3].encode_json()["dependencies"] == [3, 2]
+        assert plan.tasks[2].encode_json()["dependencies"] == [1, 2]
+        assert plan.tasks[3].encode_json()["dependencies"] == [2, 3]
 
     def test_plan_remove_redundant_success(self):
         prev = {
@@ -515,6 +659,335 @@ class TestPlan:
 
         assert plan.tasks == []
 
+    def test_plan_system_update_plan_without_power_cycles_for_hotplug_devices_success(self):
+        prev = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-a"]}, "memory": {"deviceIDs": ["memory-1"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-b"]}, "storage": {"deviceIDs": ["storage-1"]}}},
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-c"]},
+                        "memory": {"deviceIDs": ["memory-2"]},
+                        "gpu": {"deviceIDs": ["gpu-1"]},
+                    }
+                },
+                {"device": {"cpu": {"deviceIDs": ["cpu-d"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-f"]}, "memory": {"deviceIDs": ["memory-3"]}}},
+            ]
+        }
+        new = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-a"]}}},
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-b"]},
+                        "memory": {"deviceIDs": ["memory-1"]},
+                        "storage": {"deviceIDs": ["storage-1"]},
+                    }
+                },
+                {"device": {"cpu": {"deviceIDs": ["cpu-c"]}}},
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-d"]},
+                        "memory": {"deviceIDs": ["memory-2"]},
+                        "gpu": {"deviceIDs": ["gpu-1"]},
+                    }
+                },
+                {"device": {"cpu": {"deviceIDs": ["cpu-e"]}, "memory": {"deviceIDs": ["memory-3"]}}},
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+
+        plan = Plan.system_update_plan(prev_system, new_system, hotplug_types=["Memory"])
+
+        power_cycles = {(task.operation, task.cpu_id) for task in plan.tasks if task.device_id is None}
+        # cpu-a and cpu-b only exchange memory, cpu-c and cpu-d also a gpu, cpu-f is removed and cpu-e is added.
+        assert power_cycles == {
+            ("shutdown", "cpu-c"),
+            ("boot", "cpu-c"),
+            ("shutdown", "cpu-d"),
+            ("boot", "cpu-d"),
+            ("shutdown", "cpu-f"),
+            ("boot", "cpu-e"),
+        }
+        connect, disconnect = sorted(
+            (task for task in plan.tasks if task.device_id == "memory-1"), key=lambda task: task.operation
+        )
+        assert connect.dependencies == [disconnect]
+        assert disconnect.dependencies == []
+        assert verify_plan(plan, prev_system, new_system, hotplug_types=["memory"]) == []
+
+        Task.__index_op_id__ = 0
+        baseline = Plan.system_update_plan(prev_system, new_system)
+        assert len(baseline.tasks) - len(plan.tasks) == 4
+
+    @staticmethod
+    def max_offline_nodes(plan):
+        index = {task.op_id: slot for slot, tasks in enumerate(schedule_plan(plan, {}, {}).slots) for task in tasks}
+        boot_tasks = plan.get_boot_tasks()
+        windows = [
+            (index[shutdown.op_id], index[boot_tasks[cpu_id].op_id])
+            for cpu_id, shutdown in plan.get_shutdown_tasks().items()
+            if cpu_id in boot_tasks
+        ]
+        return max(sum(1 for start, end in windows if start <= slot <= end) for slot in range(len(index)))
+
+    @pytest.mark.parametrize("max_offline", [1, 2, 3])
+    def test_plan_system_update_plan_with_max_offline_success(self, max_offline):
+        # memory-1 moves from cpu-1 to cpu-2, memory-2 from cpu-2 to cpu-3 and so on. cpu-5 is removed.
+        prev = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": [f"cpu-{node}"]}, "memory": {"deviceIDs": [f"memory-{node}"]}}}
+                for node in range(1, 6)
+            ]
+        }
+        new = {
+            "nodes": [{"device": {"cpu": {"deviceIDs": ["cpu-1"]}}}]
+            + [
+                {"device": {"cpu": {"deviceIDs": [f"cpu-{node}"]}, "memory": {"deviceIDs": [f"memory-{node - 1}"]}}}
+                for node in range(2, 5)
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        baseline = Plan.system_update_plan(prev_system, new_system)
+        assert self.max_offline_nodes(baseline) == 4
+
+        Task.__index_op_id__ = 0
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=max_offline)
+
+        assert self.max_offline_nodes(plan) == max_offline
+        assert verify_plan(plan, prev_system, new_system) == []
+        assert [task.op_id for task in plan.tasks] == list(range(1, len(baseline.tasks) + 1))
+        assert all(depending.op_id < task.op_id for task in plan.tasks for depending in task.dependencies)
+        shutdowns = [task for task in plan.tasks if task.operation == "shutdown"]
+        handovers = [depending for task in shutdowns for depending in task.dependencies]
+        # cpu-5 is only shut down, so it is not counted and is not made to wait.
+        assert len(handovers) == 4 - max_offline
+        assert all(boot.operation == "boot" and boot.cpu_id != "cpu-5" for boot in handovers)
+        assert plan.get_shutdown_tasks()["cpu-5"].dependencies == []
+
+    def test_plan_system_update_plan_with_max_offline_keeps_plan_when_budget_suffices(self):
+        # cpu-3 receives memory from both cpu-1 and cpu-2.
+        prev = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-1"]}, "memory": {"deviceIDs": ["memory-1", "memory-2"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-2"]}, "memory": {"deviceIDs": ["memory-3"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-3"]}}},
+            ]
+        }
+        new = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-1"]}, "memory": {"deviceIDs": ["memory-1"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-2"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-3"]}, "memory": {"deviceIDs": ["memory-2", "memory-3"]}}},
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        baseline = Plan.system_update_plan(prev_system, new_system).encode_json()
+
+        Task.__index_op_id__ = 0
+        assert Plan.system_update_plan(prev_system, new_system, max_offline=3).encode_json() == baseline
+
+    def test_plan_system_update_plan_failure_when_exchanging_nodes_exceed_max_offline(self, capfd):
+        # cpu-1 and cpu-2 exchange their memory, so both have to be offline at the same time.
+        prev = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-1"]}, "memory": {"deviceIDs": ["memory-1"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-2"]}, "memory": {"deviceIDs": ["memory-2"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-3"]}, "memory": {"deviceIDs": ["memory-3"]}}},
+            ]
+        }
+        new = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": ["cpu-1"]}, "memory": {"deviceIDs": ["memory-2"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-2"]}, "memory": {"deviceIDs": ["memory-1"]}}},
+                {"device": {"cpu": {"deviceIDs": ["cpu-3"]}, "memory": {"deviceIDs": ["memory-3", "memory-4"]}}},
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=2)
+        assert self.max_offline_nodes(plan) == 2
+
+        Task.__index_op_id__ = 0
+        with pytest.raises(AvailabilityBudgetError) as excinfo:
+            Plan.system_update_plan(prev_system, new_system, max_offline=1)
+        message = (
+            "Migration procedure cannot keep at most 1 nodes offline at the same time. "
+            "No order was found for the 2 nodes exchanging devices: cpu-1, cpu-2"
+        )
+        assert excinfo.value.response_msg == {"code": "E50008", "message": message}
+        assert excinfo.value.exit_code == 1
+        excinfo.value.output_stderr()
+        assert capfd.readouterr().err == f"[E50008]{message}\n"
+
+    def test_availability_budget_error_lists_first_cpus(self):
+        error = AvailabilityBudgetError(2, [f"cpu-{node}" for node in range(1000)])
+        assert error.message == (
+            "Migration procedure cannot keep at most 2 nodes offline at the same time. "
+            "No order was found for the 1000 nodes exchanging devices: cpu-0, cpu-1, cpu-2, cpu-3, cpu-4 and 995 more"
+        )
+
+    @pytest.mark.parametrize("max_offline", [2, 3])
+    def test_plan_system_update_plan_with_max_offline_rotates_devices_in_cycle(self, max_offline):
+        # memory-0 moves from c0 to c1, memory-1 from c1 to c2 and memory-2 from c2 to c0.
+        prev = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": [f"c{node}"]}, "memory": {"deviceIDs": [f"memory-{node}"]}}}
+                for node in range(3)
+            ]
+        }
+        new = {
+            "nodes": [
+                {"device": {"cpu": {"deviceIDs": [f"c{node}"]}, "memory": {"deviceIDs": [f"memory-{(node - 1) % 3}"]}}}
+                for node in range(3)
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=max_offline)
+
+        assert self.max_offline_nodes(plan) == max_offline
+        assert verify_plan(plan, prev_system, new_system) == []
+
+        Task.__index_op_id__ = 0
+        with pytest.raises(AvailabilityBudgetError) as excinfo:
+            Plan.system_update_plan(prev_system, new_system, max_offline=1)
+        assert excinfo.value.args == (1, ["c0", "c1", "c2"])
+
+    @pytest.mark.parametrize(
+        "moves",
+        [
+            # c1 and c2 exchange memory, and c2 also receives memory from c0, which goes offline first.
+            [(1, 2), (0, 2), (2, 1)],
+            # c0, c1 and c2 rotate memory, and c2 also exchanges memory with c3.
+            [(0, 1), (2, 3), (3, 2), (1, 2), (2, 0)],
+        ],
+    )
+    def test_plan_system_update_plan_with_max_offline_orders_nodes_of_cycle(self, moves):
+        # A memory device moves from c{source} to c{destination} for each move.
+        nodes = range(max(max(move) for move in moves) + 1)
+        prev = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{src}-{dst}" for src, dst in moves if src == node]},
+                    }
+                }
+                for node in nodes
+            ]
+        }
+        new = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{src}-{dst}" for src, dst in moves if dst == node]},
+                    }
+                }
+                for node in nodes
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=2)
+
+        assert self.max_offline_nodes(plan) == 2
+        assert verify_plan(plan, prev_system, new_system) == []
+
+    def test_plan_system_update_plan_with_max_offline_searches_order_of_shutdowns(self, mocker):
+        # c2 receives memory from c0, c1 and c3, c3 from c2 and c0 from c3. Going through the cycle from its node
+        # with the fewest donors keeps three nodes offline, while c3 going offline before c0 keeps two.
+        def layout(memory_ids):
+            return {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_id]}, "memory": {"deviceIDs": device_ids}}}
+                    for cpu_id, device_ids in memory_ids.items()
+                ]
+            }
+
+        prev = layout({"c0": ["memory-0"], "c1": ["memory-1"], "c2": ["memory-2"], "c3": ["memory-3", "memory-4"]})
+        new = layout({"c0": ["memory-3"], "c1": [], "c2": ["memory-0", "memory-1", "memory-4"], "c3": ["memory-2"]})
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=2)
+
+        assert self.max_offline_nodes(plan) == 2
+        assert verify_plan(plan, prev_system, new_system) == []
+        assert all(depending.op_id < task.op_id for task in plan.tasks for depending in task.dependencies)
+
+        Task.__index_op_id__ = 0
+        mocker.patch("migration_procedure_generator.plan.OFFLINE_ORDER_SEARCH_LIMIT", 0)
+        with pytest.raises(AvailabilityBudgetError) as excinfo:
+            Plan.system_update_plan(prev_system, new_system, max_offline=2)
+        assert excinfo.value.args == (2, ["c0", "c2", "c3"])
+
+    def test_plan_system_update_plan_failure_when_cycle_needs_more_nodes_offline(self):
+        # Every node gives memory to both other nodes, so two of them wait for the devices of the third.
+        prev = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{node}-{(node + 1) % 3}", f"memory-{node}-{(node + 2) % 3}"]},
+                    }
+                }
+                for node in range(3)
+            ]
+        }
+        new = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{(node + 1) % 3}-{node}", f"memory-{(node + 2) % 3}-{node}"]},
+                    }
+                }
+                for node in range(3)
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=3)
+        assert self.max_offline_nodes(plan) == 3
+
+        Task.__index_op_id__ = 0
+        with pytest.raises(AvailabilityBudgetError) as excinfo:
+            Plan.system_update_plan(prev_system, new_system, max_offline=2)
+        assert excinfo.value.args == (2, ["c0", "c1", "c2"])
+
+    def test_plan_system_update_plan_failure_when_no_order_of_shutdowns_fits(self):
+        # c0 and c1 exchange memory and both receive memory from c2, which receives memory from c3, which receives
+        # memory from c0 and c1. Whichever node goes offline first, three nodes end up offline at the same time.
+        moves = [(1, 0), (2, 0), (0, 1), (2, 1), (3, 2), (0, 3), (1, 3)]
+        prev = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{src}-{dst}" for src, dst in moves if src == node]},
+                    }
+                }
+                for node in range(4)
+            ]
+        }
+        new = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": [f"c{node}"]},
+                        "memory": {"deviceIDs": [f"memory-{src}-{dst}" for src, dst in moves if dst == node]},
+                    }
+                }
+                for node in range(4)
+            ]
+        }
+        prev_system, new_system = System.decode_json(prev, {}), System.decode_json(new, {})
+        plan = Plan.system_update_plan(prev_system, new_system, max_offline=3)
+        assert self.max_offline_nodes(plan) == 3
+        assert verify_plan(plan, prev_system, new_system) == []
+
+        Task.__index_op_id__ = 0
+        with pytest.raises(AvailabilityBudgetError) as excinfo:
+            Plan.system_update_plan(prev_system, new_system, max_offline=2)
+        assert excinfo.value.args == (2, ["c0", "c1", "c2", "c3"])
+
     def test_plan_remove_indirect_dependencies_success(self):
         prev = {
             "nodes": [
@@ -750,7 +1223,7 @@ class TestPlan:
                     {
                         "operationID": 5,
                         "operation": "boot",
-                        "dependencies": [3, 4, 2],
+                        "dependencies": [2, 3, 4],
                         "targetDeviceID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                     },
                 ],
@@ -1011,14 +1484,14 @@ class TestPlan:
                     {
                         "operationID": 5,
                         "operation": "connect",
-                        "dependencies": [4, 1],
+                        "dependencies": [1, 4],
                         "targetCPUID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                         "targetDeviceID": "5DFB4893-C16D-4968-89D6-8D1EAECEA31F",
                     },
                     {
                         "operationID": 6,
                         "operation": "boot",
-                        "dependencies": [5, 2],
+                        "dependencies": [2, 5],
                         "targetDeviceID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                     },
                     {
@@ -1031,7 +1504,7 @@ class TestPlan:
                     {
                         "operationID": 8,
                         "operation": "boot",
-                        "dependencies": [7, 4],
+                        "dependencies": [4, 7],
                         "targetDeviceID": "EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA",
                     },
                 ],
@@ -1157,14 +1630,14 @@ class TestPlan:
                     {
                         "operationID": 9,
                         "operation": "connect",
-                        "dependencies": [4, 1],
+                        "dependencies": [1, 4],
                         "targetCPUID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                         "targetDeviceID": "5DFB4893-C16D-4968-89D6-8D1EAECEA31F",
                     },
                     {
                         "operationID": 10,
                         "operation": "boot",
-                        "dependencies": [9, 2],
+                        "dependencies": [2, 9],
                         "targetDeviceID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                     },
                     {
@@ -1177,7 +1650,7 @@ class TestPlan:
                     {
                         "operationID": 12,
                         "operation": "boot",
-                        "dependencies": [11, 4],
+                        "dependencies": [4, 11],
                         "targetDeviceID": "EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA",
                     },
                 ],
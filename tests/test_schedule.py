@@ -0,0 +1,162 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+
+from collections import Counter
+
+import pytest
+
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.schedule import Schedule, schedule_plan
+from migration_procedure_generator.system import System, device_types
+
+CURRENT = {
+    "nodes": [
+        {
+            "device": {
+                "cpu": {"deviceIDs": ["cpu-1"]},
+                "memory": {"deviceIDs": ["memory-1", "memory-2"]},
+                "gpu": {"deviceIDs": ["gpu-1", "gpu-2"]},
+            }
+        },
+        {"device": {"cpu": {"deviceIDs": ["cpu-2"]}, "storage": {"deviceIDs": ["storage-1"]}}},
+    ]
+}
+DESIRED = {
+    "nodes": [
+        {"device": {"cpu": {"deviceIDs": ["cpu-1"]}, "storage": {"deviceIDs": ["storage-1"]}}},
+        {
+            "device": {
+                "cpu": {"deviceIDs": ["cpu-2"]},
+                "memory": {"deviceIDs": ["memory-1", "memory-2"]},
+                "gpu": {"deviceIDs": ["gpu-1", "gpu-2"]},
+            }
+        },
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def initializetask():
+    Task.__index_op_id__ = 0
+
+
+@pytest.fixture
+def systems():
+    return System.decode_json(CURRENT, {}), System.decode_json(DESIRED, {})
+
+
+@pytest.fixture
+def plan(systems):
+    return Plan.system_update_plan(*systems)
+
+
+def slot_index(schedule):
+    return {task.op_id: index for index, slot in enumerate(schedule.slots) for task in slot}
+
+
+def assert_dependencies_respected(plan, schedule):
+    index = slot_index(schedule)
+    assert sorted(index) == [task.op_id for task in plan.tasks]
+    for task in plan.tasks:
+        assert all(index[depending.op_id] < index[task.op_id] for depending in task.dependencies)
+
+
+def test_schedule_plan_without_caps_success(systems, plan):
+    schedule = schedule_plan(plan, device_types(*systems), {})
+
+    assert_dependencies_respected(plan, schedule)
+    # Without caps every operation starts as soon as its dependencies have completed.
+    assert [[task.operation for task in slot] for slot in schedule.slots] == [
+        ["shutdown", "shutdown"],
+        ["disconnect"] * 5,
+        ["connect"] * 5,
+        ["boot", "boot"],
+    ]
+
+
+@pytest.mark.parametrize(
+    "caps,resource,limit",
+    [
+        ({"fabric": 2}, lambda task, types: task.operation in ("connect", "disconnect"), 2),
+        ({"operations": {"connect": 1}}, lambda task, types: task.operation == "connect", 1),
+        ({"operations": {"shutdown": 1}}, lambda task, types: task.operation == "shutdown", 1),
+        ({"device_types": {"GPU": 1}}, lambda task, types: types.get(task.device_id) == "gpu", 1),
+    ],
+)
+def test_schedule_plan_with_caps_success(systems, plan, caps, resource, limit):
+    types = device_types(*systems)
+    schedule = schedule_plan(plan, types, caps)
+
+    assert_dependencies_respected(plan, schedule)
+    for slot in schedule.slots:
+        assert sum(1 for task in slot if resource(task, types)) <= limit
+    assert max(sum(1 for task in slot if resource(task, types)) for slot in schedule.slots) == limit
+
+
+def test_schedule_plan_starts_the_critical_path_first():
+    # cpu-1 has a chain of three operations behind its shutdown, cpu-2 only one.
+    shutdown_short = Task("shutdown", "cpu-2")
+    shutdown_long = Task("shutdown", "cpu-1")
+    disconnect = Task("disconnect", "cpu-1", "memory-1", [shutdown_long])
+    connect = Task("connect", "cpu-3", "memory-1", [disconnect])
+    boot = Task("boot", "cpu-2", dependencies=[shutdown_short])
+    plan = Plan([shutdown_short, shutdown_long, disconnect, connect, boot])
+
+    schedule = schedule_plan(plan, {}, {"operations": {"shutdown": 1}})
+
+    assert [[task.op_id for task in slot] for slot in schedule.slots] == [[2], [1, 3], [4, 5]]
+
+
+def test_schedule_keeps_within_caps_on_a_large_plan():
+    current = {
+        "nodes": [
+            {
+                "device": {
+                    "cpu": {"deviceIDs": [f"cpu-{node}"]},
+                    "memory": {"deviceIDs": [f"memory-{node}-{index}" for index in range(8)]},
+                    "gpu": {"deviceIDs": [f"gpu-{node}-{index}" for index in range(4)]},
+                }
+            }
+            for node in range(20)
+        ]
+    }
+    desired = {
+        "nodes": [
+            {"device": {**node["device"], "cpu": {"deviceIDs": [f"cpu-{(index + 1) % 20}"]}}}
+            for index, node in enumerate(current["nodes"])
+        ]
+    }
+    prev, new = System.decode_json(current, {}), System.decode_json(desired, {})
+    plan = Plan.system_update_plan(prev, new)
+    types = device_types(prev, new)
+
+    schedule = schedule_plan(plan, types, {"fabric": 16, "device_types": {"gpu": 3}})
+
+    assert_dependencies_respected(plan, schedule)
+    for slot in schedule.slots:
+        kinds = Counter(types.get(task.device_id) for task in slot if task.device_id)
+        assert sum(kinds.values()) <= 16
+        assert kinds["gpu"] <= 3
+    # The 160 gpu operations need at least 54 slots at 3 per slot, plus the shutdown and the boot slots.
+    assert len(schedule.slots) == 56
+
+
+def test_schedule_encode_json_success():
+    shutdown = Task("shutdown", "cpu-1")
+    disconnect = Task("disconnect", "cpu-1", "memory-1", [shutdown])
+    boot = Task("boot", "cpu-2")
+    schedule = Schedule([[shutdown, boot], [disconnect]])
+
+    assert schedule.order == [shutdown, boot, disconnect]
+    assert schedule.encode_json() == {"slots": [[1, 3], [2]], "order": [1, 3, 2]}
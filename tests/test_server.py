@@ -11,14 +11,26 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 #  under the License.
+import gzip
 import json
+import os
+import sys
+import threading
+import time
 
 import pytest
 from fastapi.testclient import TestClient
 
-from migration_procedure_generator.custom_exception import SettingFileValidationError, LogSettingFileValidationError
+from migration_procedure_generator.encoding import BINARY_MEDIA_TYPE, decode_binary
+from migration_procedure_generator.health import Readiness
+from migration_procedure_generator.custom_exception import (
+    JobQueueFullError,
+    LogSettingFileValidationError,
+    SettingFileValidationError,
+)
 from migration_procedure_generator.plan import Task
-from migration_procedure_generator.server import app, main
+from migration_procedure_generator import server
+from migration_procedure_generator.server import APP_IMPORT_STRING, JOBS_URL, app, job_manager, main, request_coalescer
 from migration_procedure_generator.setting import MigrationConfigReader, MigrationLogConfigReader
 
 client = TestClient(app)
@@ -273,14 +285,14 @@ class TestCreateMigrationProcedure:
                     {
                         "operationID": 5,
                         "operation": "connect",
-                        "dependencies": [4, 1],
+                        "dependencies": [1, 4],
                         "targetCPUID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                         "targetDeviceID": "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
                     },
                     {
                         "operationID": 6,
                         "operation": "boot",
-                        "dependencies": [5, 2],
+                        "dependencies": [2, 5],
                         "targetDeviceID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                     },
                     {
@@ -293,7 +305,7 @@ class TestCreateMigrationProcedure:
                     {
                         "operationID": 8,
                         "operation": "boot",
-                        "dependencies": [7, 4],
+                        "dependencies": [4, 7],
                         "targetDeviceID": "EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA",
                     },
                 ],
@@ -408,14 +420,14 @@ class TestCreateMigrationProcedure:
                     {
                         "operationID": 7,
                         "operation": "connect",
-                        "dependencies": [6, 3],
+                        "dependencies": [3, 6],
                         "targetCPUID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                         "targetDeviceID": "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
                     },
                     {
                         "operationID": 8,
                         "operation": "boot",
-                        "dependencies": [7, 4],
+                        "dependencies": [4, 7],
                         "targetDeviceID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
                     },
                     {
@@ -428,7 +440,7 @@ class TestCreateMigrationProcedure:
                     {
                         "operationID": 10,
                         "operation": "boot",
-                        "dependencies": [9, 6],
+                        "dependencies": [6, 9],
                         "targetDeviceID": "EBA3E4EB-5BDD-46DA-8C8A-272F8D62C8FA",
                     },
                     {
@@ -795,7 +807,7 @@ class TestCreateMigrationProcedure:
                     {
                         "operationID": 6,
                         "operation": "boot",
-                        "dependencies": [5, 3],
+                        "dependencies": [3, 5],
                         "targetDeviceID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
                     },
                 ],
@@ -2154,8 +2166,666 @@ class TestCreateMigrationProcedure:
 
         assert response.status_code == 200
 
+    def test_create_migration_procedure_success_when_profiling_is_enabled(self, mocker, tmp_path):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "profiling_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"interval": 1, "directory": str(tmp_path)},
+        )
+        params = {
+            "currentLayout": {"nodes": []},
+            "desiredLayout": {"nodes": [{"device": {"cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]}}}]},
+        }
+        response = client.post(BASEURL + "migration-procedures", json=params)
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "operationID": 1,
+                "operation": "boot",
+                "dependencies": [],
+                "targetDeviceID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+            }
+        ]
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_create_migration_procedure_success_when_binary_is_accepted(self):
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {
+                        "device": {
+                            "cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]},
+                            "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                        }
+                    }
+                ]
+            },
+            "desiredLayout": {"nodes": [{"device": {"cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]}}}]},
+        }
+        json_response = client.post(BASEURL + "migration-procedures", json=params)
+        binary_response = client.post(
+            BASEURL + "migration-procedures", json=params, headers={"Accept": BINARY_MEDIA_TYPE}
+        )
+        assert binary_response.status_code == 200
+        assert binary_response.headers["content-type"] == BINARY_MEDIA_TYPE
+        assert binary_response.headers["x-content-type-options"] == "nosniff"
+        assert json_response.headers["content-type"] == "application/json; charset=utf-8"
+        assert decode_binary(binary_response.content) == json_response.json()
+        assert json_response.json() == [
+            {
+                "operationID": 1,
+                "operation": "shutdown",
+                "dependencies": [],
+                "targetDeviceID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+            },
+            {
+                "operationID": 2,
+                "operation": "disconnect",
+                "dependencies": [1],
+                "targetCPUID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+                "targetDeviceID": "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
+            },
+            {
+                "operationID": 3,
+                "operation": "boot",
+                "dependencies": [2],
+                "targetDeviceID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+            },
+        ]
+
+    @pytest.mark.parametrize(
+        "request_types,config_types",
+        [
+            (["memory"], []),
+            (None, ["memory"]),
+        ],
+    )
+    def test_create_migration_procedure_success_when_devices_are_hotplug(self, mocker, request_types, config_types):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "hotplug_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"device_types": config_types},
+        )
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {
+                        "device": {
+                            "cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]},
+                            "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                        }
+                    },
+                    {"device": {"cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]}}},
+                ]
+            },
+            "desiredLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]}}},
+                    {
+                        "device": {
+                            "cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]},
+                            "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                        }
+                    },
+                ]
+            },
+        }
+        if request_types is not None:
+            params["hotplugDeviceTypes"] = request_types
+        response = client.post(BASEURL + "migration-procedures", json=params)
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "operationID": 2,
+                "operation": "disconnect",
+                "dependencies": [],
+                "targetCPUID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+                "targetDeviceID": "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
+            },
+            {
+                "operationID": 5,
+                "operation": "connect",
+                "dependencies": [2],
+                "targetCPUID": "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6",
+                "targetDeviceID": "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
+            },
+        ]
+
+    @pytest.mark.parametrize("accept", ["application/json", BINARY_MEDIA_TYPE])
+    def test_create_migration_procedure_success_when_schedule_is_requested(self, mocker, accept):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "scheduling_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"fabric": 1},
+        )
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {
+                        "device": {
+                            "cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]},
+                            "memory": {
+                                "deviceIDs": [
+                                    "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F",
+                                    "C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F",
+                                ]
+                            },
+                        }
+                    }
+                ]
+            },
+            "desiredLayout": {"nodes": [{"device": {"cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]}}}]},
+        }
+        response = client.post(
+            BASEURL + "migration-procedures", params={"schedule": "true"}, json=params, headers={"Accept": accept}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json; charset=utf-8"
+        assert [task["operationID"] for task in response.json()["procedures"]] == [1, 2, 3, 4]
+        assert response.json()["schedule"] == {"slots": [[1], [2], [3], [4]], "order": [1, 2, 3, 4]}
+
+    @pytest.mark.parametrize("accept", ["application/json", BINARY_MEDIA_TYPE])
+    def test_create_migration_procedure_success_when_downtime_optimization_is_requested(self, mocker, accept):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "durations_config",
+            new_callable=mocker.PropertyMock,
+            return_value={},
+        )
+        cpu_1, cpu_2 = "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"
+        memory_1, memory_2 = "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F", "C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F"
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}, "memory": {"deviceIDs": [memory_1, memory_2]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}}},
+                ]
+            },
+            "desiredLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}, "memory": {"deviceIDs": [memory_1]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}, "memory": {"deviceIDs": [memory_2]}}},
+                ]
+            },
+        }
+        response = client.post(
+            BASEURL + "migration-procedures",
+            params={"optimize": "downtime"},
+            json=params,
+            headers={"Accept": accept},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json; charset=utf-8"
+        result = response.json()
+        # The shutdown of cpu-2 is delayed until the memory it receives has been disconnected from cpu-1, and waits
+        # for the shutdown of cpu-1 so that it is also delayed when operations start as soon as they can.
+        assert [(task["operationID"], task["operation"], task["dependencies"]) for task in result["procedures"]] == [
+            (1, "shutdown", []),
+            (2, "disconnect", [1]),
+            (3, "shutdown", [1]),
+            (4, "boot", [2]),
+            (5, "connect", [2, 3]),
+            (6, "boot", [5]),
+        ]
+        assert result["downtime"] == {
+            "starts": [
+                {"operationID": 1, "start": 0},
+                {"operationID": 2, "start": 1},
+                {"operationID": 3, "start": 1},
+                {"operationID": 4, "start": 2},
+                {"operationID": 5, "start": 2},
+                {"operationID": 6, "start": 3},
+            ],
+            "nodes": {cpu_1: {"baseline": 3, "optimized": 3}, cpu_2: {"baseline": 4, "optimized": 3}},
+            "total": {"baseline": 7, "optimized": 6},
+        }
+
+    @pytest.mark.parametrize(
+        "max_offline,status_code",
+        [(1, 200), (2, 200), (0, 400)],
+    )
+    def test_create_migration_procedure_with_max_offline(self, max_offline, status_code):
+        cpu_1, cpu_2 = "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"
+        memory = "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}, "memory": {"deviceIDs": [memory]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}}},
+                ]
+            },
+            "desiredLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}, "memory": {"deviceIDs": [memory]}}},
+                ]
+            },
+        }
+        response = client.post(BASEURL + "migration-procedures", params={"max_offline": max_offline}, json=params)
+        assert response.status_code == status_code
+        if status_code != 200:
+            assert response.json()["code"] == "E50001"
+            return
+        procedures = [(task["operation"], task.get("targetCPUID"), task["dependencies"]) for task in response.json()]
+        if max_offline == 1:
+            # cpu-2 goes offline only after cpu-1 has given its memory away and booted again.
+            assert procedures == [
+                ("shutdown", None, []),
+                ("disconnect", cpu_1, [1]),
+                ("boot", None, [2]),
+                ("shutdown", None, [3]),
+                ("connect", cpu_2, [2, 4]),
+                ("boot", None, [5]),
+            ]
+        else:
+            assert response.json() == client.post(BASEURL + "migration-procedures", json=params).json()
+
+    def test_create_migration_procedure_failure_when_max_offline_cannot_be_kept(self):
+        cpu_1, cpu_2 = "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA", "3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"
+        memory_1, memory_2 = "895DFB43-68CD-41D6-8996-EAC8D1EA1E3F", "C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F"
+        params = {
+            "currentLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}, "memory": {"deviceIDs": [memory_1]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}, "memory": {"deviceIDs": [memory_2]}}},
+                ]
+            },
+            "desiredLayout": {
+                "nodes": [
+                    {"device": {"cpu": {"deviceIDs": [cpu_1]}, "memory": {"deviceIDs": [memory_2]}}},
+                    {"device": {"cpu": {"deviceIDs": [cpu_2]}, "memory": {"deviceIDs": [memory_1]}}},
+                ]
+            },
+        }
+        response = client.post(BASEURL + "migration-procedures", params={"max_offline": 1}, json=params)
+        assert response.status_code == 400
+        assert response.json() == {
+            "code": "E50008",
+            "message": "Migration procedure cannot keep at most 1 nodes offline at the same time. "
+            f"No order was found for the 2 nodes exchanging devices: {', '.join(sorted([cpu_1, cpu_2]))}",
+        }
+
+    @pytest.mark.parametrize(
+        "accept_encoding,minimum_size,content_encoding",
+        [
+            ("gzip", 0, "gzip"),
+            ("gzip", 100000, None),
+            ("identity", 0, None),
+        ],
+    )
+    def test_create_migration_procedure_success_when_response_is_compressed(
+        self, mocker, accept_encoding, minimum_size, content_encoding
+    ):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "compression_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"minimum_size": minimum_size, "level": 6},
+        )
+        params = {
+            "currentLayout": {"nodes": []},
+            "desiredLayout": {"nodes": [{"device": {"cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]}}}]},
+        }
+        expected = [
+            {
+                "operationID": 1,
+                "operation": "boot",
+                "dependencies": [],
+                "targetDeviceID": "ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA",
+            }
+        ]
+        with client.stream(
+            "POST", BASEURL + "migration-procedures", json=params, headers={"Accept-Encoding": accept_encoding}
+        ) as response:
+            raw = b"".join(response.iter_raw())
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding") == content_encoding
+        assert response.headers["vary"].startswith("Accept, Accept-Encoding")
+        assert response.headers["content-length"] == str(len(raw))
+        if content_encoding:
+            raw = gzip.decompress(raw)
+        assert json.loads(raw) == expected
+
+
+JOB_LAYOUTS = {
+    "currentLayout": {
+        "nodes": [
+            {
+                "device": {
+                    "cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]},
+                    "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                }
+            },
+            {
+                "device": {
+                    "cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]},
+                    "memory": {"deviceIDs": ["C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F"]},
+                }
+            },
+        ]
+    },
+    "desiredLayout": {
+        "nodes": [
+            {
+                "device": {
+                    "cpu": {"deviceIDs": ["ABA3E4EB-8C5B-E46D-8D62-C272DD8AF8FA"]},
+                    "memory": {"deviceIDs": ["C8993868-AC8D-95D4-6DB4-F1EAE1D61E3F"]},
+                }
+            },
+            {
+                "device": {
+                    "cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]},
+                    "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                }
+            },
+        ]
+    },
+}
+
+
+class TestMigrationProcedureJobs:
+    @staticmethod
+    def submit(**params):
+        response = client.post(JOBS_URL, params=params, json=JOB_LAYOUTS)
+        assert response.status_code == 202
+        job_id = response.json()["jobID"]
+        assert response.headers["location"] == f"{JOBS_URL}/{job_id}"
+        return job_id
+
+    @staticmethod
+    def wait(job_id):
+        job_manager.get(job_id).future.result(10)
+
+    @pytest.mark.parametrize("accept", ["application/json", BINARY_MEDIA_TYPE])
+    def test_migration_procedure_job_success(self, accept):
+        job_id = self.submit()
+        self.wait(job_id)
+
+        status = client.get(f"{JOBS_URL}/{job_id}")
+        assert status.status_code == 200
+        assert status.json() == {
+            "jobID": job_id,
+            "status": "succeeded",
+            "progress": {"phase": "remove_indirect_dependencies", "completedPhases": 6},
+        }
+        result = client.get(f"{JOBS_URL}/{job_id}/result", headers={"Accept": accept})
+        assert result.status_code == 200
+        expected = client.post(BASEURL + "migration-procedures", json=JOB_LAYOUTS).json()
+        if accept == BINARY_MEDIA_TYPE:
+            assert decode_binary(result.content) == expected
+        else:
+            assert result.json() == expected
+
+    def test_migration_procedure_job_success_with_options(self):
+        job_id = self.submit(schedule="true", optimize="downtime", max_offline=2)
+        self.wait(job_id)
+
+        assert client.get(f"{JOBS_URL}/{job_id}").json()["progress"]["completedPhases"] == 9
+        result = client.get(f"{JOBS_URL}/{job_id}/result").json()
+        assert set(result) == {"procedures", "downtime", "schedule"}
+
+    def test_migration_procedure_job_failure_when_plan_fails(self):
+        job_id = self.submit(max_offline=1)
+        self.wait(job_id)
+
+        status = client.get(f"{JOBS_URL}/{job_id}").json()
+        assert status["status"] == "failed"
+        assert status["error"]["code"] == "E50008"
+        result = client.get(f"{JOBS_URL}/{job_id}/result")
+        assert result.status_code == 400
+        assert result.json() == status["error"]
+
+    def test_migration_procedure_job_failure_when_server_fails(self, mocker):
+        mocker.patch("migration_procedure_generator.server._generate_procedures", side_effect=RuntimeError)
+        job_id = self.submit()
+        self.wait(job_id)
+
+        result = client.get(f"{JOBS_URL}/{job_id}/result")
+        assert result.status_code == 500
+        assert result.json() == {"message": "Internal server error."}
+
+    def test_migration_procedure_job_cancel(self, mocker):
+        started, release = threading.Event(), threading.Event()
+
+        def generate(*args):
+            started.set()
+            release.wait(10)
+            return None, {}
+
+        mocker.patch("migration_procedure_generator.server._generate_procedures", side_effect=generate)
+        job_id = self.submit()
+        assert started.wait(10)
+
+        result = client.get(f"{JOBS_URL}/{job_id}/result")
+        assert result.status_code == 409
+        assert result.json() == {
+            "code": "E50010",
+            "message": f"Specified job has no result because it is running: {job_id}",
+        }
+        cancel = client.delete(f"{JOBS_URL}/{job_id}")
+        assert cancel.status_code == 202
+        assert cancel.json()["status"] == "running"
+        release.set()
+        self.wait(job_id)
+        assert client.get(f"{JOBS_URL}/{job_id}").json()["status"] == "cancelled"
+        assert client.get(f"{JOBS_URL}/{job_id}/result").status_code == 409
+
+        discard = client.delete(f"{JOBS_URL}/{job_id}")
+        assert discard.status_code == 200
+        assert discard.json()["status"] == "cancelled"
+        assert client.get(f"{JOBS_URL}/{job_id}").status_code == 404
+
+    @pytest.mark.parametrize(
+        "method,path",
+        [("get", "{url}/{job_id}"), ("get", "{url}/{job_id}/result"), ("delete", "{url}/{job_id}")],
+    )
+    def test_migration_procedure_job_failure_when_job_not_found(self, method, path):
+        response = getattr(client, method)(path.format(url=JOBS_URL, job_id="unknown"))
+        assert response.status_code == 404
+        assert response.json() == {"code": "E50009", "message": "Specified job not found or expired: unknown"}
+
+    def test_migration_procedure_job_failure_when_queue_is_full(self, mocker):
+        mocker.patch.object(server.job_manager, "submit", side_effect=JobQueueFullError(100))
+        response = client.post(JOBS_URL, json=JOB_LAYOUTS)
+        assert response.status_code == 503
+        assert response.json() == {
+            "code": "E50012",
+            "message": "Too many jobs are waiting for a worker, at most 100. Retry later.",
+        }
+
+    def test_migration_procedure_job_failure_with_several_worker_processes(self, mocker):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "migration_procedures_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"host": "0.0.0.0", "port": 8003, "workers": 4},
+        )
+        submit = mocker.spy(server.job_manager, "submit")
+        response = client.post(JOBS_URL, json=JOB_LAYOUTS)
+        assert response.status_code == 501
+        assert response.json()["code"] == "E50013"
+        submit.assert_not_called()
+
+    def test_migration_procedure_job_stopped_with_application(self):
+        with TestClient(app) as local_client:
+            response = local_client.post(JOBS_URL, json=JOB_LAYOUTS)
+            assert response.status_code == 202
+        assert job_manager.get(response.json()["jobID"]).status in ("succeeded", "cancelled")
+
+
+class TestRequestCoalescing:
+    def test_identical_concurrent_requests_share_computation(self, mocker):
+        started, release = threading.Event(), threading.Event()
+        generate = server._generate_procedures
+
+        def blocking_generate(*args):
+            started.set()
+            release.wait(10)
+            return generate(*args)
+
+        spy = mocker.patch.object(server, "_generate_procedures", side_effect=blocking_generate)
+        before = client.get(BASEURL + "metrics").json()["coalescing"]
+        responses = [None] * 3
+
+        def post(index, layouts):
+            responses[index] = client.post(BASEURL + "migration-procedures", json=layouts)
+
+        # The same layouts with the keys in another order are identical requests.
+        reordered = {key: JOB_LAYOUTS[key] for key in reversed(JOB_LAYOUTS)}
+        threads = [
+            threading.Thread(target=post, args=(index, layouts))
+            for index, layouts in enumerate([JOB_LAYOUTS, JOB_LAYOUTS, reordered])
+        ]
+        threads[0].start()
+        assert started.wait(10)
+        for thread in threads[1:]:
+            thread.start()
+        while request_coalescer.coalesced < before["coalesced"] + 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        assert spy.call_count == 1
+        assert all(response.status_code == 200 for response in responses)
+        assert responses[1].json() == responses[0].json() == responses[2].json()
+        metrics = client.get(BASEURL + "metrics")
+        assert metrics.status_code == 200
+        assert metrics.json()["coalescing"] == {
+            "requests": before["requests"] + 3,
+            "computations": before["computations"] + 1,
+            "coalesced": before["coalesced"] + 2,
+            "inFlight": 0,
+        }
+
+    def test_requests_with_different_options_are_not_coalesced(self):
+        before = request_coalescer.encode_json()
+        for params in [{}, {"schedule": "true"}]:
+            response = client.post(BASEURL + "migration-procedures", params=params, json=JOB_LAYOUTS)
+            assert response.status_code == 200
+        after = request_coalescer.encode_json()
+        assert after["computations"] - before["computations"] == 2
+        assert after["coalesced"] == before["coalesced"]
+
+
+class TestLayoutApplySubmission:
+    @pytest.fixture
+    def layout_apply(self, mocker, httpserver):
+        httpserver.clear()
+        url = httpserver.url_for("/apply")
+        mocker.patch.object(
+            MigrationConfigReader,
+            "layout_apply_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"url": url, "timeout": 5, "retries": 0},
+        )
+        yield httpserver
+        server.layout_apply_submitter.close()
+
+    def test_create_migration_procedure_success_when_submit_is_requested(self, layout_apply):
+        layout_apply.expect_request("/apply", method="POST").respond_with_json({"applyID": "1"}, status=202)
+        response = client.post(
+            BASEURL + "migration-procedures",
+            params={"submit": "true"},
+            json=JOB_LAYOUTS,
+            headers={"Accept": BINARY_MEDIA_TYPE},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json; charset=utf-8"
+        result = response.json()
+        assert result["layoutApply"] == {
+            "url": layout_apply.url_for("/apply"),
+            "status": 202,
+            "response": {"applyID": "1"},
+        }
+        request, _ = layout_apply.log[0]
+        assert json.loads(request.get_data()) == {"procedures": result["procedures"]}
+
+    def test_create_migration_procedure_failure_when_submission_fails(self, layout_apply):
+        layout_apply.expect_request("/apply", method="POST").respond_with_data("unavailable", status=503)
+        response = client.post(BASEURL + "migration-procedures", params={"submit": "true"}, json=JOB_LAYOUTS)
+        assert response.status_code == 502
+        assert response.json() == {
+            "code": "E50011",
+            "message": "Failed to submit the migration procedure to layout apply at "
+            f"{layout_apply.url_for('/apply')}: status 503 unavailable",
+        }
+
+    def test_create_migration_procedure_failure_when_layout_apply_is_not_configured(self, mocker):
+        generate = mocker.spy(server, "_generate_procedures")
+        response = client.post(BASEURL + "migration-procedures", params={"submit": "true"}, json=JOB_LAYOUTS)
+        assert response.status_code == 500
+        assert response.json()["code"] == "E50005"
+        generate.assert_not_called()
+
+    def test_migration_procedure_job_failure_when_layout_apply_is_not_configured(self, mocker):
+        submit = mocker.spy(server.job_manager, "submit")
+        response = client.post(JOBS_URL, params={"submit": "true"}, json=JOB_LAYOUTS)
+        assert response.status_code == 500
+        assert response.json()["code"] == "E50005"
+        submit.assert_not_called()
+
+    def test_migration_procedure_job_success_when_submit_is_requested(self, layout_apply):
+        layout_apply.expect_request("/apply", method="POST").respond_with_json({})
+        job_id = TestMigrationProcedureJobs.submit(submit="true", schedule="true")
+        TestMigrationProcedureJobs.wait(job_id)
+
+        result = client.get(f"{JOBS_URL}/{job_id}/result").json()
+        assert set(result) == {"procedures", "schedule", "layoutApply"}
+        assert result["layoutApply"]["status"] == 200
+
+    def test_migration_procedure_job_failure_when_submission_fails(self, layout_apply):
+        layout_apply.expect_request("/apply", method="POST").respond_with_data("unavailable", status=503)
+        job_id = TestMigrationProcedureJobs.submit(submit="true")
+        TestMigrationProcedureJobs.wait(job_id)
+
+        result = client.get(f"{JOBS_URL}/{job_id}/result")
+        assert result.status_code == 502
+        assert result.json()["code"] == "E50011"
+
+
+class TestHealth:
+    def test_liveness_success(self):
+        response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_readiness_after_warm_up_success(self, mocker):
+        mocker.patch.object(server, "readiness", Readiness())
+        generate = mocker.spy(server, "_generate_procedures")
+        # Entering the client runs the startup of the application, which starts the warm-up.
+        with TestClient(app) as started:
+            assert server.readiness.ready.wait(10)
+            response = started.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+        assert generate.call_count == 1
+
+    def test_readiness_while_warming_up(self, mocker):
+        mocker.patch.object(server, "readiness", Readiness())
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "warming up"}
+
+    def test_readiness_after_failed_warm_up(self, mocker):
+        mocker.patch.object(server, "readiness", Readiness())
+        mocker.patch("yaml.safe_load").return_value = {}
+        with TestClient(app):
+            server.readiness._thread.join(10)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed"
+        assert response.json()["error"]["code"] == "E50005"
+
 
 class TestMain:
+    @pytest.fixture(autouse=True)
+    def argv(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["server.py"])
+
     def test_main_failure_when_load_config_file(self, mocker, capfd):
         mocker.patch(
             "migration_procedure_generator.server.MigrationConfigReader",
@@ -2172,3 +2842,35 @@ class TestMain:
         main()
 
         assert mockup.call_count == 1
+
+    @pytest.mark.parametrize(
+        "server_config,target",
+        [
+            ({"host": "0.0.0.0", "port": 8003}, app),
+            ({"host": "0.0.0.0", "port": 8003, "workers": 1}, app),
+            (
+                {
+                    "host": "0.0.0.0",
+                    "port": 8003,
+                    "workers": 4,
+                    "backlog": 4096,
+                    "timeout_keep_alive": 30,
+                    "limit_concurrency": 100,
+                    "uds": "/run/cdim/migration-procedures.sock",
+                },
+                APP_IMPORT_STRING,
+            ),
+        ],
+    )
+    def test_main_success_run_server_with_config(self, mocker, server_config, target):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "migration_procedures_config",
+            new_callable=mocker.PropertyMock,
+            return_value=server_config,
+        )
+        mockup = mocker.patch("migration_procedure_generator.server.uvicorn.run")
+
+        main()
+
+        mockup.assert_called_once_with(target, **server_config)
@@ -11,13 +11,27 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 #  under the License.
+import argparse
+import itertools
 import logging
+import os
+from importlib import resources
 
 import pytest
+import yaml
 
-from migration_procedure_generator.setting import MigrationLogConfigReader, MigrationConfigReader, initialize_log
+from migration_procedure_generator.setting import (
+    CONFIG_PATH_ENV,
+    LOG_CONFIG_PATH_ENV,
+    MigrationLogConfigReader,
+    MigrationConfigReader,
+    add_config_arguments,
+    apply_config_arguments,
+    initialize_log,
+    log_request,
+)
 from migration_procedure_generator.common.logger import Logger
-from migration_procedure_generator.custom_exception import SettingFileValidationError
+from migration_procedure_generator.custom_exception import LogSettingFileValidationError, SettingFileValidationError
 
 
 class TestMigrationConfigReader:
@@ -488,6 +502,304 @@ class TestMigrationConfigReader:
         with pytest.raises(Exception):
             MigrationLogConfigReader().log_config
 
+    @pytest.mark.parametrize(
+        "queue,valid",
+        [
+            ({"maxsize": 10000, "overflow": "block"}, True),
+            ({"maxsize": 1, "overflow": "drop_new"}, True),
+            ({"maxsize": 100, "overflow": "drop_oldest"}, True),
+            ({"maxsize": 0, "overflow": "block"}, False),
+            ({"maxsize": "100", "overflow": "block"}, False),
+            ({"maxsize": 100, "overflow": "discard"}, False),
+            ({"maxsize": 100}, False),
+            ({"overflow": "block"}, False),
+        ],
+    )
+    def test_log_config_with_queue_settings(self, mocker, queue, valid):
+        config = {
+            "version": 1,
+            "formatters": {"standard": {"format": "%(asctime)s %(levelname)s %(message)s", "datefmt": "%H:%M:%S"}},
+            "handlers": {
+                "file": {
+                    "class": "logging.handlers.RotatingFileHandler",
+                    "formatter": "standard",
+                    "filename": "/var/log/cdim/app_migration_procedures.log",
+                    "maxBytes": 3000000,
+                    "backupCount": 12,
+                }
+            },
+            "root": {"level": "INFO", "handlers": ["file"]},
+            "queue": queue,
+        }
+        mocker.patch("yaml.safe_load").return_value = config
+        if valid:
+            assert MigrationLogConfigReader().log_config["queue"] == queue
+        else:
+            with pytest.raises(LogSettingFileValidationError):
+                MigrationLogConfigReader()
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}},
+                {"interval": 0, "directory": ""},
+            ),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "profiling": {"interval": 10, "directory": "/tmp/profile"},
+                },
+                {"interval": 10, "directory": "/tmp/profile"},
+            ),
+        ],
+    )
+    def test_success_read_profiling_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().profiling_config == expected
+
+    @pytest.mark.parametrize(
+        "profiling",
+        [
+            {"interval": -1, "directory": "/tmp/profile"},
+            {"interval": "10", "directory": "/tmp/profile"},
+            {"interval": 10},
+            {"directory": "/tmp/profile"},
+        ],
+    )
+    def test_failure_when_profiling_config_with_invalid_value(self, mocker, profiling):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "profiling": profiling}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().profiling_config
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}},
+                {"minimum_size": 1024, "level": 6},
+            ),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "compression": {"minimum_size": 0, "level": 9},
+                },
+                {"minimum_size": 0, "level": 9},
+            ),
+        ],
+    )
+    def test_success_read_compression_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().compression_config == expected
+
+    @pytest.mark.parametrize(
+        "compression",
+        [
+            {"minimum_size": -1, "level": 6},
+            {"minimum_size": 1024, "level": 0},
+            {"minimum_size": 1024, "level": 10},
+            {"minimum_size": 1024},
+            {"level": 6},
+        ],
+    )
+    def test_failure_when_compression_config_with_invalid_value(self, mocker, compression):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "compression": compression}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().compression_config
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}},
+                {},
+            ),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "scheduling": {"fabric": 16, "operations": {"connect": 8}, "device_types": {"gpu": 2}},
+                },
+                {"fabric": 16, "operations": {"connect": 8}, "device_types": {"gpu": 2}},
+            ),
+        ],
+    )
+    def test_success_read_scheduling_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().scheduling_config == expected
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            ({"migration_procedures": {"host": "0.0.0.0", "port": 8003}}, {"device_types": []}),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "hotplug": {"device_types": ["memory", "storage"]},
+                },
+                {"device_types": ["memory", "storage"]},
+            ),
+        ],
+    )
+    def test_success_read_hotplug_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().hotplug_config == expected
+
+    @pytest.mark.parametrize("hotplug", [{}, {"device_types": "memory"}, {"device_types": [1]}])
+    def test_failure_when_hotplug_config_with_invalid_value(self, mocker, hotplug):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "hotplug": hotplug}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().hotplug_config
+
+    @pytest.mark.parametrize(
+        "scheduling",
+        [
+            {"fabric": 0},
+            {"fabric": "16"},
+            {"operations": {"reset": 1}},
+            {"operations": {"connect": 0}},
+            {"device_types": {"gpu": -1}},
+            {"switches": 4},
+        ],
+    )
+    def test_failure_when_scheduling_config_with_invalid_value(self, mocker, scheduling):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "scheduling": scheduling}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().scheduling_config
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}},
+                {"workers": 2, "ttl": 600, "max_queued": 100},
+            ),
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "jobs": {"workers": 8, "ttl": 30.5}},
+                {"workers": 8, "ttl": 30.5, "max_queued": 100},
+            ),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "jobs": {"workers": 8, "ttl": 30.5, "max_queued": 5},
+                },
+                {"workers": 8, "ttl": 30.5, "max_queued": 5},
+            ),
+        ],
+    )
+    def test_success_read_jobs_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().jobs_config == expected
+
+    @pytest.mark.parametrize(
+        "jobs",
+        [
+            {"workers": 2},
+            {"workers": 0, "ttl": 600},
+            {"workers": 2, "ttl": 0},
+            {"workers": 2, "ttl": 600, "max_queued": 0},
+        ],
+    )
+    def test_failure_when_jobs_config_with_invalid_value(self, mocker, jobs):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "jobs": jobs}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().jobs_config
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            ({"migration_procedures": {"host": "0.0.0.0", "port": 8003}}, {}),
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "durations": {"boot": 120, "connect": 2.5}},
+                {"boot": 120, "connect": 2.5},
+            ),
+        ],
+    )
+    def test_success_read_durations_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().durations_config == expected
+
+    @pytest.mark.parametrize("durations", [{"boot": 0}, {"boot": "120"}, {"reset": 1}])
+    def test_failure_when_durations_config_with_invalid_value(self, mocker, durations):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "durations": durations}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().durations_config
+
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            ({"migration_procedures": {"host": "0.0.0.0", "port": 8003}}, {"url": "", "timeout": 60, "retries": 0}),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "layout_apply": {"url": "http://localhost:8013/apply", "timeout": 10},
+                },
+                {"url": "http://localhost:8013/apply", "timeout": 10, "retries": 0},
+            ),
+            (
+                {
+                    "migration_procedures": {"host": "0.0.0.0", "port": 8003},
+                    "layout_apply": {"url": "https://apply.example/api", "timeout": 2.5, "retries": 3},
+                },
+                {"url": "https://apply.example/api", "timeout": 2.5, "retries": 3},
+            ),
+        ],
+    )
+    def test_success_read_layout_apply_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().layout_apply_config == expected
+
+    @pytest.mark.parametrize(
+        "layout_apply",
+        [
+            {"url": "http://localhost:8013/apply"},
+            {"timeout": 10},
+            {"url": "localhost:8013/apply", "timeout": 10},
+            {"url": "http://localhost:8013/apply", "timeout": 0},
+            {"url": "http://localhost:8013/apply", "timeout": 10, "retries": -1},
+        ],
+    )
+    def test_failure_when_layout_apply_config_with_invalid_value(self, mocker, layout_apply):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "layout_apply": layout_apply}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().layout_apply_config
+
+    def test_success_read_server_process_settings(self, mocker):
+        server = {
+            "host": "0.0.0.0",
+            "port": 8003,
+            "workers": 4,
+            "backlog": 4096,
+            "timeout_keep_alive": 30,
+            "limit_concurrency": 100,
+            "uds": "/run/cdim/migration-procedures.sock",
+        }
+        mocker.patch("yaml.safe_load").return_value = {"migration_procedures": server}
+        assert MigrationConfigReader().migration_procedures_config == server
+
+    @pytest.mark.parametrize(
+        "update_server",
+        [
+            {"workers": 0},
+            {"workers": "4"},
+            {"backlog": 0},
+            {"timeout_keep_alive": -1},
+            {"limit_concurrency": 0},
+            {"uds": 1},
+        ],
+    )
+    def test_failure_when_server_process_config_with_invalid_value(self, mocker, update_server):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003, **update_server}}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().migration_procedures_config
+
     def test_common_failure_when_migration_procedures_config_with_invalid_value(self, mocker):
         # Case where server configuration contains invalid values
         base_config = {
@@ -500,6 +812,113 @@ class TestMigrationConfigReader:
         with pytest.raises(SettingFileValidationError) as e:
             MigrationConfigReader().migration_procedures_config
 
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            ({"migration_procedures": {"host": "0.0.0.0", "port": 8003}}, {"sample_interval": 0}),
+            (
+                {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "request_log": {"sample_interval": 100}},
+                {"sample_interval": 100},
+            ),
+        ],
+    )
+    def test_success_read_request_log_settings(self, mocker, config, expected):
+        mocker.patch("yaml.safe_load").return_value = config
+        assert MigrationConfigReader().request_log_config == expected
+
+    @pytest.mark.parametrize("request_log", [{}, {"sample_interval": -1}, {"sample_interval": 0.5}])
+    def test_failure_when_request_log_config_with_invalid_value(self, mocker, request_log):
+        config = {"migration_procedures": {"host": "0.0.0.0", "port": 8003}, "request_log": request_log}
+        mocker.patch("yaml.safe_load").return_value = config
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader().request_log_config
+
+
+class TestExternalConfig:
+    @pytest.fixture(autouse=True)
+    def environment(self, mocker):
+        # Restore the environment variables set by apply_config_arguments after each test.
+        mocker.patch.dict(os.environ)
+        os.environ.pop(CONFIG_PATH_ENV, None)
+        os.environ.pop(LOG_CONFIG_PATH_ENV, None)
+
+    def test_config_read_from_external_file_and_reloaded(self, monkeypatch, tmp_path):
+        path = tmp_path / "migrationprocedures_config.yaml"
+        path.write_text("migration_procedures:\n  host: 0.0.0.0\n  port: 8003\n", encoding="utf-8")
+        monkeypatch.setenv(CONFIG_PATH_ENV, str(path))
+        assert MigrationConfigReader().migration_procedures_config == {"host": "0.0.0.0", "port": 8003}
+        assert MigrationConfigReader().request_log_config == {"sample_interval": 0}
+
+        path.write_text(path.read_text(encoding="utf-8") + "request_log:\n  sample_interval: 10\n", encoding="utf-8")
+        assert MigrationConfigReader().request_log_config == {"sample_interval": 10}
+
+        path.write_text("migration_procedures:\n  port: 8003\n", encoding="utf-8")
+        with pytest.raises(SettingFileValidationError):
+            MigrationConfigReader()
+
+    def test_log_config_read_from_external_file(self, monkeypatch, tmp_path):
+        path = tmp_path / "migrationprocedures_log_config.yaml"
+        monkeypatch.setenv(LOG_CONFIG_PATH_ENV, str(path))
+        with pytest.raises(LogSettingFileValidationError):
+            MigrationLogConfigReader()
+
+        config = yaml.safe_load(
+            resources.files("migration_procedure_generator.config")
+            .joinpath("migrationprocedures_log_config.yaml")
+            .read_text(encoding="utf-8")
+        )
+        config["handlers"]["file"]["filename"] = str(tmp_path / "app.log")
+        path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        assert MigrationLogConfigReader().log_config == config
+
+    @pytest.mark.parametrize(
+        "argv,expected",
+        [
+            ([], {}),
+            (
+                ["--config", "app.yaml", "--log-config", "log.yaml"],
+                {CONFIG_PATH_ENV: "app.yaml", LOG_CONFIG_PATH_ENV: "log.yaml"},
+            ),
+        ],
+    )
+    def test_apply_config_arguments(self, tmp_path, monkeypatch, argv, expected):
+        monkeypatch.chdir(tmp_path)
+        parser = argparse.ArgumentParser()
+        add_config_arguments(parser)
+        apply_config_arguments(parser.parse_args(argv))
+        for env_var in (CONFIG_PATH_ENV, LOG_CONFIG_PATH_ENV):
+            expected_path = str(tmp_path / expected[env_var]) if env_var in expected else None
+            assert os.environ.get(env_var) == expected_path
+
+
+class TestLogRequest:
+    @pytest.mark.parametrize(
+        "sample_interval,levels",
+        [
+            (0, [logging.DEBUG] * 4),
+            (1, [logging.INFO] * 4),
+            (2, [logging.DEBUG, logging.INFO, logging.DEBUG, logging.INFO]),
+        ],
+    )
+    def test_log_request_samples_whole_request(self, mocker, sample_interval, levels):
+        mocker.patch.object(
+            MigrationConfigReader,
+            "request_log_config",
+            new_callable=mocker.PropertyMock,
+            return_value={"sample_interval": sample_interval},
+        )
+        mocker.patch("migration_procedure_generator.setting._request_counter", itertools.count(1))
+        logger = mocker.Mock()
+        payload = mocker.Mock(return_value="whole request")
+        for _ in levels:
+            log_request(logger, {"hash": "abc", "currentLayout": {"nodes": 1, "devices": 2}}, payload)
+
+        digests = [call.args[0]() for call in logger.info.call_args_list]
+        assert digests == ['request digest :{"hash":"abc","currentLayout":{"nodes":1,"devices":2}}'] * len(levels)
+        assert [call.args for call in logger.log.call_args_list] == [(level, payload) for level in levels]
+        # The whole request is formatted by the logger, only when its level is enabled.
+        payload.assert_not_called()
+
 
 class TestLogger:
     @pytest.mark.parametrize(
@@ -0,0 +1,231 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import os
+import socket
+
+import pytest
+import requests
+
+from migration_procedure_generator.operation import Operation
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.simulation import (
+    FAILED,
+    SKIPPED,
+    SUCCEEDED,
+    ExecutionReport,
+    OperationClient,
+    OperationFailedError,
+    OperationService,
+    OperationServiceStandIn,
+    PlanExecutor,
+    critical_path_time,
+)
+from migration_procedure_generator.system import System
+
+# NOTICE: Add the dummy server's IP/HOST to the NO_PROXY environment variable.
+os.environ["NO_PROXY"] = "localhost,127.0.0.1"
+
+LATENCY = 0.02
+
+
+@pytest.fixture(scope="function", autouse=True)
+def initializetask():
+    # Initialize so that the test for other things doesn't affect it
+    Task.__index_op_id__ = 0
+
+
+def node(cpu_id, memory_ids):
+    return {"device": {"cpu": {"deviceIDs": [cpu_id]}, "memory": {"deviceIDs": memory_ids}}}
+
+
+@pytest.fixture
+def plan():
+    """Three nodes whose memory devices move to the next node"""
+    prev = System.decode_json({"nodes": [node(f"cpu-{i}", [f"mem-{i}"]) for i in range(3)]}, {})
+    new = System.decode_json({"nodes": [node(f"cpu-{i}", [f"mem-{(i + 1) % 3}"]) for i in range(3)]}, {})
+    return Plan.system_update_plan(prev, new)
+
+
+@pytest.fixture
+def diamond():
+    """shutdown 1 -> disconnect 2 and 3 -> boot 4"""
+    shutdown = Task(Operation.POWEROFF, "cpu-1")
+    disconnects = [Task(Operation.DISCONNECT, "cpu-1", f"mem-{i}", [shutdown]) for i in range(2)]
+    return Plan([shutdown, *disconnects, Task(Operation.POWERON, "cpu-1", dependencies=disconnects)])
+
+
+def service(**kwargs):
+    return OperationService(latencies={operation: LATENCY for operation in Operation}, **kwargs)
+
+
+def assert_dependencies_completed_first(plan, report):
+    for task in plan.tasks:
+        start = report.records[task.op_id][0]
+        if start is not None:
+            assert all(report.records[depending.op_id][1] <= start for depending in task.dependencies)
+
+
+class TestPlanExecutor:
+    @pytest.mark.parametrize("workers", [1, 2, 16])
+    def test_operations_run_after_their_dependencies(self, plan, workers):
+        report = PlanExecutor(service(), workers).run(plan)
+
+        assert report.op_ids(SUCCEEDED) == [task.op_id for task in plan.tasks]
+        assert_dependencies_completed_first(plan, report)
+        assert report.encode_json(timeline=False)["concurrency"]["max"] <= workers
+
+    def test_single_worker_runs_operations_one_by_one(self, plan):
+        report = PlanExecutor(service(), 1).run(plan)
+
+        assert report.encode_json()["concurrency"]["max"] == 1
+        assert report.wall_time >= len(plan.tasks) * LATENCY
+        assert report.critical_path < report.wall_time
+
+    def test_independent_operations_run_concurrently(self, diamond):
+        mock = service()
+        report = PlanExecutor(mock, 4).run(diamond)
+
+        assert mock.max_in_flight == 2
+        assert report.encode_json()["concurrency"]["max"] == 2
+        assert report.critical_path == pytest.approx(3 * LATENCY, rel=0.5)
+        assert report.wall_time < 4 * LATENCY
+
+    def test_dependents_of_failed_operation_are_skipped(self, diamond):
+        report = PlanExecutor(service(failing_op_ids=[2]), 4).run(diamond)
+
+        assert report.op_ids(SUCCEEDED) == [1, 3]
+        assert report.op_ids(FAILED) == [2]
+        assert report.op_ids(SKIPPED) == [4]
+        assert report.records[4] == (None, None, SKIPPED)
+        assert report.encode_json()["operations"] == {"succeeded": 2, "failed": [2], "skipped": [4]}
+
+    def test_failure_rate_by_operation(self, plan):
+        report = PlanExecutor(service(failure_rates={Operation.POWEROFF: 1.0}), 8).run(plan)
+
+        shutdowns = [task.op_id for task in plan.tasks if task.operation == Operation.POWEROFF]
+        after_shutdowns = [
+            task.op_id
+            for task in plan.tasks
+            if any(depending.operation == Operation.POWEROFF for depending in task.get_all_dependencies())
+        ]
+        assert report.op_ids(FAILED) == shutdowns
+        assert report.op_ids(SKIPPED) == after_shutdowns
+
+    def test_unexpected_error_is_raised(self, diamond):
+        def execute(task):
+            raise RuntimeError(task.op_id)
+
+        with pytest.raises(RuntimeError):
+            PlanExecutor(execute).run(diamond)
+
+    def test_empty_plan(self):
+        report = PlanExecutor(service()).run(Plan([]))
+
+        assert report.encode_json() == {
+            "workers": 8,
+            "wallTime": 0.0,
+            "criticalPath": 0.0,
+            "criticalPathUtilization": 1.0,
+            "concurrency": {"max": 0, "mean": 0.0, "timeline": []},
+            "operations": {"succeeded": 0, "failed": [], "skipped": []},
+        }
+
+
+class TestExecutionReport:
+    def test_report_from_records(self, diamond):
+        records = {1: (0.0, 1.0, SUCCEEDED), 2: (1.0, 3.0, SUCCEEDED), 3: (1.0, 2.0, SUCCEEDED), 4: (3.0, 4.0, FAILED)}
+        report = ExecutionReport(2, 5.0, records, diamond)
+
+        assert report.encode_json() == {
+            "workers": 2,
+            "wallTime": 5.0,
+            "criticalPath": 4.0,
+            "criticalPathUtilization": 0.8,
+            "concurrency": {
+                "max": 2,
+                "mean": 1.0,
+                "timeline": [
+                    {"time": 0.0, "running": 1},
+                    {"time": 1.0, "running": 2},
+                    {"time": 2.0, "running": 1},
+                    {"time": 3.0, "running": 1},
+                    {"time": 4.0, "running": 0},
+                ],
+            },
+            "operations": {"succeeded": 3, "failed": [4], "skipped": []},
+        }
+
+    def test_critical_path_time(self, diamond):
+        assert critical_path_time(diamond, {1: 1, 2: 5, 3: 2, 4: 1}) == 7
+        assert critical_path_time(diamond, {2: 5}) == 5
+        assert critical_path_time(Plan([]), {}) == 0
+
+
+class TestOperationService:
+    def test_jitter_within_bounds(self, diamond):
+        report = PlanExecutor(service(jitter=0.5, seed=1), 1).run(diamond)
+
+        assert all(LATENCY * 0.5 <= end - start < LATENCY * 1.5 + 0.01 for start, end, _ in report.records.values())
+
+    def test_failures_reproducible_with_seed(self, plan):
+        def failed(seed):
+            mock = OperationService(
+                latencies={operation: 0 for operation in Operation}, failure_rates={"connect": 0.5}, seed=seed
+            )
+            return PlanExecutor(mock, 1).run(plan).op_ids(FAILED)
+
+        assert failed(3) == failed(3)
+
+    def test_time_scale(self, diamond):
+        mock = OperationService(time_scale=0.01)
+        report = PlanExecutor(mock).run(diamond)
+
+        assert report.critical_path == pytest.approx(0.03, rel=0.5)
+        assert mock.executed == 4
+        assert mock.in_flight == 0
+
+    def test_failed_operation_raises(self, diamond):
+        with pytest.raises(OperationFailedError, match="shutdown 1 failed"):
+            service(failing_op_ids=[1])(diamond.tasks[0])
+
+
+class TestOperationServiceStandIn:
+    def test_executor_runs_operations_through_stand_in(self, plan):
+        mock = service(failing_op_ids=[plan.tasks[0].op_id])
+        with OperationServiceStandIn(mock) as stand_in:
+            client = OperationClient(stand_in.url, connections=4, timeout=5)
+            report = PlanExecutor(client, 4).run(plan)
+            client.close()
+
+        assert mock.executed == len(report.op_ids(SUCCEEDED)) + 1
+        assert report.op_ids(FAILED) == [plan.tasks[0].op_id]
+        assert report.op_ids(SKIPPED)
+        assert_dependencies_completed_first(plan, report)
+
+    def test_stand_in_responds_not_found_to_unknown_path(self):
+        with OperationServiceStandIn(service()) as stand_in:
+            response = requests.post(stand_in.url + "/unknown", json={}, timeout=5)
+
+        assert response.status_code == 404
+        assert response.json() == {"message": "Not found: /operations/unknown"}
+
+    def test_client_failure_when_service_is_not_reachable(self, diamond):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        client = OperationClient(f"http://127.0.0.1:{port}/operations", timeout=1)
+
+        with pytest.raises(OperationFailedError):
+            client(diamond.tasks[0])
+        client.close()
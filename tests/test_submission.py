@@ -0,0 +1,170 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import json
+import os
+import socket
+import time
+
+import pytest
+from werkzeug import Response
+
+from migration_procedure_generator.custom_exception import LayoutApplyError, SettingFileValidationError
+from migration_procedure_generator.exitcode import ExitCode
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.setting import MigrationConfigReader
+from migration_procedure_generator.submission import LayoutApplyClient, LayoutApplySubmitter
+from migration_procedure_generator.system import System
+
+# NOTICE: Add the dummy server's IP/HOST to the NO_PROXY environment variable.
+os.environ["NO_PROXY"] = "localhost"
+
+
+@pytest.fixture(scope="function", autouse=True)
+def initializetask():
+    # Initialize so that the test for other things doesn't affect it
+    Task.__index_op_id__ = 0
+
+
+@pytest.fixture
+def plan():
+    def node(cpu_id, memory_ids):
+        return {"device": {"cpu": {"deviceIDs": [cpu_id]}, "memory": {"deviceIDs": memory_ids}}}
+
+    prev = System.decode_json({"nodes": [node("cpu-1", ["mem-1"]), node("cpu-2", [])]}, {})
+    new = System.decode_json({"nodes": [node("cpu-1", []), node("cpu-2", ["mem-1"])]}, {})
+    return Plan.system_update_plan(prev, new)
+
+
+@pytest.fixture
+def layout_apply_config(mocker):
+    config = {"url": "", "timeout": 5, "retries": 0}
+    mocker.patch.object(
+        MigrationConfigReader, "layout_apply_config", new_callable=mocker.PropertyMock, side_effect=lambda: dict(config)
+    )
+    return config
+
+
+class TestLayoutApplyClient:
+    def test_submit_streams_procedures_in_chunks(self, httpserver, plan):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_json({"applyID": "1"}, status=202)
+        client = LayoutApplyClient(httpserver.url_for("/apply"), timeout=5)
+
+        assert client.submit(plan) == {"status": 202, "response": {"applyID": "1"}}
+        client.close()
+        request, _ = httpserver.log[0]
+        assert request.headers["Content-Type"] == "application/json"
+        assert request.headers["Transfer-Encoding"] == "chunked"
+        assert json.loads(request.get_data()) == {"procedures": plan.encode_json()}
+
+    def test_submit_keeps_connection_alive(self, httpserver, plan):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_json({})
+        client = LayoutApplyClient(httpserver.url_for("/apply"), timeout=5)
+
+        client.submit(plan)
+        client.submit(plan)
+        client.close()
+        assert [request.headers["Connection"] for request, _ in httpserver.log] == ["keep-alive", "keep-alive"]
+
+    def test_submit_returns_none_when_response_is_not_json(self, httpserver, plan):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_data("accepted", content_type="text/plain")
+        client = LayoutApplyClient(httpserver.url_for("/apply"), timeout=5)
+
+        assert client.submit(plan) == {"status": 200, "response": None}
+        client.close()
+
+    def test_submit_failure_when_service_rejects_procedures(self, httpserver, plan):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_data("invalid procedures", status=400)
+        url = httpserver.url_for("/apply")
+        client = LayoutApplyClient(url, timeout=5)
+
+        with pytest.raises(LayoutApplyError) as excinfo:
+            client.submit(plan)
+        client.close()
+        assert excinfo.value.message == (
+            f"Failed to submit the migration procedure to layout apply at {url}: status 400 invalid procedures"
+        )
+
+    def test_submit_failure_when_service_does_not_respond_in_time(self, httpserver, plan):
+        def sleeping(_):
+            time.sleep(0.5)
+            return Response("{}", content_type="application/json")
+
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_handler(sleeping)
+        client = LayoutApplyClient(httpserver.url_for("/apply"), timeout=0.1)
+
+        with pytest.raises(LayoutApplyError, match="timed out"):
+            client.submit(plan)
+        client.close()
+        # Wait for the late request to be handled, so that it is not logged by the next test.
+        while not httpserver.log:
+            time.sleep(0.05)
+
+    def test_submit_failure_when_service_is_not_reachable(self, plan):
+        with socket.socket() as sock:
+            sock.bind(("localhost", 0))
+            port = sock.getsockname()[1]
+        client = LayoutApplyClient(f"http://localhost:{port}/apply", timeout=1, retries=1)
+
+        with pytest.raises(LayoutApplyError) as excinfo:
+            client.submit(plan)
+        client.close()
+        assert excinfo.value.exit_code == ExitCode.INTERNAL_ERR
+
+    def test_layout_apply_error(self, capfd):
+        error = LayoutApplyError("http://localhost/apply", "status 503")
+        message = "Failed to submit the migration procedure to layout apply at http://localhost/apply: status 503"
+        assert error.response_msg == {"code": "E50011", "message": message}
+        error.output_stderr()
+        assert capfd.readouterr().err == f"[E50011]{message}\n"
+
+
+class TestLayoutApplySubmitter:
+    def test_submit_to_configured_url(self, httpserver, plan, layout_apply_config):
+        httpserver.clear()
+        httpserver.expect_request("/apply", method="POST").respond_with_json({"applyID": "1"})
+        layout_apply_config["url"] = httpserver.url_for("/apply")
+        submitter = LayoutApplySubmitter()
+
+        result = submitter.submit(plan)
+        assert result == {"url": layout_apply_config["url"], "status": 200, "response": {"applyID": "1"}}
+        submitter.close()
+
+    def test_client_kept_while_settings_are_unchanged(self, mocker, plan, layout_apply_config):
+        layout_apply_config["url"] = "http://localhost/apply"
+        submit = mocker.patch.object(LayoutApplyClient, "submit", return_value={"status": 200, "response": None})
+        close = mocker.spy(LayoutApplyClient, "close")
+        submitter = LayoutApplySubmitter()
+
+        submitter.submit(plan)
+        client = submitter._client
+        submitter.submit(plan)
+        assert submitter._client is client
+        layout_apply_config["timeout"] = 10
+        submitter.submit(plan)
+        assert submitter._client is not client
+        assert submitter._client.timeout == 10
+        assert close.call_count == 1
+        assert submit.call_count == 3
+        submitter.close()
+        submitter.close()
+        assert close.call_count == 2
+
+    def test_submit_failure_when_url_is_not_set(self, plan, layout_apply_config):
+        with pytest.raises(SettingFileValidationError, match="layout_apply.url is not set"):
+            LayoutApplySubmitter().submit(plan)
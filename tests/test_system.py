@@ -13,7 +13,7 @@
 #  under the License.
 import pytest
 
-from migration_procedure_generator.system import Node, System
+from migration_procedure_generator.system import Node, System, device_types
 
 
 class TestNode:
@@ -207,3 +207,24 @@ class TestSystem:
     def test_system_failure_check_error_pattern(self, nodes):
         with pytest.raises(Exception):
             System.decode_json(nodes, {})
+
+
+def test_device_types_success():
+    current = System.decode_json(
+        {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["cpu-1"]},
+                        "memory": {"deviceIDs": ["memory-1"]},
+                        "gpu": {"deviceIDs": ["gpu-1"]},
+                    }
+                }
+            ]
+        },
+        {},
+    )
+    desired = System.decode_json(
+        {"nodes": [{"device": {"cpu": {"deviceIDs": ["cpu-2"]}, "storage": {"deviceIDs": ["storage-1"]}}}]}, {}
+    )
+    assert device_types(current, desired) == {"memory-1": "memory", "gpu-1": "gpu", "storage-1": "storage"}
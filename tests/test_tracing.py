@@ -0,0 +1,139 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import os
+import pstats
+
+import pytest
+
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+from migration_procedure_generator.tracing import PhaseTimer, PlanHook, PlanTracer, SamplingProfiler
+
+
+@pytest.fixture(scope="function", autouse=True)
+def initializetask():
+    # Initialize so that the test for other things doesn't affect it
+    Task.__index_op_id__ = 0
+
+
+class RecordingHook(PlanHook):
+    def __init__(self):
+        self.events = []
+
+    def phase_start(self, phase):
+        self.events.append(("start", phase))
+
+    def phase_end(self, phase, plan):
+        self.events.append(("end", phase, len(plan.tasks)))
+
+
+class TestPlanTracer:
+    def test_system_update_plan_calls_hooks_around_each_phase(self):
+        prev = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]},
+                        "memory": {"deviceIDs": ["895DFB43-68CD-41D6-8996-EAC8D1EA1E3F"]},
+                    }
+                },
+            ]
+        }
+        new = {
+            "nodes": [
+                {
+                    "device": {
+                        "cpu": {"deviceIDs": ["3B4EBEEA-B6DD-45DA-8C8A-2CA2F8F728D6"]},
+                        "memory": {"deviceIDs": ["5DFB4893-C16D-4968-89D6-8D1EAECEA31F"]},
+                    }
+                },
+            ]
+        }
+        hook = RecordingHook()
+        Plan.system_update_plan(System.decode_json(prev, {}), System.decode_json(new, {}), hooks=[hook])
+        assert hook.events == [
+            ("start", "destruct"),
+            ("end", "destruct", 2),
+            ("start", "construct"),
+            ("end", "construct", 2),
+            ("start", "remove_redundant_tasks"),
+            ("end", "remove_redundant_tasks", 4),
+            ("start", "remove_hotplug_power_cycles"),
+            ("end", "remove_hotplug_power_cycles", 4),
+            ("start", "complete_device_dependencies"),
+            ("end", "complete_device_dependencies", 4),
+            ("start", "remove_indirect_dependencies"),
+            ("end", "remove_indirect_dependencies", 4),
+        ]
+
+    def test_base_hook_does_nothing(self):
+        tracer = PlanTracer([PlanHook()])
+        assert tracer.run("destruct", Plan, []).tasks == []
+
+    def test_tracer_without_hooks(self):
+        tracer = PlanTracer()
+        assert tracer.hooks == []
+        assert tracer.run("phase", lambda value: value * 2, 3) == 6
+
+
+class TestPhaseTimer:
+    def test_phase_timer_records_elapsed_time_and_task_count(self, mocker):
+        mocker.patch("migration_procedure_generator.tracing.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 4.0])
+        timer = PhaseTimer()
+        plan = Plan([Task("shutdown", "cpu-1")])
+        timer.phase_start("destruct")
+        timer.phase_end("destruct", plan)
+        timer.phase_start("construct")
+        timer.phase_end("construct", Plan([]))
+        assert timer.encode_json() == [
+            {"phase": "destruct", "elapsed": 0.5, "tasks": 1},
+            {"phase": "construct", "elapsed": 2.0, "tasks": 0},
+        ]
+
+
+class TestSamplingProfiler:
+    def test_profile_every_nth_call(self, tmp_path):
+        profiler = SamplingProfiler()
+        results = [
+            profiler.run(2, str(tmp_path / "prof"), lambda value, offset=0: value + offset, i, offset=1)
+            for i in range(4)
+        ]
+        assert results == [1, 2, 3, 4]
+        files = sorted(os.listdir(tmp_path / "prof"))
+        assert files == [f"migration-procedures-{os.getpid()}-2.prof", f"migration-procedures-{os.getpid()}-4.prof"]
+        stats = pstats.Stats(str(tmp_path / "prof" / files[0]))
+        assert stats.total_calls > 0
+
+    def test_profile_disabled_when_interval_is_zero(self, tmp_path):
+        profiler = SamplingProfiler()
+        assert profiler.run(0, str(tmp_path / "prof"), sum, [1, 2]) == 3
+        assert not os.path.exists(tmp_path / "prof")
+
+    def test_overlapping_call_is_not_profiled(self, tmp_path):
+        profiler = SamplingProfiler()
+        directory = str(tmp_path / "prof")
+        # The inner call is sampled while the outer one is being profiled.
+        assert profiler.run(1, directory, lambda: profiler.run(1, directory, sum, [1, 2])) == 3
+        assert os.listdir(tmp_path / "prof") == [f"migration-procedures-{os.getpid()}-1.prof"]
+        assert profiler.run(1, directory, sum, [3]) == 3
+        assert len(os.listdir(tmp_path / "prof")) == 2
+
+    def test_call_not_profiled_when_another_profiler_is_active(self, mocker, tmp_path):
+        mocker.patch("cProfile.Profile.enable", side_effect=ValueError("Another profiling tool is already active"))
+        profiler = SamplingProfiler()
+        assert profiler.run(1, str(tmp_path / "prof"), sum, [1, 2]) == 3
+        assert not os.path.exists(tmp_path / "prof")
+        mocker.stopall()
+        assert profiler.run(1, str(tmp_path / "prof"), sum, [1, 2]) == 3
+        assert len(os.listdir(tmp_path / "prof")) == 1
@@ -0,0 +1,206 @@
+# Copyright (C) 2025 NEC Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#  under the License.
+import random
+
+import pytest
+
+from migration_procedure_generator.custom_exception import PlanVerificationError
+from migration_procedure_generator.exitcode import ExitCode
+from migration_procedure_generator.plan import Plan, Task
+from migration_procedure_generator.system import System
+from migration_procedure_generator.verifier import verify_plan
+
+
+@pytest.fixture(scope="function", autouse=True)
+def initializetask():
+    # Initialize so that the test for other things doesn't affect it
+    Task.__index_op_id__ = 0
+
+
+def node(cpu_id, **devices):
+    return {"device": {"cpu": {"deviceIDs": [cpu_id]}, **{k: {"deviceIDs": v} for k, v in devices.items()}}}
+
+
+def random_layouts(seed):
+    rng = random.Random(seed)
+    cpus = [f"cpu-{i}" for i in range(8)]
+    devices = [f"dev-{i}" for i in range(24)]
+
+    def layout():
+        nodes = {}
+        for device_id in devices:
+            cpu_id = rng.choice(cpus + [None])
+            if cpu_id:
+                nodes.setdefault(cpu_id, []).append(device_id)
+        for cpu_id in rng.sample(cpus, 2):
+            nodes.setdefault(cpu_id, [])
+        return {"nodes": [node(cpu_id, memory=ids) for cpu_id, ids in nodes.items()]}
+
+    return layout(), layout()
+
+
+class TestVerifyPlan:
+    @pytest.mark.parametrize("seed", range(30))
+    def test_generated_plan_is_valid(self, seed):
+        prev_json, new_json = random_layouts(seed)
+        prev, new = System.decode_json(prev_json, {}), System.decode_json(new_json, {})
+        plan = Plan.system_update_plan(prev, new)
+        assert verify_plan(plan, prev, new) == []
+
+    def test_generated_plan_is_valid_with_bound_devices(self):
+        bound = {"cpu-1": {"memory": ["dev-1"]}}
+        prev_json = {"nodes": [node("cpu-1", memory=["dev-1", "dev-2"]), node("cpu-2", memory=["dev-3"])]}
+        new_json = {"nodes": [node("cpu-1", memory=["dev-1", "dev-3"]), node("cpu-2", memory=["dev-2"])]}
+        prev, new = System.decode_json(prev_json, bound), System.decode_json(new_json, bound)
+        plan = Plan.system_update_plan(prev, new)
+        assert verify_plan(plan, prev, new) == []
+
+    def test_empty_plan_for_unchanged_layout(self):
+        layout = {"nodes": [node("cpu-1", memory=["dev-1"])]}
+        prev, new = System.decode_json(layout, {}), System.decode_json(layout, {})
+        assert verify_plan(Plan([]), prev, new) == []
+
+    def test_failure_when_device_is_attached_twice(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"]), node("cpu-2")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1"), node("cpu-2", memory=["dev-1"])]}, {})
+        shutdown = Task("shutdown", "cpu-2")
+        connect = Task("connect", "cpu-2", "dev-1", [shutdown])
+        boot = Task("boot", "cpu-2", dependencies=[connect])
+        assert verify_plan(Plan([shutdown, connect, boot]), prev, new) == [
+            "operation 2: connect of device dev-1 that is already attached to cpu-1",
+        ]
+
+    def test_failure_when_connecting_to_running_cpu(self):
+        prev = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"])]}, {})
+        plan = Plan([Task("connect", "cpu-1", "dev-1")])
+        assert verify_plan(plan, prev, new) == [
+            "operation 1: connect of device dev-1 on CPU cpu-1 that is running",
+        ]
+
+    def test_hotplug_device_is_connected_to_running_cpu(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"]), node("cpu-2")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1"), node("cpu-2", memory=["dev-1"], gpu=["dev-2"])]}, {})
+        disconnect = Task("disconnect", "cpu-1", "dev-1")
+        connect = Task("connect", "cpu-2", "dev-1", [disconnect])
+        connect_gpu = Task("connect", "cpu-2", "dev-2")
+        plan = Plan([disconnect, connect, connect_gpu])
+        assert verify_plan(plan, prev, new, hotplug_types=["Memory"]) == [
+            "operation 3: connect of device dev-2 on CPU cpu-2 that is running",
+        ]
+
+    def test_failure_when_disconnecting_unattached_device_from_running_cpu(self):
+        prev = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        plan = Plan([Task("disconnect", "cpu-1", "dev-1")])
+        assert verify_plan(plan, prev, new) == [
+            "operation 1: disconnect of device dev-1 on CPU cpu-1 that is running",
+            "operation 1: disconnect of device dev-1 that is not attached to cpu-1",
+        ]
+
+    def test_failure_when_power_operations_do_not_match_the_state(self):
+        prev = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-2")]}, {})
+        boot = Task("boot", "cpu-1")
+        shutdown = Task("shutdown", "cpu-2", dependencies=[boot])
+        assert verify_plan(Plan([boot, shutdown]), prev, new) == [
+            "operation 1: boot of CPU cpu-1 that is already running",
+            "operation 2: shutdown of CPU cpu-2 that is not running",
+            "CPU cpu-1: running at the end of the migration procedure",
+            "CPU cpu-2: stopped at the end of the migration procedure",
+        ]
+
+    def test_failure_when_end_state_differs_from_desired_layout(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"])]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1", memory=["dev-2"])]}, {})
+        shutdown = Task("shutdown", "cpu-1")
+        disconnect = Task("disconnect", "cpu-1", "dev-1", [shutdown])
+        boot = Task("boot", "cpu-1", dependencies=[disconnect])
+        assert verify_plan(Plan([shutdown, disconnect, boot]), prev, new) == [
+            "device dev-2: attached to None, desired cpu-1",
+        ]
+
+    def test_failure_when_dependencies_are_cyclic(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"])]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        shutdown = Task("shutdown", "cpu-1")
+        disconnect = Task("disconnect", "cpu-1", "dev-1", [shutdown])
+        boot = Task("boot", "cpu-1", dependencies=[disconnect])
+        shutdown.dependencies.add(boot)
+        assert verify_plan(Plan([shutdown, disconnect, boot]), prev, new) == [
+            "dependency cycle among operations [1, 2, 3]",
+        ]
+
+    def test_failure_when_dependency_is_unknown_or_duplicated(self):
+        prev = System.decode_json({"nodes": [node("cpu-1")]}, {})
+        new = System.decode_json({"nodes": []}, {})
+        removed = Task("boot", "cpu-9")
+        shutdown = Task("shutdown", "cpu-1", dependencies=[removed])
+        assert verify_plan(Plan([shutdown, shutdown]), prev, new) == [
+            "operation 2: duplicate operation ID",
+            "operation 2: depends on unknown operation 1",
+        ]
+
+    def test_failure_when_device_dependency_is_missing(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"]), node("cpu-2")]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1"), node("cpu-2", memory=["dev-1"])]}, {})
+        plan = Plan.system_update_plan(prev, new)
+        disconnect = next(task for task in plan.tasks if task.operation == "disconnect")
+        connect = next(task for task in plan.tasks if task.operation == "connect")
+        assert verify_plan(plan, prev, new) == []
+
+        connect.dependencies.discard(disconnect)
+        assert verify_plan(plan, prev, new) == [
+            f"operation {connect.op_id}: connect of device dev-1 does not depend on "
+            f"operation {disconnect.op_id}: disconnect of the same device",
+        ]
+
+    def test_failure_when_power_dependencies_are_missing(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"])]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1", memory=["dev-2"])]}, {})
+        shutdown = Task("shutdown", "cpu-1")
+        disconnect = Task("disconnect", "cpu-1", "dev-1", [shutdown])
+        connect = Task("connect", "cpu-1", "dev-2")
+        boot = Task("boot", "cpu-1", dependencies=[connect])
+        # The replay in plan order is valid, but the connect may run before the shutdown
+        # and the boot before the disconnect.
+        assert verify_plan(Plan([shutdown, disconnect, connect, boot]), prev, new) == [
+            "operation 3: connect of device dev-2 does not depend on the shutdown of CPU cpu-1",
+            "operation 2: disconnect of device dev-1 is not a dependency of the boot of CPU cpu-1",
+            "operation 4: boot of CPU cpu-1 does not depend on its shutdown",
+        ]
+
+    def test_hotplug_device_is_not_ordered_with_power_operations(self):
+        prev = System.decode_json({"nodes": [node("cpu-1", memory=["dev-1"], gpu=["dev-2"])]}, {})
+        new = System.decode_json({"nodes": [node("cpu-1", gpu=["dev-3"])]}, {})
+        shutdown = Task("shutdown", "cpu-1")
+        disconnect = Task("disconnect", "cpu-1", "dev-1")
+        disconnect_gpu = Task("disconnect", "cpu-1", "dev-2", [shutdown])
+        connect_gpu = Task("connect", "cpu-1", "dev-3", [shutdown])
+        boot = Task("boot", "cpu-1", dependencies=[disconnect_gpu, connect_gpu])
+        plan = Plan([shutdown, disconnect, disconnect_gpu, connect_gpu, boot])
+        assert verify_plan(plan, prev, new, hotplug_types=["Memory"]) == []
+
+
+class TestPlanVerificationError:
+    def test_plan_verification_error(self, capfd):
+        err = PlanVerificationError(["violation 1", "violation 2"])
+        err.output_stderr()
+        _, stderr = capfd.readouterr()
+        assert stderr == "[E50007]Generated migration procedure failed verification\nviolation 1\nviolation 2\n"
+        assert err.exit_code == ExitCode.INTERNAL_ERR
+        assert err.response_msg == {
+            "code": "E50007",
+            "message": "Generated migration procedure failed verification\nviolation 1\nviolation 2",
+        }